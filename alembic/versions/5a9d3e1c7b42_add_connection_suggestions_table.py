@@ -0,0 +1,60 @@
+"""'add connection suggestions table'
+
+Revision ID: 5a9d3e1c7b42
+Revises: c27a9e4b1f08
+Create Date: 2026-10-19 11:42:05.318772
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a9d3e1c7b42'
+down_revision: Union[str, Sequence[str], None] = 'c27a9e4b1f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('connection_suggestions',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('candidate_id', sa.Integer(), nullable=False),
+    sa.Column('mutual_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['candidate_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'candidate_id')
+    )
+    op.create_index('ix_connection_suggestions_user_id_mutual_count', 'connection_suggestions', ['user_id', 'mutual_count'], unique=False)
+    # Backfill from existing accepted connections
+    op.execute(
+        """
+        INSERT INTO connection_suggestions (user_id, candidate_id, mutual_count)
+        SELECT mine.user_id, theirs.user_id, COUNT(*)
+        FROM (
+            SELECT low_user_id AS user_id, high_user_id AS friend_id
+            FROM connections WHERE status = 'accepted'
+            UNION ALL
+            SELECT high_user_id, low_user_id
+            FROM connections WHERE status = 'accepted'
+        ) AS mine
+        JOIN (
+            SELECT low_user_id AS user_id, high_user_id AS friend_id
+            FROM connections WHERE status = 'accepted'
+            UNION ALL
+            SELECT high_user_id, low_user_id
+            FROM connections WHERE status = 'accepted'
+        ) AS theirs ON theirs.friend_id = mine.friend_id
+        WHERE mine.user_id != theirs.user_id
+        GROUP BY mine.user_id, theirs.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_connection_suggestions_user_id_mutual_count', table_name='connection_suggestions')
+    op.drop_table('connection_suggestions')
@@ -0,0 +1,33 @@
+"""'add claimed_by index on gifts'
+
+Revision ID: 6005636c7d6b
+Revises: f928bd8d4687
+Create Date: 2026-10-19 01:00:04.557515
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6005636c7d6b'
+down_revision: Union[str, Sequence[str], None] = 'f928bd8d4687'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_gifts_claimed_by_id_list_id',
+        'gifts',
+        ['claimed_by_id', 'list_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_gifts_claimed_by_id_list_id', table_name='gifts')
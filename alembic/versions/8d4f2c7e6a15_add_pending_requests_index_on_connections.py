@@ -0,0 +1,33 @@
+"""'add pending requests index on connections'
+
+Revision ID: 8d4f2c7e6a15
+Revises: 3b8e51d0a9c4
+Create Date: 2026-10-19 10:41:05.318724
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4f2c7e6a15'
+down_revision: Union[str, Sequence[str], None] = '3b8e51d0a9c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_connections_addressee_id_status',
+        'connections',
+        ['addressee_id', 'status'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_connections_addressee_id_status', table_name='connections')
@@ -0,0 +1,62 @@
+"""'add email hash to users'
+
+Revision ID: 9c1f4b7d2e60
+Revises: 5a9d3e1c7b42
+Create Date: 2026-10-19 12:15:40.527319
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1f4b7d2e60'
+down_revision: Union[str, Sequence[str], None] = '5a9d3e1c7b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _hash_email(email: str) -> str:
+    # Frozen copy of app.models.user.hash_email as of this revision, so
+    # later changes to the model can't alter what this migration does
+    return hashlib.sha256(
+        (settings.contact_hash_salt + email.strip().lower()).encode()
+    ).hexdigest()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('email_hash', sa.String(length=64), nullable=True))
+    # Hashed in Python so normalization matches hash_email exactly. Uses
+    # the salt configured now; app.cli.rehash_emails redoes this later.
+    # Backfilled by primary key range so no single statement holds the
+    # whole table in memory or locks it.
+    connection = op.get_bind()
+    max_id = connection.execute(sa.text('SELECT MAX(id) FROM users')).scalar() or 0
+    for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+        users = connection.execute(
+            sa.text('SELECT id, email FROM users WHERE id > :start AND id <= :end'),
+            {'start': start, 'end': start + BACKFILL_BATCH_SIZE},
+        ).all()
+        if users:
+            connection.execute(
+                sa.text('UPDATE users SET email_hash = :email_hash WHERE id = :id'),
+                [
+                    {'id': user_id, 'email_hash': _hash_email(email)}
+                    for user_id, email in users
+                ],
+            )
+    op.create_index(op.f('ix_users_email_hash'), 'users', ['email_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_users_email_hash'), table_name='users')
+    op.drop_column('users', 'email_hash')
@@ -0,0 +1,35 @@
+"""'add retention horizon and index'
+
+Revision ID: b7e5c3a19d24
+Revises: e4a8b2d61f93
+Create Date: 2026-10-19 16:41:08.312874
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e5c3a19d24'
+down_revision: Union[str, Sequence[str], None] = 'e4a8b2d61f93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('change_horizon',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('change_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_status_finished_at', 'jobs', ['status', 'finished_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_status_finished_at', table_name='jobs')
+    op.drop_table('change_horizon')
@@ -0,0 +1,28 @@
+"""'add name index on users'
+
+Revision ID: c27a9e4b1f08
+Revises: 8d4f2c7e6a15
+Create Date: 2026-10-19 11:08:52.640193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c27a9e4b1f08'
+down_revision: Union[str, Sequence[str], None] = '8d4f2c7e6a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_users_name', 'users', ['name'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_name', table_name='users')
@@ -0,0 +1,34 @@
+"""'add link metadata columns to gifts'
+
+Revision ID: e20db4322d70
+Revises: dffd17871ec5
+Create Date: 2026-10-19 01:14:21.883214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e20db4322d70'
+down_revision: Union[str, Sequence[str], None] = 'dffd17871ec5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('gifts', sa.Column('link_title', sa.String(length=255), nullable=True))
+    op.add_column('gifts', sa.Column('link_image_url', sa.String(length=2048), nullable=True))
+    op.add_column('gifts', sa.Column('link_price', sa.Numeric(precision=10, scale=2), nullable=True))
+    op.add_column('gifts', sa.Column('link_fetched_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('gifts', 'link_fetched_at')
+    op.drop_column('gifts', 'link_price')
+    op.drop_column('gifts', 'link_image_url')
+    op.drop_column('gifts', 'link_title')
@@ -0,0 +1,28 @@
+"""'add rules to collections'
+
+Revision ID: e4a8b2d61f93
+Revises: 9c1f4b7d2e60
+Create Date: 2026-10-19 13:02:11.864205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a8b2d61f93'
+down_revision: Union[str, Sequence[str], None] = '9c1f4b7d2e60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('collections', sa.Column('rules', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('collections', 'rules')
@@ -0,0 +1,99 @@
+"""'add canonical pair columns to connections'
+
+Revision ID: f1c702f8dc63
+Revises: e20db4322d70
+Create Date: 2026-10-19 09:12:44.517302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c702f8dc63'
+down_revision: Union[str, Sequence[str], None] = 'e20db4322d70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Rows that lose to their reverse: the other one is accepted and this
+# one isn't, or both match and the other is older
+DUPLICATES = (
+    'FROM connections AS duplicate '
+    'JOIN connections AS kept '
+    'ON kept.low_user_id = duplicate.low_user_id '
+    'AND kept.high_user_id = duplicate.high_user_id '
+    'AND kept.id <> duplicate.id '
+    "WHERE (kept.status = 'accepted') > (duplicate.status = 'accepted') "
+    "OR ((kept.status = 'accepted') = (duplicate.status = 'accepted') "
+    'AND kept.id < duplicate.id)'
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('connections', sa.Column('low_user_id', sa.Integer(), nullable=True))
+    op.add_column('connections', sa.Column('high_user_id', sa.Integer(), nullable=True))
+
+    # Backfill by primary key range so no single UPDATE locks the whole table
+    connection = op.get_bind()
+    max_id = connection.execute(sa.text('SELECT MAX(id) FROM connections')).scalar() or 0
+    for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+        connection.execute(
+            sa.text(
+                'UPDATE connections '
+                'SET low_user_id = LEAST(requester_id, addressee_id), '
+                'high_user_id = GREATEST(requester_id, addressee_id) '
+                'WHERE id > :start AND id <= :end'
+            ),
+            {'start': start, 'end': start + BACKFILL_BATCH_SIZE},
+        )
+
+    # A->B and B->A rows for the same pair would violate the new unique
+    # constraint. Keep one per pair: an accepted row if there is one,
+    # otherwise the oldest request. The requester/addressee constraint
+    # allows at most these two rows per pair, so the kept one is fixed.
+    # Shares are keyed by user and suggestions don't exist until a later
+    # revision builds them from this table, so nothing points at the
+    # dropped row; both users may have synced it, though, so each
+    # gets a tombstone in their change feed.
+    for column in ('requester_id', 'addressee_id'):
+        connection.execute(
+            sa.text(
+                'INSERT INTO changes (user_id, entity, entity_id, op) '
+                f"SELECT duplicate.{column}, 'connection', duplicate.id, 'delete' "
+                + DUPLICATES
+            )
+        )
+    connection.execute(sa.text('DELETE duplicate ' + DUPLICATES))
+
+    op.alter_column('connections', 'low_user_id', existing_type=sa.Integer(), nullable=False)
+    op.alter_column('connections', 'high_user_id', existing_type=sa.Integer(), nullable=False)
+    op.create_foreign_key(
+        'connections_low_user_id_fk', 'connections', 'users', ['low_user_id'], ['id']
+    )
+    op.create_foreign_key(
+        'connections_high_user_id_fk', 'connections', 'users', ['high_user_id'], ['id']
+    )
+    op.create_unique_constraint(
+        'uq_connections_low_high', 'connections', ['low_user_id', 'high_user_id']
+    )
+    op.create_index(
+        'ix_connections_high_user_id_low_user_id',
+        'connections',
+        ['high_user_id', 'low_user_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('connections_high_user_id_fk', 'connections', type_='foreignkey')
+    op.drop_constraint('connections_low_user_id_fk', 'connections', type_='foreignkey')
+    op.drop_index('ix_connections_high_user_id_low_user_id', table_name='connections')
+    op.drop_constraint('uq_connections_low_high', 'connections', type_='unique')
+    op.drop_column('connections', 'high_user_id')
+    op.drop_column('connections', 'low_user_id')
@@ -0,0 +1,34 @@
+"""'add fulltext index on gifts'
+
+Revision ID: f3e3a7be6d51
+Revises: 64c0030384bd
+Create Date: 2026-10-19 00:52:34.774678
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3e3a7be6d51'
+down_revision: Union[str, Sequence[str], None] = '64c0030384bd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_gifts_name_description_fulltext',
+        'gifts',
+        ['name', 'description'],
+        unique=False,
+        mysql_prefix='FULLTEXT',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_gifts_name_description_fulltext', table_name='gifts')
@@ -0,0 +1,32 @@
+"""'add list browsing indexes on gifts'
+
+Revision ID: f928bd8d4687
+Revises: f3e3a7be6d51
+Create Date: 2026-10-19 00:54:52.066144
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f928bd8d4687'
+down_revision: Union[str, Sequence[str], None] = 'f3e3a7be6d51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_gifts_list_id_price', 'gifts', ['list_id', 'price'], unique=False)
+    op.create_index('ix_gifts_list_id_created_at', 'gifts', ['list_id', 'created_at'], unique=False)
+    op.create_index('ix_gifts_list_id_name', 'gifts', ['list_id', 'name'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_gifts_list_id_name', table_name='gifts')
+    op.drop_index('ix_gifts_list_id_created_at', table_name='gifts')
+    op.drop_index('ix_gifts_list_id_price', table_name='gifts')
@@ -0,0 +1,19 @@
+from app.config import settings
+from app.database import SessionLocal
+from app.services.contacts import rehash_emails
+
+
+def main():
+    db = SessionLocal()
+    try:
+        after_id: int | None = 0
+        while after_id is not None:
+            after_id = rehash_emails(db, after_id, settings.job_batch_size)
+            db.commit()
+        print("Email hashes recomputed with the current salt.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
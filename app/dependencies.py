@@ -4,7 +4,6 @@ from typing import Annotated
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
 from app.config import settings
@@ -16,6 +15,10 @@ def get_db():
     db = SessionLocal()
     try:
         yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
@@ -80,7 +83,13 @@ CurrentUser = Annotated[User, Depends(get_current_user)]
 AdminUser = Annotated[User, Depends(require_admin)]
 
 from app.models.gift_list import GiftList
-from app.models.list_share import ListShare
+from app.services.policy import (
+    OWNER,
+    VIEWER,
+    authorize,
+    load_collection,
+    load_list,
+)
 
 
 def get_list_for_owner(
@@ -88,12 +97,8 @@ def get_list_for_owner(
     user: Annotated[User, Depends(get_current_user)],
     db: DbSession,
 ) -> GiftList:
-    gift_list = db.get(GiftList, list_id)
-    if gift_list is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
-    if gift_list.owner_id != user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
-    return gift_list
+    gift_list, role = load_list(db, list_id, user.id)
+    return authorize(gift_list, role, OWNER)
 
 
 def get_list_for_viewer(
@@ -101,26 +106,14 @@ def get_list_for_viewer(
     user: Annotated[User, Depends(get_current_user)],
     db: DbSession,
 ) -> GiftList:
-    gift_list = db.get(GiftList, list_id)
-    if gift_list is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
-    if gift_list.owner_id == user.id:
-        return gift_list
-    share = db.execute(
-        select(ListShare).where(
-            ListShare.list_id == list_id,
-            ListShare.user_id == user.id,
-        )
-    ).scalar_one_or_none()
-    if share is None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
-    return gift_list
+    gift_list, role = load_list(db, list_id, user.id)
+    return authorize(gift_list, role, VIEWER)
 
 
 OwnedList = Annotated[GiftList, Depends(get_list_for_owner)]
 ViewableList = Annotated[GiftList, Depends(get_list_for_viewer)]
 
-from app.models.connection import Connection
+from app.services.connection_graph import connection_index
 
 
 def require_connection(
@@ -138,18 +131,7 @@ def require_connection(
     Raises:
         HTTPException: 403 if no accepted connection exists.
     """
-    connection = db.execute(
-        select(Connection).where(
-            Connection.status == "accepted",
-            or_(
-                (Connection.requester_id == current_user.id)
-                & (Connection.addressee_id == target_user_id),
-                (Connection.requester_id == target_user_id)
-                & (Connection.addressee_id == current_user.id),
-            ),
-        )
-    ).scalar_one_or_none()
-    if connection is None:
+    if not connection_index.are_connected(db, current_user.id, target_user_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You must be connected to share a list with this user.",
@@ -177,12 +159,8 @@ def get_collection_for_owner(
     Raises:
         HTTPException: 404 if not found, 403 if not owner.
     """
-    collection = db.get(Collection, collection_id)
-    if collection is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
-    if collection.owner_id != user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
-    return collection
+    collection, role = load_collection(db, collection_id, user.id)
+    return authorize(collection, role, OWNER)
 
 
 OwnedCollection = Annotated[Collection, Depends(get_collection_for_owner)]
@@ -1,14 +1,49 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 
 from app.config import settings
-from app.database import engine
-from app.routers import auth, users, invites, lists, gifts, list_shares, connections, collections
+from app.database import SessionLocal, engine
+from app.services.jobs import worker
+from app.services.link_metadata import enricher
+from app.services.retention import schedule_retention
+from app.routers import (
+    auth,
+    users,
+    invites,
+    lists,
+    gifts,
+    gift_search,
+    list_shares,
+    shares,
+    connections,
+    collections,
+    me,
+    sync,
+    admin,
+)
+
+
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    if settings.link_enrichment_enabled:
+        enricher.start()
+    if settings.job_worker_enabled:
+        with SessionLocal() as db:
+            schedule_retention(db)
+            db.commit()
+        worker.start()
+    yield
+    if settings.job_worker_enabled:
+        await worker.stop()
+    if settings.link_enrichment_enabled:
+        await enricher.stop()
 
 
 def create_app() -> FastAPI:
-    application = FastAPI(title="Boone Gifts API")
+    application = FastAPI(title="Boone Gifts API", lifespan=lifespan)
 
     application.add_middleware(
         CORSMiddleware,
@@ -23,9 +58,14 @@ def create_app() -> FastAPI:
     application.include_router(invites.router)
     application.include_router(lists.router)
     application.include_router(gifts.router)
+    application.include_router(gift_search.router)
     application.include_router(list_shares.router)
+    application.include_router(shares.router)
     application.include_router(connections.router)
     application.include_router(collections.router)
+    application.include_router(me.router)
+    application.include_router(sync.router)
+    application.include_router(admin.router)
 
     @application.get("/health")
     def health():
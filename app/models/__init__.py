@@ -4,10 +4,15 @@ from app.models.gift_list import GiftList
 from app.models.gift import Gift
 from app.models.list_share import ListShare
 from app.models.connection import Connection
+from app.models.connection_suggestion import ConnectionSuggestion
 from app.models.collection import Collection
 from app.models.collection_item import CollectionItem
+from app.models.change import Change
+from app.models.change_horizon import ChangeHorizon
+from app.models.job import Job
 
 __all__ = [
     "User", "Invite", "GiftList", "Gift", "ListShare",
-    "Connection", "Collection", "CollectionItem",
+    "Connection", "ConnectionSuggestion", "Collection", "CollectionItem",
+    "Change", "ChangeHorizon", "Job",
 ]
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Index, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class Change(Base):
+    """One entry in a user's change feed, used for delta sync.
+
+    The auto-increment id is the sequence clients sync from. IDs are
+    assigned at insert rather than commit, so readers only trust it up
+    to the newest settled change (see app.services.changes.settled).
+    A "delete" op is a tombstone; the row it refers to is already gone.
+    """
+
+    __tablename__ = "changes"
+    __table_args__ = (Index("ix_changes_user_id_id", "user_id", "id"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    entity: Mapped[str] = mapped_column(String(20))
+    entity_id: Mapped[int] = mapped_column()
+    op: Mapped[str] = mapped_column(String(10))
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
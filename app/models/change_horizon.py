@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ChangeHorizon(Base):
+    """How far the retention job has pruned the change feed.
+
+    A single row: every change with an ID at or below change_id is
+    gone, so a sync token older than that can't be resumed and the
+    client has to start over with a full sync.
+    """
+
+    __tablename__ = "change_horizon"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    change_id: Mapped[int] = mapped_column()
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(), onupdate=func.now()
+    )
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, String, func
+from sqlalchemy import JSON, ForeignKey, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -13,11 +13,14 @@ class Collection(Base):
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     name: Mapped[str] = mapped_column(String(255))
     description: Mapped[str | None] = mapped_column(String(500), default=None)
+    # Set for smart collections, whose lists are computed from the rules
+    rules: Mapped[dict | None] = mapped_column(JSON, default=None)
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         server_default=func.now(), onupdate=func.now()
     )
 
+    # Loaded only when needed; readers project items with a join instead
     items: Mapped[list["CollectionItem"]] = relationship(
-        "CollectionItem", lazy="selectin", cascade="all, delete-orphan"
+        "CollectionItem", lazy="select", cascade="all, delete-orphan"
     )
@@ -1,7 +1,17 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, String, UniqueConstraint, func
+from sqlalchemy import (
+    ForeignKey,
+    Index,
+    String,
+    UniqueConstraint,
+    and_,
+    event,
+    func,
+    or_,
+)
 from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.elements import ColumnElement
 
 from app.database import Base
 
@@ -12,11 +22,42 @@ class Connection(Base):
         UniqueConstraint(
             "requester_id", "addressee_id", name="uq_connections_requester_addressee"
         ),
+        UniqueConstraint(
+            "low_user_id", "high_user_id", name="uq_connections_low_high"
+        ),
+        Index("ix_connections_high_user_id_low_user_id", "high_user_id", "low_user_id"),
+        Index("ix_connections_addressee_id_status", "addressee_id", "status"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     requester_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     addressee_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    # The pair in canonical order, whichever of them sent the request
+    low_user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    high_user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     status: Mapped[str] = mapped_column(String(20), default="pending")
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     accepted_at: Mapped[datetime | None] = mapped_column(default=None)
+
+    @classmethod
+    def between(cls, user_id: int, other_id: int) -> ColumnElement[bool]:
+        """Match the connection between two users, in either direction."""
+        low, high = sorted((user_id, other_id))
+        return and_(cls.low_user_id == low, cls.high_user_id == high)
+
+    @classmethod
+    def involving(cls, user_id: int) -> ColumnElement[bool]:
+        """Match every connection a user is a party to."""
+        return or_(cls.low_user_id == user_id, cls.high_user_id == user_id)
+
+    @classmethod
+    def other_user_id(cls, user_id: int) -> ColumnElement[int]:
+        """The other party's ID, for connections involving the user."""
+        return cls.low_user_id + cls.high_user_id - user_id
+
+
+@event.listens_for(Connection, "before_insert")
+def _set_pair(mapper, connection, target: Connection) -> None:
+    target.low_user_id, target.high_user_id = sorted(
+        (target.requester_id, target.addressee_id)
+    )
@@ -0,0 +1,28 @@
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ConnectionSuggestion(Base):
+    """How many accepted connections two users have in common.
+
+    Maintained incrementally as connections are accepted and removed.
+    Rows are kept in both directions, and may include pairs that are
+    already connected, which readers filter out.
+    """
+
+    __tablename__ = "connection_suggestions"
+    __table_args__ = (
+        Index(
+            "ix_connection_suggestions_user_id_mutual_count",
+            "user_id",
+            "mutual_count",
+        ),
+    )
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    candidate_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"), primary_key=True
+    )
+    mutual_count: Mapped[int] = mapped_column(default=0)
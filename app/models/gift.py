@@ -1,7 +1,7 @@
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import ForeignKey, Numeric, String, func
+from sqlalchemy import ForeignKey, Index, Numeric, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
@@ -9,6 +9,18 @@ from app.database import Base
 
 class Gift(Base):
     __tablename__ = "gifts"
+    __table_args__ = (
+        Index(
+            "ix_gifts_name_description_fulltext",
+            "name",
+            "description",
+            mysql_prefix="FULLTEXT",
+        ),
+        Index("ix_gifts_list_id_price", "list_id", "price"),
+        Index("ix_gifts_list_id_created_at", "list_id", "created_at"),
+        Index("ix_gifts_list_id_name", "list_id", "name"),
+        Index("ix_gifts_claimed_by_id_list_id", "claimed_by_id", "list_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     list_id: Mapped[int] = mapped_column(ForeignKey("lists.id"))
@@ -22,6 +34,14 @@ class Gift(Base):
         ForeignKey("users.id"), default=None
     )
     claimed_at: Mapped[datetime | None] = mapped_column(default=None)
+    link_title: Mapped[str | None] = mapped_column(String(255), default=None)
+    link_image_url: Mapped[str | None] = mapped_column(
+        String(2048), default=None
+    )
+    link_price: Mapped[Decimal | None] = mapped_column(
+        Numeric(10, 2), default=None
+    )
+    link_fetched_at: Mapped[datetime | None] = mapped_column(default=None)
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         server_default=func.now(), onupdate=func.now()
@@ -1,17 +1,40 @@
+import hashlib
 from datetime import datetime
 
 import bcrypt
-from sqlalchemy import String, Boolean, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Index, String, Boolean, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
+from app.config import settings
 from app.database import Base
 
 
+def normalize_email(email: str) -> str:
+    """Trim and lowercase an email the way contact lookups compare them."""
+    return email.strip().lower()
+
+
+def hash_email(email: str) -> str:
+    """Salted SHA-256 of a normalized email, as sent by contact lookups.
+
+    Stored hashes are recomputed with it (app.cli.rehash_emails)
+    whenever the salt changes. The email_hash migration keeps its own
+    frozen copy; change both together only if that's really intended.
+    """
+    return hashlib.sha256(
+        (settings.contact_hash_salt + normalize_email(email)).encode()
+    ).hexdigest()
+
+
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_name", "name"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
+    email_hash: Mapped[str | None] = mapped_column(
+        String(64), index=True, default=None
+    )
     name: Mapped[str] = mapped_column(String(255))
     password_hash: Mapped[str] = mapped_column(String(255))
     role: Mapped[str] = mapped_column(String(50), default="member")
@@ -25,6 +48,11 @@ class User(Base):
         "GiftList", lazy="selectin", foreign_keys="GiftList.owner_id"
     )
 
+    @validates("email")
+    def _hash_email(self, key: str, email: str) -> str:
+        self.email_hash = hash_email(email)
+        return email
+
     def set_password(self, password: str) -> None:
         self.password_hash = bcrypt.hashpw(
             password.encode(), bcrypt.gensalt()
@@ -0,0 +1,81 @@
+import base64
+import json
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def encode_cursor(values: list) -> str:
+    """Encode keyset values as an opaque cursor string.
+
+    Parameters:
+        values: Sort-key values of the last row on the page.
+
+    Returns:
+        URL-safe cursor string.
+    """
+    raw: bytes = json.dumps(values, default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Decode a cursor produced by encode_cursor.
+
+    Parameters:
+        cursor: The cursor from the client.
+        size: Number of keyset values expected.
+
+    Returns:
+        The decoded keyset values.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor.",
+        )
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor.",
+        )
+    return values
+
+
+def keyset_after(
+    column: ColumnElement,
+    value,
+    tiebreak: ColumnElement,
+    last_tiebreak: int,
+    descending: bool = False,
+) -> ColumnElement:
+    """Build the predicate selecting rows after a keyset position.
+
+    NULLs sort first in ascending order and last in descending order,
+    matching MySQL's default, so nullable sort columns page correctly.
+
+    Parameters:
+        column: The sort column.
+        value: The sort column's value on the last row of the page.
+        tiebreak: A unique column ordered in the same direction.
+        last_tiebreak: The tiebreak column's value on the last row.
+        descending: Whether the page is sorted in descending order.
+
+    Returns:
+        A WHERE predicate for the next page.
+    """
+    tie = tiebreak < last_tiebreak if descending else tiebreak > last_tiebreak
+    if value is None:
+        if descending:
+            return and_(column.is_(None), tie)
+        return or_(column.is_not(None), and_(column.is_(None), tie))
+    after = column < value if descending else column > value
+    predicate = or_(after, and_(column == value, tie))
+    if descending:
+        predicate = or_(predicate, column.is_(None))
+    return predicate
@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+
+from app.dependencies import AdminUser, DbSession
+from app.schemas.admin import AdminStats
+from app.services.connection_graph import connection_index
+from app.services.jobs import queue_stats
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/stats", response_model=AdminStats)
+def get_stats(admin: AdminUser, db: DbSession) -> dict:
+    """Report runtime statistics.
+
+    Parameters:
+        admin: The authenticated admin.
+        db: Database session.
+
+    Returns:
+        Hit, miss and invalidation counts for this process's connection
+        cache, and the job queue's depth and lag.
+    """
+    return {
+        "connections": connection_index.stats(),
+        "jobs": queue_stats(db),
+    }
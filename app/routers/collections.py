@@ -1,22 +1,84 @@
+from decimal import Decimal
+
 from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import and_, delete, insert, select
 
 from app.dependencies import CurrentUser, DbSession, OwnedCollection
 from app.models.collection import Collection
 from app.models.collection_item import CollectionItem
+from app.models.gift import Gift
 from app.models.gift_list import GiftList
 from app.models.list_share import ListShare
+from app.models.user import User
 from app.schemas.collection import (
     CollectionCreate,
     CollectionDetail,
     CollectionItemCreate,
+    CollectionItemsUpdate,
     CollectionRead,
     CollectionUpdate,
 )
+from app.services.changes import DELETE, UPSERT, record_change
+from app.services.collection_totals import (
+    EMPTY,
+    collection_totals,
+    list_totals,
+    totals_columns,
+)
+from app.services.policy import VIEWER, authorize, load_list
+from app.services.smart_collections import feed_version, smart_membership
 
 router = APIRouter(prefix="/collections", tags=["collections"])
 
 
+def _summary(collection: Collection) -> dict:
+    return {
+        "id": collection.id,
+        "name": collection.name,
+        "description": collection.description,
+        "owner_id": collection.owner_id,
+        "rules": collection.rules,
+        "created_at": collection.created_at,
+        "updated_at": collection.updated_at,
+    }
+
+
+def _with_totals(db, collections: list[Collection]) -> list[dict]:
+    """Build CollectionRead-compatible dicts.
+
+    Manual collections are totalled by one aggregate query. Smart
+    collections are totalled from their cached membership by another.
+    """
+    if not collections:
+        return []
+    owner_id: int = collections[0].owner_id
+    manual: list[int] = [c.id for c in collections if c.rules is None]
+    totals = collection_totals(db, owner_id, manual)
+
+    smart: list[Collection] = [c for c in collections if c.rules is not None]
+    if smart:
+        version = feed_version(db, owner_id)
+        members = {c.id: smart_membership.list_ids(db, c, version) for c in smart}
+        per_list = list_totals(
+            db, owner_id, list({i for ids in members.values() for i in ids})
+        )
+        for collection_id, list_ids in members.items():
+            summed: dict = dict(EMPTY)
+            for list_id in list_ids:
+                for key, value in per_list.get(list_id, EMPTY).items():
+                    summed[key] += value
+            totals[collection_id] = summed
+    return [{**_summary(c), **totals.get(c.id, EMPTY)} for c in collections]
+
+
+def _reject_smart(collection: Collection) -> None:
+    if collection.rules is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Smart collection lists come from its rules.",
+        )
+
+
 @router.post("", response_model=CollectionRead, status_code=status.HTTP_201_CREATED)
 def create_collection(
     request: CollectionCreate, user: CurrentUser, db: DbSession
@@ -24,7 +86,8 @@ def create_collection(
     """Create a new collection.
 
     Parameters:
-        request: Collection name and optional description.
+        request: Collection name, optional description, and rules for
+            a smart collection.
         user: The authenticated user.
         db: Database session.
 
@@ -34,11 +97,13 @@ def create_collection(
     collection: Collection = Collection(
         name=request.name,
         description=request.description,
+        rules=request.rules.model_dump(mode="json") if request.rules else None,
         owner_id=user.id,
     )
     db.add(collection)
     db.flush()
-    return collection
+    record_change(db, "collection", collection.id, UPSERT, [user.id])
+    return _with_totals(db, [collection])[0]
 
 
 @router.get("", response_model=list[CollectionRead])
@@ -50,47 +115,86 @@ def list_collections(user: CurrentUser, db: DbSession):
         db: Database session.
 
     Returns:
-        List of collections.
+        List of collections with their gift totals.
     """
     collections: list[Collection] = db.execute(
         select(Collection).where(Collection.owner_id == user.id)
     ).scalars().all()
-    return collections
+    return _with_totals(db, collections)
 
 
 @router.get("/{collection_id}", response_model=CollectionDetail)
 def get_collection(collection: OwnedCollection, db: DbSession):
-    """Get a collection with its lists.
+    """Get a collection with its lists and gift totals.
+
+    The lists and their totals are projected straight from lists joined
+    to their owners and gifts, so the whole response costs one query on
+    top of loading the collection, however many lists it holds. A smart
+    collection's lists come from its cached membership, which costs one
+    more query while the owner's change feed hasn't moved.
 
     Parameters:
         collection: The collection (verified owner).
         db: Database session.
 
     Returns:
-        Collection detail with lists.
+        Collection detail with lists, in the order they were added (by
+        list ID for smart collections).
     """
-    list_ids: list[int] = [item.list_id for item in collection.items]
-    lists: list[GiftList] = []
-    if list_ids:
-        lists = db.execute(
-            select(GiftList).where(GiftList.id.in_(list_ids))
-        ).scalars().all()
-    return {
-        "id": collection.id,
-        "name": collection.name,
-        "description": collection.description,
-        "owner_id": collection.owner_id,
-        "lists": lists,
-        "created_at": collection.created_at,
-        "updated_at": collection.updated_at,
-    }
+    owner_id: int = collection.owner_id
+    query = (
+        select(
+            GiftList.id,
+            GiftList.name,
+            GiftList.description,
+            GiftList.owner_id,
+            User.name.label("owner_name"),
+            GiftList.created_at,
+            GiftList.updated_at,
+            *totals_columns(owner_id),
+        )
+        .join(User, User.id == GiftList.owner_id)
+        .outerjoin(Gift, Gift.list_id == GiftList.id)
+    )
+    if collection.rules is not None:
+        list_ids = smart_membership.list_ids(
+            db, collection, feed_version(db, owner_id)
+        )
+        query = (
+            query.where(GiftList.id.in_(list_ids))
+            .group_by(GiftList.id, User.id)
+            .order_by(GiftList.id)
+        )
+    else:
+        query = (
+            query.join(CollectionItem, CollectionItem.list_id == GiftList.id)
+            .where(CollectionItem.collection_id == collection.id)
+            .group_by(CollectionItem.id, GiftList.id, User.id)
+            .order_by(CollectionItem.id)
+        )
+    rows = db.execute(query).all()
+
+    lists: list[dict] = []
+    totals: dict = dict(EMPTY)
+    for row in rows:
+        entry: dict = row._asdict()
+        entry["my_spend"] = Decimal(entry["my_spend"])
+        if row.owner_id == owner_id:
+            entry["unclaimed_count"] = None
+        for key in EMPTY:
+            totals[key] += entry[key] or 0
+        lists.append(entry)
+    return {**_summary(collection), "lists": lists, **totals}
 
 
 @router.put("/{collection_id}", response_model=CollectionRead)
 def update_collection(
     request: CollectionUpdate, collection: OwnedCollection, db: DbSession
 ):
-    """Update a collection's name or description.
+    """Update a collection's name, description or rules.
+
+    Setting rules turns it into a smart collection and clearing them
+    turns it back; hand-picked lists are kept either way.
 
     Parameters:
         request: Fields to update.
@@ -100,11 +204,14 @@ def update_collection(
     Returns:
         The updated collection.
     """
-    update_data: dict = request.model_dump(exclude_unset=True)
+    update_data: dict = request.model_dump(exclude_unset=True, mode="json")
     for key, value in update_data.items():
         setattr(collection, key, value)
     db.flush()
-    return collection
+    record_change(
+        db, "collection", collection.id, UPSERT, [collection.owner_id]
+    )
+    return _with_totals(db, [collection])[0]
 
 
 @router.delete("/{collection_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -115,6 +222,9 @@ def delete_collection(collection: OwnedCollection, db: DbSession):
         collection: The collection (verified owner).
         db: Database session.
     """
+    record_change(
+        db, "collection", collection.id, DELETE, [collection.owner_id]
+    )
     db.delete(collection)
     db.flush()
 
@@ -138,20 +248,11 @@ def add_item(
         db: Database session.
 
     Raises:
-        HTTPException: 404 if list not found, 403 if no access, 409 if duplicate.
+        HTTPException: 404 if list not found, 403 if no access, 409 if
+            duplicate or the collection is smart.
     """
-    gift_list: GiftList | None = db.get(GiftList, request.list_id)
-    if gift_list is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
-    if gift_list.owner_id != user.id:
-        share: ListShare | None = db.execute(
-            select(ListShare).where(
-                ListShare.list_id == request.list_id,
-                ListShare.user_id == user.id,
-            )
-        ).scalar_one_or_none()
-        if share is None:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    _reject_smart(collection)
+    authorize(*load_list(db, request.list_id, user.id), VIEWER)
 
     existing: CollectionItem | None = db.execute(
         select(CollectionItem).where(
@@ -167,6 +268,90 @@ def add_item(
     )
     db.add(item)
     db.flush()
+    record_change(db, "collection", collection.id, UPSERT, [user.id])
+
+
+@router.put("/{collection_id}/items", response_model=CollectionDetail)
+def set_items(
+    request: CollectionItemsUpdate,
+    collection: OwnedCollection,
+    user: CurrentUser,
+    db: DbSession,
+):
+    """Replace the lists in a collection, or add and remove several at once.
+
+    Access to every list being added is checked in one query, and the
+    change is applied with one INSERT and one DELETE. If any list can't
+    be added, nothing changes.
+
+    Parameters:
+        request: The full set of list IDs, or lists to add and remove.
+        collection: The collection (verified owner).
+        user: The authenticated user.
+        db: Database session.
+
+    Returns:
+        The updated collection detail.
+
+    Raises:
+        HTTPException: 404 if a list to add doesn't exist, 403 if the
+            user can't view one, 409 if the collection is smart.
+    """
+    _reject_smart(collection)
+    current: set[int] = set(
+        db.execute(
+            select(CollectionItem.list_id).where(
+                CollectionItem.collection_id == collection.id
+            )
+        ).scalars()
+    )
+    if request.list_ids is not None:
+        wanted: list[int] = request.list_ids
+        to_remove: set[int] = current - set(wanted)
+    else:
+        wanted = request.add
+        to_remove = (set(request.remove) - set(request.add)) & current
+    # New lists keep the order they were sent in
+    to_add: list[int] = [
+        list_id for list_id in dict.fromkeys(wanted) if list_id not in current
+    ]
+
+    if to_add:
+        rows = db.execute(
+            select(GiftList.id, GiftList.owner_id, ListShare.id)
+            .outerjoin(
+                ListShare,
+                and_(ListShare.list_id == GiftList.id, ListShare.user_id == user.id),
+            )
+            .where(GiftList.id.in_(to_add))
+        ).all()
+        if len(rows) != len(to_add):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        if any(
+            owner_id != user.id and share_id is None
+            for _, owner_id, share_id in rows
+        ):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+        # An item added concurrently is ignored rather than failing the request
+        db.execute(
+            insert(CollectionItem).prefix_with("IGNORE", dialect="mysql"),
+            [
+                {"collection_id": collection.id, "list_id": list_id}
+                for list_id in to_add
+            ],
+        )
+    if to_remove:
+        db.execute(
+            delete(CollectionItem)
+            .where(
+                CollectionItem.collection_id == collection.id,
+                CollectionItem.list_id.in_(to_remove),
+            )
+            .execution_options(synchronize_session=False)
+        )
+    if to_add or to_remove:
+        record_change(db, "collection", collection.id, UPSERT, [user.id])
+    return get_collection(collection, db)
 
 
 @router.delete(
@@ -184,8 +369,10 @@ def remove_item(
         db: Database session.
 
     Raises:
-        HTTPException: 404 if the list is not in the collection.
+        HTTPException: 404 if the list is not in the collection, 409 if
+            the collection is smart.
     """
+    _reject_smart(collection)
     item: CollectionItem | None = db.execute(
         select(CollectionItem).where(
             CollectionItem.collection_id == collection.id,
@@ -196,3 +383,6 @@ def remove_item(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
     db.delete(item)
     db.flush()
+    record_change(
+        db, "collection", collection.id, UPSERT, [collection.owner_id]
+    )
@@ -1,38 +1,68 @@
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import or_, select, update
+from fastapi import APIRouter, HTTPException, Query, status
+from sqlalchemy import delete, or_, select
 
 from app.dependencies import CurrentUser, DbSession
-from app.models.collection import Collection
-from app.models.collection_item import CollectionItem
 from app.models.connection import Connection
-from app.models.gift import Gift
 from app.models.gift_list import GiftList
 from app.models.list_share import ListShare
 from app.models.user import User
-from app.schemas.connection import ConnectionCreate, ConnectionRead, ConnectionUserRead
+from app.schemas.connection import (
+    ContactLookup,
+    ContactMatch,
+    ConnectionCreate,
+    ConnectionRead,
+    ConnectionSuggestionRead,
+    ConnectionUserRead,
+)
+from app.services.changes import (
+    DELETE,
+    UPSERT,
+    record_change,
+    record_changes,
+)
+from app.services.cleanup import CONNECTION_CLEANUP
+from app.services.contacts import lookup_contacts
+from app.services.connection_graph import connection_index, invalidate_connections
+from app.services.events import publish_list_event_on_commit
+from app.services.jobs import enqueue_job
+from app.services.suggestions import (
+    connection_added,
+    connection_removed,
+    lock_endpoints,
+    suggest_connections,
+)
 
 router = APIRouter(prefix="/connections", tags=["connections"])
 
 
-def _build_response(connection: Connection, current_user: User, db) -> dict:
+def _lock_connection(db, connection: Connection) -> Connection | None:
+    """Lock both users, then re-read the connection as it now stands.
+
+    A concurrent accept or delete of the same row (or of another
+    connection sharing a user) finishes first, so the status checked
+    afterwards is the committed one and mutual counts move only once.
+    """
+    lock_endpoints(db, connection.requester_id, connection.addressee_id)
+    return db.execute(
+        select(Connection)
+        .where(Connection.id == connection.id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).scalar_one_or_none()
+
+
+def _build_response(connection: Connection, other_user) -> dict:
     """Build a ConnectionRead-compatible dict with the other user's info.
 
     Parameters:
         connection: The connection record.
-        current_user: The authenticated user.
-        db: Database session.
+        other_user: A row with the other party's id, name and email.
 
     Returns:
         Dict matching ConnectionRead schema.
     """
-    other_id: int = (
-        connection.addressee_id
-        if connection.requester_id == current_user.id
-        else connection.requester_id
-    )
-    other_user: User | None = db.get(User, other_id)
     return {
         "id": connection.id,
         "status": connection.status,
@@ -46,6 +76,46 @@ def _build_response(connection: Connection, current_user: User, db) -> dict:
     }
 
 
+def _load_responses(db, current_user: User, *criteria) -> list[dict]:
+    """Load connections with the other party's info in one query.
+
+    Only the other user's id, name and email are selected, so their
+    lists are never loaded.
+
+    Parameters:
+        db: Database session.
+        current_user: The authenticated user.
+        criteria: WHERE criteria selecting the connections.
+
+    Returns:
+        Dicts matching ConnectionRead schema, ordered by connection ID.
+    """
+    rows = db.execute(
+        select(
+            Connection.id,
+            Connection.status,
+            Connection.created_at,
+            Connection.accepted_at,
+            User.id.label("user_id"),
+            User.name,
+            User.email,
+        )
+        .join(User, User.id == Connection.other_user_id(current_user.id))
+        .where(*criteria)
+        .order_by(Connection.id)
+    ).all()
+    return [
+        {
+            "id": row.id,
+            "status": row.status,
+            "user": {"id": row.user_id, "name": row.name, "email": row.email},
+            "created_at": row.created_at,
+            "accepted_at": row.accepted_at,
+        }
+        for row in rows
+    ]
+
+
 @router.post("", response_model=ConnectionRead, status_code=status.HTTP_201_CREATED)
 def create_connection(
     request: ConnectionCreate, user: CurrentUser, db: DbSession
@@ -63,13 +133,13 @@ def create_connection(
     Raises:
         HTTPException: 400 if targeting yourself, 404 if user not found, 409 if duplicate.
     """
-    target: User | None
     if request.user_id is not None:
-        target = db.get(User, request.user_id)
+        match = User.id == request.user_id
     else:
-        target = db.execute(
-            select(User).where(User.email == request.email)
-        ).scalar_one_or_none()
+        match = User.email == request.email
+    target = db.execute(
+        select(User.id, User.name, User.email).where(match)
+    ).one_or_none()
 
     if target is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
@@ -81,14 +151,7 @@ def create_connection(
         )
 
     existing: Connection | None = db.execute(
-        select(Connection).where(
-            or_(
-                (Connection.requester_id == user.id)
-                & (Connection.addressee_id == target.id),
-                (Connection.requester_id == target.id)
-                & (Connection.addressee_id == user.id),
-            )
-        )
+        select(Connection).where(Connection.between(user.id, target.id))
     ).scalar_one_or_none()
     if existing is not None:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT)
@@ -98,7 +161,28 @@ def create_connection(
     )
     db.add(connection)
     db.flush()
-    return _build_response(connection, user, db)
+    record_change(db, "connection", connection.id, UPSERT, [user.id, target.id])
+    return _build_response(connection, target)
+
+
+@router.post("/lookup", response_model=list[ContactMatch])
+def lookup_connections(
+    request: ContactLookup, user: CurrentUser, db: DbSession
+) -> list[dict]:
+    """Find which of an address book's contacts are already members.
+
+    Contacts can be sent as plain emails or as salted hashes of them
+    (see hash_email), so clients needn't upload the address book itself.
+
+    Parameters:
+        request: The emails and hashes to match.
+        user: The authenticated user.
+        db: Database session.
+
+    Returns:
+        One match per contact found, with the caller's connection status.
+    """
+    return lookup_contacts(db, user.id, request.emails, request.hashes)
 
 
 @router.get("", response_model=list[ConnectionRead])
@@ -112,16 +196,10 @@ def list_connections(user: CurrentUser, db: DbSession) -> list[dict]:
     Returns:
         List of accepted connections.
     """
-    connections: list[Connection] = db.execute(
-        select(Connection).where(
-            Connection.status == "accepted",
-            or_(
-                Connection.requester_id == user.id,
-                Connection.addressee_id == user.id,
-            ),
-        )
-    ).scalars().all()
-    return [_build_response(c, user, db) for c in connections]
+    connection_ids = connection_index.connections(db, user.id).values()
+    if not connection_ids:
+        return []
+    return _load_responses(db, user, Connection.id.in_(connection_ids))
 
 
 @router.get("/requests", response_model=list[ConnectionRead])
@@ -135,13 +213,65 @@ def list_requests(user: CurrentUser, db: DbSession) -> list[dict]:
     Returns:
         List of pending incoming requests.
     """
-    connections: list[Connection] = db.execute(
-        select(Connection).where(
-            Connection.status == "pending",
-            Connection.addressee_id == user.id,
-        )
-    ).scalars().all()
-    return [_build_response(c, user, db) for c in connections]
+    return _load_responses(
+        db,
+        user,
+        Connection.status == "pending",
+        Connection.addressee_id == user.id,
+    )
+
+
+@router.get("/suggestions", response_model=list[ConnectionSuggestionRead])
+def list_suggestions(
+    user: CurrentUser,
+    db: DbSession,
+    limit: int = Query(default=10, ge=1, le=50),
+) -> list[dict]:
+    """Suggest people the current user may know.
+
+    Candidates are ranked by how many accepted connections they share
+    with the user, read from the maintained connection_suggestions table.
+
+    Parameters:
+        user: The authenticated user.
+        db: Database session.
+        limit: Maximum number of suggestions.
+
+    Returns:
+        Suggested users with their mutual connection counts.
+    """
+    return suggest_connections(db, user.id, limit)
+
+
+@router.get("/{user_id}/mutual", response_model=list[ConnectionUserRead])
+def list_mutual_connections(
+    user_id: int, user: CurrentUser, db: DbSession
+) -> list:
+    """List the connections the current user shares with another user.
+
+    Parameters:
+        user_id: The other user.
+        user: The authenticated user.
+        db: Database session.
+
+    Returns:
+        The shared connections, ordered by name.
+
+    Raises:
+        HTTPException: 404 if the user does not exist.
+    """
+    if db.get(User, user_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    mutual_ids = set(connection_index.connections(db, user.id)) & set(
+        connection_index.connections(db, user_id)
+    )
+    if not mutual_ids:
+        return []
+    return db.execute(
+        select(User.id, User.name, User.email)
+        .where(User.id.in_(mutual_ids))
+        .order_by(User.name, User.id)
+    ).all()
 
 
 @router.post("/{connection_id}/accept", response_model=ConnectionRead)
@@ -166,12 +296,29 @@ def accept_connection(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
     if connection.addressee_id != user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    connection = _lock_connection(db, connection)
+    if connection is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
     if connection.status == "accepted":
         raise HTTPException(status_code=status.HTTP_409_CONFLICT)
     connection.status = "accepted"
     connection.accepted_at = datetime.now(timezone.utc)
     db.flush()
-    return _build_response(connection, user, db)
+    invalidate_connections(db, [connection.requester_id, connection.addressee_id])
+    connection_added(db, connection.requester_id, connection.addressee_id)
+    record_change(
+        db,
+        "connection",
+        connection.id,
+        UPSERT,
+        [connection.requester_id, connection.addressee_id],
+    )
+    requester = db.execute(
+        select(User.id, User.name, User.email).where(
+            User.id == connection.requester_id
+        )
+    ).one()
+    return _build_response(connection, requester)
 
 
 @router.delete("/{connection_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -180,6 +327,10 @@ def delete_connection(
 ) -> None:
     """Remove a connection or reject/cancel a request.
 
+    Removing an accepted connection revokes the shares between the two
+    users at once. Their claims on each other's gifts and each other's
+    lists in their collections are cleaned up by a queued job.
+
     Parameters:
         connection_id: The connection to delete.
         user: The authenticated user.
@@ -193,6 +344,9 @@ def delete_connection(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
     if connection.requester_id != user.id and connection.addressee_id != user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    connection = _lock_connection(db, connection)
+    if connection is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
     if connection.status == "accepted":
         user_a: int = connection.requester_id
@@ -201,52 +355,42 @@ def delete_connection(
         list_ids_a = select(GiftList.id).where(GiftList.owner_id == user_a)
         list_ids_b = select(GiftList.id).where(GiftList.owner_id == user_b)
 
-        # Unclaim gifts claimed by user_b on user_a's lists
-        db.execute(
-            update(Gift)
-            .where(Gift.list_id.in_(list_ids_a), Gift.claimed_by_id == user_b)
-            .values(claimed_by_id=None, claimed_at=None)
-        )
-        # Unclaim gifts claimed by user_a on user_b's lists
-        db.execute(
-            update(Gift)
-            .where(Gift.list_id.in_(list_ids_b), Gift.claimed_by_id == user_a)
-            .values(claimed_by_id=None, claimed_at=None)
-        )
-
         # Revoke shares between both users
-        shares_to_delete: list[ListShare] = db.execute(
-            select(ListShare).where(
-                or_(
-                    (ListShare.list_id.in_(list_ids_a))
-                    & (ListShare.user_id == user_b),
-                    (ListShare.list_id.in_(list_ids_b))
-                    & (ListShare.user_id == user_a),
-                )
-            )
-        ).scalars().all()
-        for share in shares_to_delete:
-            db.delete(share)
-
-        # Remove collection items for both users referencing each other's lists
-        collection_ids_a = select(Collection.id).where(
-            Collection.owner_id == user_a
+        shares_between = or_(
+            (ListShare.list_id.in_(list_ids_a)) & (ListShare.user_id == user_b),
+            (ListShare.list_id.in_(list_ids_b)) & (ListShare.user_id == user_a),
         )
-        collection_ids_b = select(Collection.id).where(
-            Collection.owner_id == user_b
-        )
-        collection_items_to_delete = db.execute(
-            select(CollectionItem).where(
-                or_(
-                    (CollectionItem.collection_id.in_(collection_ids_a))
-                    & (CollectionItem.list_id.in_(list_ids_b)),
-                    (CollectionItem.collection_id.in_(collection_ids_b))
-                    & (CollectionItem.list_id.in_(list_ids_a)),
-                )
+        revoked: list[tuple[int, int, int]] = db.execute(
+            select(ListShare.id, ListShare.list_id, ListShare.user_id).where(
+                shares_between
             )
-        ).scalars().all()
-        for ci in collection_items_to_delete:
-            db.delete(ci)
-
+        ).tuples().all()
+        share_ids = [share_id for share_id, _, _ in revoked]
+        record_changes(db, "share", share_ids, DELETE, [user_a, user_b])
+        for viewer_id in (user_a, user_b):
+            list_ids = [lid for _, lid, uid in revoked if uid == viewer_id]
+            record_changes(db, "list", list_ids, DELETE, [viewer_id])
+        for _, list_id, viewer_id in revoked:
+            publish_list_event_on_commit(
+                db, list_id, "share.revoked", user_id=viewer_id
+            )
+        db.execute(
+            delete(ListShare)
+            .where(shares_between)
+            .execution_options(synchronize_session=False)
+        )
+        invalidate_connections(db, [user_a, user_b])
+        connection_removed(db, user_a, user_b)
+
+        # Unclaiming gifts and pruning collections can wait for the queue
+        enqueue_job(db, CONNECTION_CLEANUP, user_a=user_a, user_b=user_b)
+
+    record_change(
+        db,
+        "connection",
+        connection.id,
+        DELETE,
+        [connection.requester_id, connection.addressee_id],
+    )
     db.delete(connection)
     db.flush()
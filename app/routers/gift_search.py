@@ -0,0 +1,118 @@
+from fastapi import APIRouter, Query
+from sqlalchemy import and_, case, or_, select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.dependencies import CurrentUser, DbSession
+from app.models.gift import Gift
+from app.models.gift_list import GiftList
+from app.models.list_share import ListShare
+from app.pagination import decode_cursor, encode_cursor
+from app.schemas.gift import GiftSearchPage
+
+router = APIRouter(prefix="/gifts", tags=["gifts"])
+
+
+def _relevance(q: str, db: Session) -> tuple:
+    """Build the relevance score and match predicate for a search term.
+
+    MySQL uses the FULLTEXT index on name and description. Other backends,
+    and MySQL with gift_search_fulltext disabled, fall back to substring
+    matching that ranks name hits above description hits. InnoDB only
+    updates FULLTEXT indexes at commit, so the test suite uses the fallback.
+
+    Parameters:
+        q: The search term.
+        db: Database session.
+
+    Returns:
+        Tuple of (score expression, WHERE predicate).
+    """
+    if settings.gift_search_fulltext and db.get_bind().dialect.name == "mysql":
+        score = match(
+            Gift.name, Gift.description, against=q
+        ).in_natural_language_mode()
+        return score, score > 0
+    in_name = Gift.name.contains(q, autoescape=True)
+    in_description = Gift.description.contains(q, autoescape=True)
+    score = case((in_name, 2.0), else_=1.0)
+    return score, or_(in_name, in_description)
+
+
+@router.get("/search", response_model=GiftSearchPage)
+def search_gifts(
+    user: CurrentUser,
+    db: DbSession,
+    q: str = Query(min_length=1, max_length=255),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = None,
+) -> dict:
+    """Search gifts on every list the current user owns or has been shared.
+
+    Results are ordered by relevance, then by newest gift, and paginated
+    with a keyset cursor.
+
+    Parameters:
+        user: The authenticated user.
+        db: Database session.
+        q: The search term.
+        limit: Maximum number of results per page.
+        cursor: next_cursor from the previous page.
+
+    Returns:
+        A page of matching gifts and the cursor for the next page.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    score, predicate = _relevance(q, db)
+    shared_list_ids = select(ListShare.list_id).where(
+        ListShare.user_id == user.id
+    )
+    query = (
+        select(Gift, GiftList.name, GiftList.owner_id, score)
+        .join(GiftList, Gift.list_id == GiftList.id)
+        .where(
+            predicate,
+            or_(
+                GiftList.owner_id == user.id,
+                GiftList.id.in_(shared_list_ids),
+            ),
+        )
+        .order_by(score.desc(), Gift.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        last_score, last_id = decode_cursor(cursor, 2)
+        query = query.where(
+            or_(
+                score < last_score,
+                and_(score == last_score, Gift.id < last_id),
+            )
+        )
+
+    rows = db.execute(query).all()
+    next_cursor: str | None = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([float(rows[-1][3]), rows[-1][0].id])
+
+    items: list[dict] = []
+    for gift, list_name, owner_id, _ in rows:
+        # List owners never see who claimed their gifts
+        is_owner: bool = owner_id == user.id
+        items.append({
+            "id": gift.id,
+            "list_id": gift.list_id,
+            "list_name": list_name,
+            "name": gift.name,
+            "description": gift.description,
+            "url": gift.url,
+            "price": gift.price,
+            "claimed_by_id": None if is_owner else gift.claimed_by_id,
+            "claimed_at": None if is_owner else gift.claimed_at,
+            "created_at": gift.created_at,
+            "updated_at": gift.updated_at,
+        })
+    return {"items": items, "next_cursor": next_cursor}
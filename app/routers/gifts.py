@@ -1,14 +1,142 @@
 from datetime import datetime, timezone
+from decimal import Decimal
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
 
 from app.dependencies import CurrentUser, DbSession, OwnedList, ViewableList
 from app.models.gift import Gift
-from app.schemas.gift import GiftCreate, GiftUpdate
-from app.schemas.gift_list import GiftOwnerRead, GiftRead
+from app.pagination import decode_cursor, encode_cursor, keyset_after
+from app.schemas.gift import GiftBulkUpdate, GiftCreate, GiftUpdate
+from app.schemas.gift_list import (
+    GiftOwnerPage,
+    GiftOwnerRead,
+    GiftRead,
+    GiftViewerPage,
+)
+from app.services.changes import (
+    DELETE,
+    UPSERT,
+    list_audience,
+    record_change,
+    record_changes,
+)
+from app.services.events import publish_list_event_on_commit
+from app.services.link_metadata import enricher
 
 router = APIRouter(prefix="/lists/{list_id}/gifts", tags=["gifts"])
 
+# Metadata scraped from the old URL no longer applies after it changes
+CLEARED_LINK_FIELDS = {
+    "link_title": None,
+    "link_image_url": None,
+    "link_price": None,
+    "link_fetched_at": None,
+}
+
+SORT_COLUMNS = {
+    "price": Gift.price,
+    "created_at": Gift.created_at,
+    "name": Gift.name,
+}
+
+
+def _publish_gift(db: Session, event_type: str, gift: Gift) -> None:
+    publish_list_event_on_commit(
+        db,
+        gift.list_id,
+        event_type,
+        gift={
+            "list_id": gift.list_id,
+            **GiftRead.model_validate(gift).model_dump(mode="json"),
+        },
+    )
+
+
+def _parse_sort_value(sort: str, value):
+    """Convert a cursor's sort value back to the column's Python type."""
+    if value is None or sort == "name":
+        return value
+    try:
+        if sort == "price":
+            return Decimal(value)
+        return datetime.fromisoformat(value)
+    except (ArithmeticError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor.",
+        )
+
+
+@router.get("")
+def list_gifts(
+    gift_list: ViewableList,
+    user: CurrentUser,
+    db: DbSession,
+    claimed: bool | None = None,
+    min_price: Decimal | None = None,
+    max_price: Decimal | None = None,
+    name_prefix: str | None = Query(default=None, max_length=255),
+    sort: str = Query(default="created_at", pattern="^(price|created_at|name)$"),
+    order: str = Query(default="asc", pattern="^(asc|desc)$"),
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = None,
+):
+    is_owner = gift_list.owner_id == user.id
+    if is_owner and claimed is not None:
+        # Owners never learn which of their gifts have been claimed
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="List owners cannot filter by claim status.",
+        )
+
+    column = SORT_COLUMNS[sort]
+    descending = order == "desc"
+    query = select(Gift).where(Gift.list_id == gift_list.id)
+    if claimed is True:
+        query = query.where(Gift.claimed_by_id.is_not(None))
+    elif claimed is False:
+        query = query.where(Gift.claimed_by_id.is_(None))
+    if min_price is not None:
+        query = query.where(Gift.price >= min_price)
+    if max_price is not None:
+        query = query.where(Gift.price <= max_price)
+    if name_prefix:
+        query = query.where(Gift.name.startswith(name_prefix, autoescape=True))
+    if cursor is not None:
+        cursor_sort, cursor_order, value, last_id = decode_cursor(cursor, 4)
+        if (cursor_sort, cursor_order) != (sort, order):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor does not match the requested sort.",
+            )
+        query = query.where(
+            keyset_after(
+                column,
+                _parse_sort_value(sort, value),
+                Gift.id,
+                last_id,
+                descending,
+            )
+        )
+    if descending:
+        query = query.order_by(column.desc(), Gift.id.desc())
+    else:
+        query = query.order_by(column.asc(), Gift.id.asc())
+
+    gifts = db.execute(query.limit(limit + 1)).scalars().all()
+    next_cursor = None
+    if len(gifts) > limit:
+        gifts = gifts[:limit]
+        last = gifts[-1]
+        next_cursor = encode_cursor([sort, order, getattr(last, sort), last.id])
+
+    page = {"items": gifts, "next_cursor": next_cursor}
+    if is_owner:
+        return GiftOwnerPage.model_validate(page)
+    return GiftViewerPage.model_validate(page)
+
 
 @router.post("", response_model=GiftOwnerRead, status_code=status.HTTP_201_CREATED)
 def create_gift(request: GiftCreate, gift_list: OwnedList, db: DbSession):
@@ -21,9 +149,98 @@ def create_gift(request: GiftCreate, gift_list: OwnedList, db: DbSession):
     )
     db.add(gift)
     db.flush()
+    record_change(db, "gift", gift.id, UPSERT, list_audience(db, gift_list))
+    _publish_gift(db, "gift.created", gift)
+    enricher.enqueue_on_commit(db, gift.id, gift.url)
     return gift
 
 
+@router.patch("", response_model=list[GiftOwnerRead])
+def bulk_update_gifts(
+    request: GiftBulkUpdate, gift_list: OwnedList, db: DbSession
+):
+    gift_ids = {item.id for item in request.updates}
+    found = db.execute(
+        select(func.count()).where(
+            Gift.list_id == gift_list.id, Gift.id.in_(gift_ids)
+        )
+    ).scalar_one()
+    if found != len(gift_ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    rows: list[dict] = []
+    url_changed: set[int] = set()
+    for item in request.updates:
+        values = item.model_dump(exclude_unset=True)
+        if len(values) == 1:
+            continue
+        if "url" in values:
+            values.update(CLEARED_LINK_FIELDS)
+            url_changed.add(item.id)
+        rows.append(values)
+    changed = {values["id"] for values in rows}
+    if rows:
+        # One executemany per distinct set of fields
+        db.execute(update(Gift), rows)
+        record_changes(db, "gift", changed, UPSERT, list_audience(db, gift_list))
+    gifts = db.execute(
+        select(Gift)
+        .where(Gift.id.in_(gift_ids))
+        .order_by(Gift.id)
+        .execution_options(populate_existing=True)
+    ).scalars().all()
+    for gift in gifts:
+        if gift.id in changed:
+            _publish_gift(db, "gift.updated", gift)
+        if gift.id in url_changed:
+            enricher.enqueue_on_commit(db, gift.id, gift.url)
+    return gifts
+
+
+@router.delete("", status_code=status.HTTP_204_NO_CONTENT)
+def bulk_delete_gifts(
+    gift_list: OwnedList,
+    db: DbSession,
+    ids: list[int] = Query(min_length=1, max_length=500),
+):
+    gift_ids = set(ids)
+    found, claimed = db.execute(
+        select(func.count(), func.count(Gift.claimed_by_id)).where(
+            Gift.list_id == gift_list.id, Gift.id.in_(gift_ids)
+        )
+    ).one()
+    if found != len(gift_ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if claimed:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Some of these gifts cannot be deleted right now.",
+        )
+
+    # The claim check is repeated in the DELETE so a claim that lands
+    # after the count above still blocks the whole batch
+    result = db.execute(
+        delete(Gift)
+        .where(
+            Gift.list_id == gift_list.id,
+            Gift.id.in_(gift_ids),
+            Gift.claimed_by_id.is_(None),
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+    if result.rowcount != len(gift_ids):
+        # get_db rolls back the partial delete when this propagates
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Some of these gifts cannot be deleted right now.",
+        )
+    record_changes(db, "gift", gift_ids, DELETE, list_audience(db, gift_list))
+    for gift_id in sorted(gift_ids):
+        publish_list_event_on_commit(
+            db, gift_list.id, "gift.deleted", gift_id=gift_id
+        )
+
+
 @router.put("/{gift_id}", response_model=GiftOwnerRead)
 def update_gift(
     gift_id: int, updates: GiftUpdate, gift_list: OwnedList, db: DbSession
@@ -31,9 +248,17 @@ def update_gift(
     gift = db.get(Gift, gift_id)
     if gift is None or gift.list_id != gift_list.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
-    for field, value in updates.model_dump(exclude_unset=True).items():
+    changes = updates.model_dump(exclude_unset=True)
+    url_changed = "url" in changes and changes["url"] != gift.url
+    if url_changed:
+        changes.update(CLEARED_LINK_FIELDS)
+    for field, value in changes.items():
         setattr(gift, field, value)
     db.flush()
+    record_change(db, "gift", gift.id, UPSERT, list_audience(db, gift_list))
+    _publish_gift(db, "gift.updated", gift)
+    if url_changed:
+        enricher.enqueue_on_commit(db, gift.id, gift.url)
     return gift
 
 
@@ -47,8 +272,12 @@ def delete_gift(gift_id: int, gift_list: OwnedList, db: DbSession):
             status_code=status.HTTP_409_CONFLICT,
             detail="This gift cannot be deleted right now.",
         )
+    record_change(db, "gift", gift.id, DELETE, list_audience(db, gift_list))
     db.delete(gift)
     db.flush()
+    publish_list_event_on_commit(
+        db, gift_list.id, "gift.deleted", gift_id=gift_id
+    )
 
 
 @router.post("/{gift_id}/claim", response_model=GiftRead)
@@ -65,6 +294,10 @@ def claim_gift(
     gift.claimed_by_id = user.id
     gift.claimed_at = datetime.now(timezone.utc)
     db.flush()
+    # Claims are hidden from the owner, so only viewers hear about them
+    viewer_ids = list_audience(db, gift_list) - {gift_list.owner_id}
+    record_change(db, "gift", gift.id, UPSERT, viewer_ids)
+    _publish_gift(db, "gift.claimed", gift)
     return gift
 
 
@@ -80,4 +313,7 @@ def unclaim_gift(
     gift.claimed_by_id = None
     gift.claimed_at = None
     db.flush()
+    viewer_ids = list_audience(db, gift_list) - {gift_list.owner_id}
+    record_change(db, "gift", gift.id, UPSERT, viewer_ids)
+    _publish_gift(db, "gift.unclaimed", gift)
     return gift
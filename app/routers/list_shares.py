@@ -2,10 +2,17 @@ from fastapi import APIRouter, HTTPException, status
 from sqlalchemy import select
 
 from app.dependencies import CurrentUser, DbSession, OwnedList, require_connection
-from app.models.collection import Collection
-from app.models.collection_item import CollectionItem
 from app.models.list_share import ListShare
 from app.schemas.list_share import ListShareCreate, ListShareRead
+from app.services.changes import (
+    DELETE,
+    UPSERT,
+    record_change,
+    record_list_visible,
+)
+from app.services.cleanup import SHARE_CLEANUP
+from app.services.events import publish_list_event_on_commit
+from app.services.jobs import enqueue_job
 
 router = APIRouter(prefix="/lists/{list_id}/shares", tags=["shares"])
 
@@ -31,6 +38,13 @@ def create_share(
     share = ListShare(list_id=gift_list.id, user_id=request.user_id)
     db.add(share)
     db.flush()
+    record_change(
+        db, "share", share.id, UPSERT, [gift_list.owner_id, request.user_id]
+    )
+    record_list_visible(db, gift_list.id, request.user_id)
+    publish_list_event_on_commit(
+        db, gift_list.id, "share.created", user_id=request.user_id
+    )
     return share
 
 
@@ -52,17 +66,12 @@ def delete_share(user_id: int, gift_list: OwnedList, db: DbSession):
     ).scalar_one_or_none()
     if share is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    record_change(db, "share", share.id, DELETE, [gift_list.owner_id, user_id])
+    record_change(db, "list", gift_list.id, DELETE, [user_id])
     db.delete(share)
-
-    # Remove this list from any collections owned by the unshared user
-    collection_ids = select(Collection.id).where(Collection.owner_id == user_id)
-    items_to_delete = db.execute(
-        select(CollectionItem).where(
-            CollectionItem.collection_id.in_(collection_ids),
-            CollectionItem.list_id == gift_list.id,
-        )
-    ).scalars().all()
-    for item in items_to_delete:
-        db.delete(item)
-
+    # The queue removes the list from the unshared user's collections
+    enqueue_job(db, SHARE_CLEANUP, list_id=gift_list.id, user_id=user_id)
     db.flush()
+    publish_list_event_on_commit(
+        db, gift_list.id, "share.revoked", user_id=user_id
+    )
@@ -1,7 +1,14 @@
-from fastapi import APIRouter, Query, status
-from sqlalchemy import select, or_
+from tempfile import SpooledTemporaryFile
 
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select, or_
+
+from app.config import settings
 from app.dependencies import CurrentUser, DbSession, OwnedList, ViewableList
+from app.models.collection_item import CollectionItem
+from app.models.gift import Gift
 from app.models.gift_list import GiftList
 from app.models.list_share import ListShare
 from app.schemas.gift_list import (
@@ -11,9 +18,26 @@ from app.schemas.gift_list import (
     GiftListRead,
     GiftListUpdate,
 )
+from app.schemas.gift import GiftImportResult
+from app.services.changes import (
+    DELETE,
+    UPSERT,
+    list_audience,
+    record_change,
+    record_collections_touching,
+)
+from app.services.events import publish_list_event_on_commit, stream_list_events
+from app.services.gift_io import CSV, NDJSON, export_gifts, import_gifts, read_rows
 
 router = APIRouter(prefix="/lists", tags=["lists"])
 
+IMPORT_CONTENT_TYPES = {
+    "text/csv": CSV,
+    "application/x-ndjson": NDJSON,
+    "application/jsonl": NDJSON,
+}
+EXPORT_MEDIA_TYPES = {CSV: "text/csv", NDJSON: "application/x-ndjson"}
+
 
 @router.post("", response_model=GiftListRead, status_code=status.HTTP_201_CREATED)
 def create_list(request: GiftListCreate, user: CurrentUser, db: DbSession):
@@ -24,6 +48,7 @@ def create_list(request: GiftListCreate, user: CurrentUser, db: DbSession):
     )
     db.add(gift_list)
     db.flush()
+    record_change(db, "list", gift_list.id, UPSERT, [user.id])
     return gift_list
 
 
@@ -60,6 +85,84 @@ def get_list(gift_list: ViewableList, user: CurrentUser):
     return GiftListDetailViewer.model_validate(gift_list)
 
 
+@router.get("/{list_id}/events")
+def list_events(gift_list: ViewableList, user: CurrentUser, db: DbSession):
+    stream = stream_list_events(
+        gift_list.id,
+        user.id,
+        gift_list.owner_id,
+        settings.event_keepalive_seconds,
+    )
+    # Idle streams must not hold a pooled connection open
+    db.close()
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/{list_id}/import", response_model=GiftImportResult)
+async def import_list(request: Request, gift_list: OwnedList, db: DbSession):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    fmt = IMPORT_CONTENT_TYPES.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Upload text/csv or application/x-ndjson.",
+        )
+
+    # Spill large uploads to disk instead of holding them in memory
+    with SpooledTemporaryFile(max_size=1024 * 1024) as upload:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > settings.import_max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_CONTENT_TOO_LARGE
+                )
+            upload.write(chunk)
+        upload.seek(0)
+
+        def run_import() -> dict:
+            try:
+                rows = read_rows(upload, fmt)
+                result = import_gifts(
+                    db, gift_list, rows, settings.import_batch_size
+                )
+            except ValueError as error:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)
+                )
+            db.flush()
+            return result
+
+        result = await run_in_threadpool(run_import)
+
+    if result["imported"]:
+        publish_list_event_on_commit(
+            db, gift_list.id, "gifts.imported", count=result["imported"]
+        )
+    return result
+
+
+@router.get("/{list_id}/export")
+def export_list(
+    gift_list: OwnedList,
+    db: DbSession,
+    format: str = Query(default=CSV, pattern="^(csv|ndjson)$"),
+):
+    return StreamingResponse(
+        export_gifts(db, gift_list.id, format, settings.import_batch_size),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="list-{gift_list.id}.{format}"'
+            )
+        },
+    )
+
+
 @router.put("/{list_id}", response_model=GiftListRead)
 def update_list(
     updates: GiftListUpdate, gift_list: OwnedList, db: DbSession
@@ -67,10 +170,33 @@ def update_list(
     for field, value in updates.model_dump(exclude_unset=True).items():
         setattr(gift_list, field, value)
     db.flush()
+    record_change(db, "list", gift_list.id, UPSERT, list_audience(db, gift_list))
+    publish_list_event_on_commit(
+        db,
+        gift_list.id,
+        "list.updated",
+        list={
+            "id": gift_list.id,
+            "name": gift_list.name,
+            "description": gift_list.description,
+        },
+    )
     return gift_list
 
 
 @router.delete("/{list_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_list(gift_list: OwnedList, db: DbSession):
-    db.delete(gift_list)
-    db.flush()
+    audience = list_audience(db, gift_list)
+    record_change(db, "list", gift_list.id, DELETE, audience)
+    record_collections_touching(db, [gift_list.id], audience)
+    list_id = gift_list.id
+    # Rows referencing the list go first, one statement per table
+    db.expunge(gift_list)
+    for model in (CollectionItem, ListShare, Gift):
+        db.execute(
+            delete(model)
+            .where(model.list_id == list_id)
+            .execution_options(synchronize_session=False)
+        )
+    db.execute(delete(GiftList).where(GiftList.id == list_id))
+    publish_list_event_on_commit(db, list_id, "list.deleted", list_id=list_id)
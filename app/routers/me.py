@@ -0,0 +1,110 @@
+from decimal import Decimal
+
+from fastapi import APIRouter
+from sqlalchemy import func, select
+
+from app.dependencies import CurrentUser, DbSession
+from app.models.connection import Connection
+from app.models.gift import Gift
+from app.models.gift_list import GiftList
+from app.models.list_share import ListShare
+from app.models.user import User
+from app.schemas.me import ClaimGroupRead, CountersRead
+
+router = APIRouter(prefix="/me", tags=["me"])
+
+
+@router.get("/claims", response_model=list[ClaimGroupRead])
+def list_claims(user: CurrentUser, db: DbSession) -> list[dict]:
+    """List every gift the current user has claimed, grouped by recipient.
+
+    Parameters:
+        user: The authenticated user.
+        db: Database session.
+
+    Returns:
+        One group per list owner with gift count and price total.
+    """
+    rows = db.execute(
+        select(
+            Gift.id,
+            Gift.list_id,
+            GiftList.name.label("list_name"),
+            Gift.name,
+            Gift.description,
+            Gift.url,
+            Gift.price,
+            Gift.claimed_at,
+            User.id.label("owner_id"),
+            User.name.label("owner_name"),
+        )
+        .join(GiftList, Gift.list_id == GiftList.id)
+        .join(User, GiftList.owner_id == User.id)
+        .where(Gift.claimed_by_id == user.id)
+        .order_by(User.name, User.id, GiftList.id, Gift.id)
+    ).all()
+
+    groups: dict[int, dict] = {}
+    for row in rows:
+        group: dict = groups.setdefault(row.owner_id, {
+            "owner_id": row.owner_id,
+            "owner_name": row.owner_name,
+            "gift_count": 0,
+            "total_price": Decimal("0"),
+            "gifts": [],
+        })
+        group["gift_count"] += 1
+        if row.price is not None:
+            group["total_price"] += row.price
+        group["gifts"].append({
+            "id": row.id,
+            "list_id": row.list_id,
+            "list_name": row.list_name,
+            "name": row.name,
+            "description": row.description,
+            "url": row.url,
+            "price": row.price,
+            "claimed_at": row.claimed_at,
+        })
+    return list(groups.values())
+
+
+@router.get("/counters", response_model=CountersRead)
+def get_counters(user: CurrentUser, db: DbSession) -> dict:
+    """Count what the current user's badges show, in one aggregate query.
+
+    Parameters:
+        user: The authenticated user.
+        db: Database session.
+
+    Returns:
+        Pending incoming connection requests, lists shared with the
+        user, and unclaimed gifts on those lists.
+    """
+    pending_requests = (
+        select(func.count())
+        .select_from(Connection)
+        .where(Connection.addressee_id == user.id, Connection.status == "pending")
+        .scalar_subquery()
+    )
+    shared_lists = (
+        select(func.count())
+        .select_from(ListShare)
+        .where(ListShare.user_id == user.id)
+        .scalar_subquery()
+    )
+    unclaimed_gifts = (
+        select(func.count())
+        .select_from(ListShare)
+        .join(Gift, Gift.list_id == ListShare.list_id)
+        .where(ListShare.user_id == user.id, Gift.claimed_by_id.is_(None))
+        .scalar_subquery()
+    )
+    row = db.execute(
+        select(
+            pending_requests.label("pending_requests"),
+            shared_lists.label("shared_lists"),
+            unclaimed_gifts.label("unclaimed_gifts"),
+        )
+    ).one()
+    return row._asdict()
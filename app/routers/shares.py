@@ -0,0 +1,100 @@
+from fastapi import APIRouter
+from sqlalchemy import insert, select, tuple_
+
+from app.dependencies import CurrentUser, DbSession
+from app.models.gift_list import GiftList
+from app.models.list_share import ListShare
+from app.schemas.list_share import ListShareBatchCreate, ListShareBatchResult
+from app.services.changes import UPSERT, record_changes, record_lists_visible
+from app.services.connection_graph import connection_index
+from app.services.events import publish_list_event_on_commit
+
+router = APIRouter(prefix="/shares", tags=["shares"])
+
+
+@router.post("/batch", response_model=ListShareBatchResult)
+def create_shares(
+    request: ListShareBatchCreate, user: CurrentUser, db: DbSession
+) -> dict:
+    """Share every requested list with every requested user.
+
+    Each (list, user) pair is created, skipped if the share already
+    exists, or forbidden if the caller doesn't own the list or isn't
+    connected to the user. Forbidden pairs don't stop the others.
+
+    Parameters:
+        request: The list IDs and user IDs to pair up.
+        user: The authenticated user.
+        db: Database session.
+
+    Returns:
+        The created, skipped and forbidden pairs.
+    """
+    list_ids = list(dict.fromkeys(request.list_ids))
+    user_ids = list(dict.fromkeys(request.user_ids))
+
+    owned = set(
+        db.execute(
+            select(GiftList.id).where(
+                GiftList.id.in_(list_ids), GiftList.owner_id == user.id
+            )
+        ).scalars()
+    )
+    connected = set(connection_index.connections(db, user.id)) & set(user_ids)
+
+    allowed: list[tuple[int, int]] = []
+    forbidden: list[tuple[int, int]] = []
+    for list_id in list_ids:
+        for user_id in user_ids:
+            if list_id in owned and user_id in connected:
+                allowed.append((list_id, user_id))
+            else:
+                forbidden.append((list_id, user_id))
+
+    existing: set[tuple[int, int]] = set()
+    created: list[tuple[int, int]] = []
+    if allowed:
+        pairs = tuple_(ListShare.list_id, ListShare.user_id).in_(allowed)
+        existing = set(
+            db.execute(select(ListShare.list_id, ListShare.user_id).where(pairs))
+            .tuples()
+        )
+        new_pairs = [pair for pair in allowed if pair not in existing]
+        if new_pairs:
+            # A share created concurrently is ignored rather than failing the batch
+            db.execute(
+                insert(ListShare).prefix_with("IGNORE", dialect="mysql"),
+                [
+                    {"list_id": list_id, "user_id": user_id}
+                    for list_id, user_id in new_pairs
+                ],
+            )
+            rows = db.execute(
+                select(ListShare.id, ListShare.list_id, ListShare.user_id).where(
+                    tuple_(ListShare.list_id, ListShare.user_id).in_(new_pairs)
+                )
+            ).all()
+            share_ids: dict[int, list[int]] = {}
+            for share_id, _, user_id in rows:
+                share_ids.setdefault(user_id, []).append(share_id)
+            record_changes(db, "share", [row.id for row in rows], UPSERT, [user.id])
+            for user_id, ids in share_ids.items():
+                record_changes(db, "share", ids, UPSERT, [user_id])
+            created_pairs = {(row.list_id, row.user_id) for row in rows}
+            created = [pair for pair in new_pairs if pair in created_pairs]
+            record_lists_visible(db, created)
+            for list_id, user_id in created:
+                publish_list_event_on_commit(
+                    db, list_id, "share.created", user_id=user_id
+                )
+
+    skipped = [pair for pair in allowed if pair not in created]
+    return {
+        "created": _pairs(created),
+        "skipped": _pairs(skipped),
+        "forbidden": _pairs(forbidden),
+    }
+
+
+def _pairs(pairs: list[tuple[int, int]]) -> list[dict]:
+    return [{"list_id": list_id, "user_id": user_id} for list_id, user_id in pairs]
@@ -0,0 +1,245 @@
+from fastapi import APIRouter, HTTPException, status
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.dependencies import CurrentUser, DbSession
+from app.models.change import Change
+from app.models.collection import Collection
+from app.models.collection_item import CollectionItem
+from app.models.connection import Connection
+from app.models.gift import Gift
+from app.models.gift_list import GiftList
+from app.models.list_share import ListShare
+from app.models.user import User
+from app.pagination import decode_cursor, encode_cursor
+from app.schemas.sync import SyncResponse
+from app.services.changes import UPSERT, pruned_change_id, settled_change_id
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+ENTITY_KEYS: dict[str, str] = {
+    "list": "lists",
+    "gift": "gifts",
+    "share": "shares",
+    "collection": "collections",
+    "connection": "connections",
+}
+
+
+def _visible_lists(user: User) -> ColumnElement:
+    """Build the predicate for lists the user owns or has been shared."""
+    shared_list_ids = select(ListShare.list_id).where(
+        ListShare.user_id == user.id
+    )
+    return or_(
+        GiftList.owner_id == user.id,
+        GiftList.id.in_(shared_list_ids),
+    )
+
+
+def _load_lists(db: Session, user: User, ids: set[int] | None) -> list[dict]:
+    query = (
+        select(
+            GiftList.id,
+            GiftList.name,
+            GiftList.description,
+            GiftList.owner_id,
+            User.name.label("owner_name"),
+            GiftList.created_at,
+            GiftList.updated_at,
+        )
+        .join(User, GiftList.owner_id == User.id)
+        .where(_visible_lists(user))
+    )
+    if ids is not None:
+        query = query.where(GiftList.id.in_(ids))
+    return [row._asdict() for row in db.execute(query)]
+
+
+def _load_gifts(db: Session, user: User, ids: set[int] | None) -> list[dict]:
+    query = (
+        select(Gift, GiftList.owner_id)
+        .join(GiftList, Gift.list_id == GiftList.id)
+        .where(_visible_lists(user))
+    )
+    if ids is not None:
+        query = query.where(Gift.id.in_(ids))
+    gifts: list[dict] = []
+    for gift, owner_id in db.execute(query):
+        is_owner: bool = owner_id == user.id
+        gifts.append({
+            "id": gift.id,
+            "list_id": gift.list_id,
+            "name": gift.name,
+            "description": gift.description,
+            "url": gift.url,
+            "price": gift.price,
+            "claimed_by_id": None if is_owner else gift.claimed_by_id,
+            "claimed_at": None if is_owner else gift.claimed_at,
+            "created_at": gift.created_at,
+            "updated_at": gift.updated_at,
+        })
+    return gifts
+
+
+def _load_shares(db: Session, user: User, ids: set[int] | None) -> list[dict]:
+    owned_list_ids = select(GiftList.id).where(GiftList.owner_id == user.id)
+    query = select(ListShare).where(
+        or_(
+            ListShare.list_id.in_(owned_list_ids),
+            ListShare.user_id == user.id,
+        )
+    )
+    if ids is not None:
+        query = query.where(ListShare.id.in_(ids))
+    return [
+        {
+            "id": share.id,
+            "list_id": share.list_id,
+            "user_id": share.user_id,
+            "created_at": share.created_at,
+        }
+        for share in db.execute(query).scalars()
+    ]
+
+
+def _load_collections(db: Session, user: User, ids: set[int] | None) -> list[dict]:
+    query = select(Collection).where(Collection.owner_id == user.id)
+    if ids is not None:
+        query = query.where(Collection.id.in_(ids))
+    collections: list[Collection] = db.execute(query).scalars().all()
+    if not collections:
+        return []
+
+    list_ids: dict[int, list[int]] = {c.id: [] for c in collections}
+    items = db.execute(
+        select(CollectionItem.collection_id, CollectionItem.list_id).where(
+            CollectionItem.collection_id.in_(list_ids)
+        )
+    )
+    for collection_id, list_id in items:
+        list_ids[collection_id].append(list_id)
+    return [
+        {
+            "id": c.id,
+            "name": c.name,
+            "description": c.description,
+            "owner_id": c.owner_id,
+            "rules": c.rules,
+            "list_ids": list_ids[c.id],
+            "created_at": c.created_at,
+            "updated_at": c.updated_at,
+        }
+        for c in collections
+    ]
+
+
+def _load_connections(db: Session, user: User, ids: set[int] | None) -> list[dict]:
+    query = (
+        select(Connection, User.id, User.name, User.email)
+        .join(User, User.id == Connection.other_user_id(user.id))
+        .where(Connection.involving(user.id))
+    )
+    if ids is not None:
+        query = query.where(Connection.id.in_(ids))
+    return [
+        {
+            "id": connection.id,
+            "status": connection.status,
+            "user": {"id": other, "name": name, "email": email},
+            "created_at": connection.created_at,
+            "accepted_at": connection.accepted_at,
+        }
+        for connection, other, name, email in db.execute(query)
+    ]
+
+
+LOADERS = {
+    "list": _load_lists,
+    "gift": _load_gifts,
+    "share": _load_shares,
+    "collection": _load_collections,
+    "connection": _load_connections,
+}
+
+
+@router.get("", response_model=SyncResponse)
+def sync(user: CurrentUser, db: DbSession, since: str | None = None) -> dict:
+    """Return everything that changed for the current user since a token.
+
+    Without a token, returns a full snapshot of the user's lists, gifts,
+    shares, collections and connections. With a token from a previous
+    response, returns only rows created or updated since then, plus
+    tombstones for rows that were deleted or are no longer visible.
+    Changes younger than change_settle_seconds are sent again by the
+    next sync, since older ones may still have been committing. Changes
+    older than change_retention_days are pruned, and a token from
+    before them has to be replaced by a full sync.
+
+    Parameters:
+        user: The authenticated user.
+        db: Database session.
+        since: The token from the previous sync, if any.
+
+    Returns:
+        The changed rows, tombstones, and the token for the next sync.
+
+    Raises:
+        HTTPException: 400 if the token is malformed, 410 if it's older
+            than the pruned part of the change feed.
+    """
+    # A full snapshot already covers every change that has been pruned
+    since_id = horizon = pruned_change_id(db)
+    if since is not None:
+        (since_id,) = decode_cursor(since, 1)
+        if since_id < horizon:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Sync token expired; sync again without since.",
+            )
+    # The token trails behind changes that may still have earlier IDs
+    # in flight, so the next sync reads those again rather than skipping
+    # whatever commits underneath them
+    token_id: int = settled_change_id(db, user.id, since_id)
+
+    upserts: dict[str, set[int]] | None = None
+    deleted: set[tuple[str, int]] = set()
+    if since is not None:
+        changes = db.execute(
+            select(Change.entity, Change.entity_id, Change.op)
+            .where(Change.user_id == user.id, Change.id > since_id)
+            .order_by(Change.id)
+        ).all()
+        # Only the most recent op for each row matters
+        last_ops: dict[tuple[str, int], str] = {}
+        for entity, entity_id, op in changes:
+            last_ops[(entity, entity_id)] = op
+        upserts = {entity: set() for entity in LOADERS}
+        for (entity, entity_id), op in last_ops.items():
+            if op == UPSERT:
+                upserts[entity].add(entity_id)
+            else:
+                deleted.add((entity, entity_id))
+
+    payload: dict = {}
+    for entity, loader in LOADERS.items():
+        ids: set[int] | None = None
+        if upserts is not None:
+            ids = upserts[entity]
+            if not ids:
+                payload[ENTITY_KEYS[entity]] = []
+                continue
+        rows = loader(db, user, ids)
+        payload[ENTITY_KEYS[entity]] = rows
+        if ids is not None:
+            # Rows that changed but can no longer be loaded are gone
+            found: set[int] = {row["id"] for row in rows}
+            deleted.update((entity, entity_id) for entity_id in ids - found)
+
+    payload["deleted"] = [
+        {"entity": entity, "id": entity_id}
+        for entity, entity_id in sorted(deleted)
+    ]
+    payload["token"] = encode_cursor([token_id])
+    return payload
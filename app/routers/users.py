@@ -1,17 +1,88 @@
-from fastapi import APIRouter, HTTPException, Response, status
-from sqlalchemy import select
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from sqlalchemy import func, select
 
-from app.dependencies import AdminUser, DbSession
+from app.dependencies import AdminUser, CurrentUser, DbSession
+from app.models.gift_list import GiftList
 from app.models.user import User
-from app.schemas.user import UserRead, UserUpdate
+from app.pagination import decode_cursor, encode_cursor
+from app.schemas.user import UserPage, UserRead, UserSearchResult, UserUpdate
+from app.services import user_search
+from app.services.cleanup import USER_CLEANUP
+from app.services.jobs import enqueue_job
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
-@router.get("", response_model=list[UserRead])
-def list_users(admin: AdminUser, db: DbSession):
-    users = db.execute(select(User)).scalars().all()
-    return users
+@router.get("", response_model=UserPage)
+def list_users(
+    admin: AdminUser,
+    db: DbSession,
+    include: str | None = Query(default=None, pattern="^lists$"),
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = None,
+):
+    """List users a page at a time, in ID order.
+
+    Each user's list count comes from one GROUP BY. Their lists (without
+    gifts) are loaded for the whole page in one more query, and only
+    with include=lists.
+    """
+    query = (
+        select(
+            User.id,
+            User.email,
+            User.name,
+            User.role,
+            User.is_active,
+            func.count(GiftList.id).label("list_count"),
+            User.created_at,
+            User.updated_at,
+        )
+        .outerjoin(GiftList, GiftList.owner_id == User.id)
+        .group_by(User.id)
+        .order_by(User.id)
+    )
+    if cursor is not None:
+        (last_id,) = decode_cursor(cursor, 1)
+        query = query.where(User.id > last_id)
+    rows = db.execute(query.limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].id])
+
+    items = [row._asdict() for row in rows]
+    if include == "lists":
+        names = {item["id"]: item["name"] for item in items}
+        lists: dict[int, list[dict]] = {user_id: [] for user_id in names}
+        for gift_list in db.execute(
+            select(
+                GiftList.id,
+                GiftList.name,
+                GiftList.description,
+                GiftList.owner_id,
+                GiftList.created_at,
+                GiftList.updated_at,
+            )
+            .where(GiftList.owner_id.in_(names))
+            .order_by(GiftList.id)
+        ):
+            lists[gift_list.owner_id].append(
+                {**gift_list._asdict(), "owner_name": names[gift_list.owner_id]}
+            )
+        for item in items:
+            item["lists"] = lists[item["id"]]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/search", response_model=list[UserSearchResult])
+def search_users(
+    user: CurrentUser,
+    db: DbSession,
+    q: str = Query(min_length=1, max_length=255),
+    limit: int = Query(default=10, ge=1, le=25),
+):
+    return user_search.search_users(db, user.id, q, limit)
 
 
 @router.get("/{user_id}", response_model=UserRead)
@@ -40,5 +111,8 @@ def delete_user(user_id: int, admin: AdminUser, db: DbSession):
     user = db.get(User, user_id)
     if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
-    db.delete(user)
+    # Deactivating locks the user out at once; the queue removes their
+    # data and then the user row
+    user.is_active = False
+    enqueue_job(db, USER_CLEANUP, user_id=user.id)
     db.flush()
@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+
+
+class CacheStats(BaseModel):
+    """Schema for an in-process cache's size and effectiveness."""
+
+    users: int
+    hits: int
+    misses: int
+    hit_ratio: float
+    invalidations: int
+
+
+class JobQueueStats(BaseModel):
+    """Schema for the background job queue's depth and lag."""
+
+    depth: int
+    failed: int
+    lag_seconds: int
+
+
+class AdminStats(BaseModel):
+    """Schema for runtime statistics."""
+
+    connections: CacheStats
+    jobs: JobQueueStats
@@ -1,15 +1,34 @@
 from datetime import datetime
+from decimal import Decimal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 
 from app.schemas.gift_list import GiftListRead
 
 
+class SmartRules(BaseModel):
+    """Schema for a smart collection's rules.
+
+    A smart collection holds every list shared with its owner that
+    matches all of the rules given.
+    """
+
+    shared_by: int | None = None
+    unclaimed_under: Decimal | None = None
+
+    @model_validator(mode="after")
+    def require_a_rule(self) -> "SmartRules":
+        if self.shared_by is None and self.unclaimed_under is None:
+            raise ValueError("At least one rule is required.")
+        return self
+
+
 class CollectionCreate(BaseModel):
     """Schema for creating a new collection."""
 
     name: str
     description: str | None = None
+    rules: SmartRules | None = None
 
 
 class CollectionUpdate(BaseModel):
@@ -17,36 +36,77 @@ class CollectionUpdate(BaseModel):
 
     name: str | None = None
     description: str | None = None
+    rules: SmartRules | None = None
 
 
-class CollectionRead(BaseModel):
-    """Schema for reading a collection without nested lists."""
+class CollectionSummary(BaseModel):
+    """Schema for a collection's own fields."""
 
     id: int
     name: str
     description: str | None
     owner_id: int
+    rules: SmartRules | None = None
     created_at: datetime
     updated_at: datetime
 
     model_config = {"from_attributes": True}
 
 
-class CollectionDetail(BaseModel):
-    """Schema for reading a collection with its nested gift lists."""
+class CollectionTotals(BaseModel):
+    """Schema for gift totals across one or more lists.
 
-    id: int
-    name: str
-    description: str | None
-    owner_id: int
-    lists: list[GiftListRead]
-    created_at: datetime
-    updated_at: datetime
+    unclaimed_count leaves out the owner's own lists, whose claims are
+    hidden from them.
+    """
+
+    gift_count: int
+    claimed_by_me: int
+    my_spend: Decimal
+    unclaimed_count: int
 
-    model_config = {"from_attributes": True}
+
+class CollectionRead(CollectionSummary, CollectionTotals):
+    """Schema for reading a collection with totals but without nested lists."""
+
+
+class CollectionListRead(GiftListRead):
+    """Schema for a gift list in a collection, with its own totals.
+
+    unclaimed_count is None on the owner's own lists.
+    """
+
+    gift_count: int
+    claimed_by_me: int
+    my_spend: Decimal
+    unclaimed_count: int | None
+
+
+class CollectionDetail(CollectionSummary, CollectionTotals):
+    """Schema for reading a collection with its nested gift lists."""
+
+    lists: list[CollectionListRead]
 
 
 class CollectionItemCreate(BaseModel):
     """Schema for adding a gift list to a collection."""
 
     list_id: int
+
+
+class CollectionItemsUpdate(BaseModel):
+    """Schema for replacing or changing the lists in a collection.
+
+    Send list_ids to replace the whole set, or add and remove to apply
+    a diff.
+    """
+
+    list_ids: list[int] | None = Field(default=None, max_length=1000)
+    add: list[int] = Field(default=[], max_length=1000)
+    remove: list[int] = Field(default=[], max_length=1000)
+
+    @model_validator(mode="after")
+    def require_set_or_diff(self) -> "CollectionItemsUpdate":
+        if self.list_ids is not None and (self.add or self.remove):
+            raise ValueError("Send either list_ids or add/remove, not both.")
+        return self
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, Field, model_validator
 
 
 class ConnectionCreate(BaseModel):
@@ -30,3 +30,21 @@ class ConnectionRead(BaseModel):
     accepted_at: datetime | None
 
     model_config = {"from_attributes": True}
+
+
+class ConnectionSuggestionRead(BaseModel):
+    id: int
+    name: str
+    mutual_count: int
+
+
+class ContactLookup(BaseModel):
+    emails: list[str] = Field(default=[], max_length=5000)
+    hashes: list[str] = Field(default=[], max_length=5000)
+
+
+class ContactMatch(BaseModel):
+    key: str
+    user_id: int
+    name: str
+    status: str
@@ -1,6 +1,7 @@
+from datetime import datetime
 from decimal import Decimal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class GiftCreate(BaseModel):
@@ -15,3 +16,64 @@ class GiftUpdate(BaseModel):
     description: str | None = None
     url: str | None = None
     price: Decimal | None = None
+
+    @field_validator("name")
+    @classmethod
+    def reject_null_name(cls, name: str | None) -> str:
+        # Omitting name leaves it alone; sending null can't clear it
+        if name is None:
+            raise ValueError("name cannot be null.")
+        return name
+
+
+class GiftBulkUpdateItem(GiftUpdate):
+    id: int
+
+
+class GiftBulkUpdate(BaseModel):
+    """Per-gift changes, e.g. a new price for each gift."""
+
+    updates: list[GiftBulkUpdateItem] = Field(min_length=1, max_length=500)
+
+    @model_validator(mode="after")
+    def require_unique_ids(self) -> "GiftBulkUpdate":
+        if len({item.id for item in self.updates}) != len(self.updates):
+            raise ValueError("Each gift can only appear once.")
+        return self
+
+
+class GiftImportRow(BaseModel):
+    name: str = Field(min_length=1, max_length=255)
+    description: str | None = Field(default=None, max_length=500)
+    url: str | None = Field(default=None, max_length=2048)
+    price: Decimal | None = Field(default=None, max_digits=10, decimal_places=2)
+
+
+class GiftImportError(BaseModel):
+    line: int
+    error: str
+
+
+class GiftImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: list[GiftImportError]
+
+
+class GiftSearchResult(BaseModel):
+    id: int
+    list_id: int
+    list_name: str
+    name: str
+    description: str | None
+    url: str | None
+    price: Decimal | None
+    claimed_by_id: int | None
+    claimed_at: datetime | None
+    created_at: datetime
+    updated_at: datetime
+
+
+class GiftSearchPage(BaseModel):
+    items: list[GiftSearchResult]
+    next_cursor: str | None
@@ -20,6 +20,9 @@ class GiftOwnerRead(BaseModel):
     description: str | None
     url: str | None
     price: Decimal | None
+    link_title: str | None = None
+    link_image_url: str | None = None
+    link_price: Decimal | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -34,12 +37,25 @@ class GiftRead(BaseModel):
     price: Decimal | None
     claimed_by_id: int | None
     claimed_at: datetime | None
+    link_title: str | None = None
+    link_image_url: str | None = None
+    link_price: Decimal | None = None
     created_at: datetime
     updated_at: datetime
 
     model_config = {"from_attributes": True}
 
 
+class GiftOwnerPage(BaseModel):
+    items: list[GiftOwnerRead]
+    next_cursor: str | None
+
+
+class GiftViewerPage(BaseModel):
+    items: list[GiftRead]
+    next_cursor: str | None
+
+
 class GiftListRead(BaseModel):
     id: int
     name: str
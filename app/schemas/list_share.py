@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ListShareCreate(BaseModel):
@@ -14,3 +14,19 @@ class ListShareRead(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class ListShareBatchCreate(BaseModel):
+    list_ids: list[int] = Field(min_length=1, max_length=100)
+    user_ids: list[int] = Field(min_length=1, max_length=100)
+
+
+class ListSharePair(BaseModel):
+    list_id: int
+    user_id: int
+
+
+class ListShareBatchResult(BaseModel):
+    created: list[ListSharePair]
+    skipped: list[ListSharePair]
+    forbidden: list[ListSharePair]
@@ -0,0 +1,35 @@
+from datetime import datetime
+from decimal import Decimal
+
+from pydantic import BaseModel
+
+
+class ClaimedGiftRead(BaseModel):
+    """Schema for a gift the current user has claimed."""
+
+    id: int
+    list_id: int
+    list_name: str
+    name: str
+    description: str | None
+    url: str | None
+    price: Decimal | None
+    claimed_at: datetime | None
+
+
+class CountersRead(BaseModel):
+    """Schema for the current user's badge counts."""
+
+    pending_requests: int
+    shared_lists: int
+    unclaimed_gifts: int
+
+
+class ClaimGroupRead(BaseModel):
+    """Schema for the current user's claims on one recipient's lists."""
+
+    owner_id: int
+    owner_name: str
+    gift_count: int
+    total_price: Decimal
+    gifts: list[ClaimedGiftRead]
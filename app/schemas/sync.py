@@ -0,0 +1,52 @@
+from datetime import datetime
+from decimal import Decimal
+
+from pydantic import BaseModel
+
+from app.schemas.collection import CollectionSummary
+from app.schemas.connection import ConnectionRead
+from app.schemas.gift_list import GiftListRead
+from app.schemas.list_share import ListShareRead
+
+
+class SyncGiftRead(BaseModel):
+    """Schema for a gift in a sync payload. Claims are hidden from owners."""
+
+    id: int
+    list_id: int
+    name: str
+    description: str | None
+    url: str | None
+    price: Decimal | None
+    claimed_by_id: int | None
+    claimed_at: datetime | None
+    created_at: datetime
+    updated_at: datetime
+
+
+class SyncCollectionRead(CollectionSummary):
+    """Schema for a collection in a sync payload, with its list IDs."""
+
+    list_ids: list[int]
+
+
+class SyncTombstone(BaseModel):
+    """Schema for a row the client should drop.
+
+    A deleted list implies that its gifts are gone too.
+    """
+
+    entity: str
+    id: int
+
+
+class SyncResponse(BaseModel):
+    """Schema for a sync payload and the token to sync from next time."""
+
+    token: str
+    lists: list[GiftListRead]
+    gifts: list[SyncGiftRead]
+    shares: list[ListShareRead]
+    collections: list[SyncCollectionRead]
+    connections: list[ConnectionRead]
+    deleted: list[SyncTombstone]
@@ -18,6 +18,34 @@ class UserRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class UserSummary(BaseModel):
+    """Schema for a user in the admin listing.
+
+    lists is only filled in when asked for with include=lists.
+    """
+
+    id: int
+    email: str
+    name: str
+    role: str
+    is_active: bool
+    list_count: int
+    lists: list[GiftListRead] | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class UserPage(BaseModel):
+    items: list[UserSummary]
+    next_cursor: str | None
+
+
+class UserSearchResult(BaseModel):
+    id: int
+    name: str
+    relationship: str
+
+
 class UserUpdate(BaseModel):
     email: str | None = None
     name: str | None = None
@@ -0,0 +1,238 @@
+from collections.abc import Iterable
+
+from sqlalchemy import Select, func, insert, literal, literal_column, select, tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.config import settings
+from app.models.change import Change
+from app.models.change_horizon import ChangeHorizon
+from app.models.collection import Collection
+from app.models.collection_item import CollectionItem
+from app.models.gift import Gift
+from app.models.gift_list import GiftList
+from app.models.list_share import ListShare
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+
+def record_change(
+    db: Session,
+    entity: str,
+    entity_id: int,
+    op: str,
+    user_ids: Iterable[int],
+) -> None:
+    """Append a change to the sync feed of every affected user.
+
+    Parameters:
+        db: Database session.
+        entity: One of "list", "gift", "share", "collection", "connection".
+        entity_id: Primary key of the changed row.
+        op: UPSERT or DELETE.
+        user_ids: Users whose feeds should receive the change.
+    """
+    record_changes(db, entity, [entity_id], op, user_ids)
+
+
+def record_changes(
+    db: Session,
+    entity: str,
+    entity_ids: Iterable[int],
+    op: str,
+    user_ids: Iterable[int],
+) -> None:
+    """Append changes to many rows to every affected user's feed at once.
+
+    Parameters:
+        db: Database session.
+        entity: One of "list", "gift", "share", "collection", "connection".
+        entity_ids: Primary keys of the changed rows.
+        op: UPSERT or DELETE.
+        user_ids: Users whose feeds should receive the changes.
+    """
+    rows: list[dict] = [
+        {"user_id": user_id, "entity": entity, "entity_id": entity_id, "op": op}
+        for user_id in set(user_ids)
+        for entity_id in entity_ids
+    ]
+    if rows:
+        db.execute(insert(Change), rows)
+
+
+def settled() -> ColumnElement:
+    """Match changes old enough that every change before them has committed.
+
+    IDs are handed out when a change is inserted, not when it commits,
+    so a transaction still in flight can hold an ID below the newest
+    visible one. Anything older than change_settle_seconds is assumed
+    to be past that point.
+    """
+    return Change.created_at <= func.date_add(
+        func.now(),
+        literal_column(f"INTERVAL {-int(settings.change_settle_seconds)} SECOND"),
+    )
+
+
+def settled_change_id(db: Session, user_id: int, since_id: int = 0) -> int:
+    """Return the newest settled change ID in a user's feed.
+
+    Every change at or below it is committed, so it is safe to resume
+    from; newer changes are read again next time.
+
+    Parameters:
+        db: Database session.
+        user_id: Whose feed.
+        since_id: Returned if nothing newer has settled.
+
+    Returns:
+        The change ID.
+    """
+    newest = db.execute(
+        select(Change.id)
+        .where(Change.user_id == user_id, Change.id > since_id, settled())
+        .order_by(Change.id.desc())
+        .limit(1)
+    ).scalar()
+    return since_id if newest is None else newest
+
+
+def pruned_change_id(db: Session) -> int:
+    """Return the newest change ID the retention job has deleted.
+
+    A sync token below it may have lost changes the client never saw.
+
+    Parameters:
+        db: Database session.
+
+    Returns:
+        The change ID, or 0 if nothing has been pruned.
+    """
+    return db.execute(select(ChangeHorizon.change_id)).scalar() or 0
+
+
+def list_audience(db: Session, gift_list: GiftList) -> set[int]:
+    """Return the owner and every user the list is shared with.
+
+    Parameters:
+        db: Database session.
+        gift_list: The list.
+
+    Returns:
+        Set of user IDs that can see the list.
+    """
+    viewer_ids = db.execute(
+        select(ListShare.user_id).where(ListShare.list_id == gift_list.id)
+    ).scalars()
+    return {gift_list.owner_id, *viewer_ids}
+
+
+def record_list_visible(db: Session, list_id: int, user_id: int) -> None:
+    """Record a list and all of its gifts as new for one user.
+
+    Used when a list is shared, since the viewer has never synced it.
+
+    Parameters:
+        db: Database session.
+        list_id: The newly visible list.
+        user_id: The user who can now see it.
+    """
+    record_change(db, "list", list_id, UPSERT, [user_id])
+    db.execute(
+        insert(Change).from_select(
+            ["user_id", "entity", "entity_id", "op"],
+            select(
+                literal(user_id),
+                literal("gift"),
+                Gift.id,
+                literal(UPSERT),
+            ).where(Gift.list_id == list_id),
+        )
+    )
+
+
+def record_lists_visible(db: Session, pairs: list[tuple[int, int]]) -> None:
+    """Record many newly shared lists and their gifts for their viewers.
+
+    The set-based form of record_list_visible: two statements however
+    many pairs there are. The shares must already be flushed, since the
+    gifts are found through them.
+
+    Parameters:
+        db: Database session.
+        pairs: (list_id, user_id) for each new share.
+    """
+    if not pairs:
+        return
+    db.execute(
+        insert(Change),
+        [
+            {"user_id": user_id, "entity": "list", "entity_id": list_id, "op": UPSERT}
+            for list_id, user_id in pairs
+        ],
+    )
+    db.execute(
+        insert(Change).from_select(
+            ["user_id", "entity", "entity_id", "op"],
+            select(
+                ListShare.user_id,
+                literal("gift"),
+                Gift.id,
+                literal(UPSERT),
+            )
+            .join(ListShare, ListShare.list_id == Gift.list_id)
+            .where(tuple_(ListShare.list_id, ListShare.user_id).in_(pairs)),
+        )
+    )
+
+
+def record_gifts_for_viewers(db: Session, *criteria: ColumnElement) -> None:
+    """Record matching gifts as changed for every user their list is shared with.
+
+    The list owner is not included, so use this for claim changes. Call
+    before the update when the criteria depend on the claim columns.
+
+    Parameters:
+        db: Database session.
+        criteria: WHERE criteria selecting the gifts.
+    """
+    db.execute(
+        insert(Change).from_select(
+            ["user_id", "entity", "entity_id", "op"],
+            select(
+                ListShare.user_id,
+                literal("gift"),
+                Gift.id,
+                literal(UPSERT),
+            )
+            .join(ListShare, ListShare.list_id == Gift.list_id)
+            .where(*criteria),
+        )
+    )
+
+
+def record_collections_touching(
+    db: Session, list_ids: Iterable[int] | Select, owner_ids: Iterable[int]
+) -> None:
+    """Record collections that reference any of the lists as changed.
+
+    Call before deleting collection items so the affected collections
+    can still be found.
+
+    Parameters:
+        db: Database session.
+        list_ids: Lists (or a subquery of list IDs) leaving collections.
+        owner_ids: Owners whose collections are affected.
+    """
+    rows = db.execute(
+        select(Collection.id, Collection.owner_id)
+        .join(CollectionItem, CollectionItem.collection_id == Collection.id)
+        .where(
+            CollectionItem.list_id.in_(list_ids),
+            Collection.owner_id.in_(list(owner_ids)),
+        )
+        .distinct()
+    ).all()
+    for collection_id, owner_id in rows:
+        record_change(db, "collection", collection_id, UPSERT, [owner_id])
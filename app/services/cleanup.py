@@ -0,0 +1,266 @@
+"""Deferred cascade cleanup, run by the job queue after a delete.
+
+Each handler does at most batch_size rows of work per call and returns
+True while work remains. Handlers select what's left from the current
+state of the database, so running a batch twice is harmless.
+"""
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.change import Change
+from app.models.collection import Collection
+from app.models.collection_item import CollectionItem
+from app.models.connection import Connection
+from app.models.connection_suggestion import ConnectionSuggestion
+from app.models.gift import Gift
+from app.models.gift_list import GiftList
+from app.models.invite import Invite
+from app.models.list_share import ListShare
+from app.models.user import User
+from app.services.changes import (
+    DELETE,
+    UPSERT,
+    record_change,
+    record_changes,
+    record_gifts_for_viewers,
+)
+from app.services.connection_graph import invalidate_connections
+from app.services.jobs import job_handler
+from app.services.suggestions import connection_removed, lock_endpoints
+
+CONNECTION_CLEANUP = "connection.cleanup"
+SHARE_CLEANUP = "share.cleanup"
+USER_CLEANUP = "user.cleanup"
+
+
+def _unclaim(db: Session, batch_size: int, *criteria) -> int:
+    gift_ids = db.execute(
+        select(Gift.id).where(*criteria).order_by(Gift.id).limit(batch_size)
+    ).scalars().all()
+    if gift_ids:
+        record_gifts_for_viewers(db, Gift.id.in_(gift_ids))
+        db.execute(
+            update(Gift)
+            .where(Gift.id.in_(gift_ids), *criteria)
+            .values(claimed_by_id=None, claimed_at=None)
+            .execution_options(synchronize_session=False)
+        )
+    return len(gift_ids)
+
+
+def _remove_collection_items(
+    db: Session, batch_size: int, *criteria, notify: bool = True
+) -> int:
+    rows = db.execute(
+        select(CollectionItem.id, Collection.id, Collection.owner_id)
+        .join(Collection, Collection.id == CollectionItem.collection_id)
+        .where(*criteria)
+        .order_by(CollectionItem.id)
+        .limit(batch_size)
+    ).all()
+    if rows:
+        if notify:
+            by_owner: dict[int, set[int]] = {}
+            for _, collection_id, owner_id in rows:
+                by_owner.setdefault(owner_id, set()).add(collection_id)
+            for owner_id, collection_ids in by_owner.items():
+                record_changes(db, "collection", collection_ids, UPSERT, [owner_id])
+        db.execute(
+            delete(CollectionItem)
+            .where(CollectionItem.id.in_([item_id for item_id, _, _ in rows]))
+            .execution_options(synchronize_session=False)
+        )
+    return len(rows)
+
+
+def _is_connected(db: Session, user_a: int, user_b: int) -> bool:
+    return db.execute(
+        select(Connection.id).where(
+            Connection.between(user_a, user_b), Connection.status == "accepted"
+        )
+    ).first() is not None
+
+
+@job_handler(CONNECTION_CLEANUP)
+def cleanup_connection(db: Session, payload: dict, batch_size: int) -> bool:
+    """Unclaim gifts and prune collection items between two ex-connections.
+
+    Does nothing if the two users have connected again since.
+    """
+    user_a, user_b = payload["user_a"], payload["user_b"]
+    if _is_connected(db, user_a, user_b):
+        return False
+    list_ids_a = select(GiftList.id).where(GiftList.owner_id == user_a)
+    list_ids_b = select(GiftList.id).where(GiftList.owner_id == user_b)
+
+    claims_between = or_(
+        Gift.list_id.in_(list_ids_a) & (Gift.claimed_by_id == user_b),
+        Gift.list_id.in_(list_ids_b) & (Gift.claimed_by_id == user_a),
+    )
+    if _unclaim(db, batch_size, claims_between) == batch_size:
+        return True
+
+    items_between = or_(
+        (Collection.owner_id == user_a) & CollectionItem.list_id.in_(list_ids_b),
+        (Collection.owner_id == user_b) & CollectionItem.list_id.in_(list_ids_a),
+    )
+    return _remove_collection_items(db, batch_size, items_between) == batch_size
+
+
+@job_handler(SHARE_CLEANUP)
+def cleanup_share(db: Session, payload: dict, batch_size: int) -> bool:
+    """Remove an unshared list from the ex-viewer's collections.
+
+    Does nothing if the list has been shared with them again since.
+    """
+    list_id, user_id = payload["list_id"], payload["user_id"]
+    reshared = db.execute(
+        select(ListShare.id).where(
+            ListShare.list_id == list_id, ListShare.user_id == user_id
+        )
+    ).first()
+    if reshared is not None:
+        return False
+    return _remove_collection_items(
+        db,
+        batch_size,
+        Collection.owner_id == user_id,
+        CollectionItem.list_id == list_id,
+    ) == batch_size
+
+
+def _revoke_user_shares(db: Session, user_id: int, batch_size: int) -> int:
+    rows = db.execute(
+        select(ListShare.id, ListShare.list_id, ListShare.user_id, GiftList.owner_id)
+        .join(GiftList, GiftList.id == ListShare.list_id)
+        .where(or_(ListShare.user_id == user_id, GiftList.owner_id == user_id))
+        .order_by(ListShare.id)
+        .limit(batch_size)
+    ).all()
+    for share_id, list_id, viewer_id, owner_id in rows:
+        others = {viewer_id, owner_id} - {user_id}
+        record_change(db, "share", share_id, DELETE, others)
+        if viewer_id != user_id:
+            record_change(db, "list", list_id, DELETE, [viewer_id])
+    if rows:
+        db.execute(
+            delete(ListShare)
+            .where(ListShare.id.in_([row[0] for row in rows]))
+            .execution_options(synchronize_session=False)
+        )
+    return len(rows)
+
+
+def _remove_connections(db: Session, user_id: int, batch_size: int) -> int:
+    batch = (
+        select(
+            Connection.id, Connection.other_user_id(user_id), Connection.status
+        )
+        .where(Connection.involving(user_id))
+        .order_by(Connection.id)
+        .limit(batch_size)
+    )
+    others = db.execute(batch).all()
+    if not others:
+        return 0
+    # Lock the other ends too, then re-read: the other party may have
+    # removed a connection meanwhile, and must not be counted out twice
+    lock_endpoints(db, user_id, *(row[1] for row in others))
+    rows = db.execute(batch.with_for_update()).all()
+    for connection_id, other_id, connection_status in rows:
+        record_change(db, "connection", connection_id, DELETE, [other_id])
+        if connection_status == "accepted":
+            # Delete before the next one, or the user would still count
+            # as a mutual connection through it
+            connection_removed(db, user_id, other_id)
+            db.execute(
+                delete(Connection)
+                .where(Connection.id == connection_id)
+                .execution_options(synchronize_session=False)
+            )
+    pending_ids = [row[0] for row in rows if row[2] != "accepted"]
+    if pending_ids:
+        db.execute(
+            delete(Connection)
+            .where(Connection.id.in_(pending_ids))
+            .execution_options(synchronize_session=False)
+        )
+    if rows:
+        invalidate_connections(db, [user_id, *(row[1] for row in rows)])
+    return len(rows)
+
+
+def _delete_batch(db: Session, model, batch_size: int, *criteria) -> int:
+    ids = db.execute(
+        select(model.id).where(*criteria).order_by(model.id).limit(batch_size)
+    ).scalars().all()
+    if ids:
+        db.execute(
+            delete(model)
+            .where(model.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+    return len(ids)
+
+
+@job_handler(USER_CLEANUP)
+def cleanup_user(db: Session, payload: dict, batch_size: int) -> bool:
+    """Remove a deactivated user and everything that references them.
+
+    Steps run in foreign key order; each call works on the first step
+    that still has rows, and the user row itself goes last. Stops as
+    soon as the user has been reactivated (or is already gone); the row
+    stays locked for the batch, so a reactivation waits for it to finish.
+    """
+    user_id = payload["user_id"]
+    is_active = db.execute(
+        select(User.is_active).where(User.id == user_id).with_for_update()
+    ).scalar_one_or_none()
+    if is_active is not False:
+        return False
+    user_list_ids = select(GiftList.id).where(GiftList.owner_id == user_id)
+
+    if _unclaim(db, batch_size, Gift.claimed_by_id == user_id):
+        return True
+    if _revoke_user_shares(db, user_id, batch_size):
+        return True
+    if _remove_collection_items(
+        db, batch_size, CollectionItem.list_id.in_(user_list_ids)
+    ):
+        return True
+    if _remove_collection_items(
+        db, batch_size, Collection.owner_id == user_id, notify=False
+    ):
+        return True
+    steps = (
+        (Gift, Gift.list_id.in_(user_list_ids)),
+        (GiftList, GiftList.owner_id == user_id),
+        (Collection, Collection.owner_id == user_id),
+    )
+    for model, criteria in steps:
+        if _delete_batch(db, model, batch_size, criteria):
+            return True
+    if _remove_connections(db, user_id, batch_size):
+        return True
+    for model, criteria in (
+        (Invite, Invite.invited_by_id == user_id),
+        (Change, Change.user_id == user_id),
+    ):
+        if _delete_batch(db, model, batch_size, criteria):
+            return True
+    db.execute(
+        delete(ConnectionSuggestion)
+        .where(
+            or_(
+                ConnectionSuggestion.user_id == user_id,
+                ConnectionSuggestion.candidate_id == user_id,
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        delete(User)
+        .where(User.id == user_id, User.is_active.is_(False))
+        .execution_options(synchronize_session=False)
+    )
+    return False
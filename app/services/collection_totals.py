@@ -0,0 +1,109 @@
+from decimal import Decimal
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session
+
+from app.models.collection_item import CollectionItem
+from app.models.gift import Gift
+from app.models.gift_list import GiftList
+
+EMPTY = {
+    "gift_count": 0,
+    "claimed_by_me": 0,
+    "my_spend": Decimal("0"),
+    "unclaimed_count": 0,
+}
+
+
+def totals_columns(user_id: int) -> tuple:
+    """Aggregate columns over gifts outer-joined to their lists.
+
+    Claims on the user's own lists are hidden from them, so those lists
+    never count towards unclaimed_count.
+
+    Parameters:
+        user_id: The user the totals are for.
+
+    Returns:
+        Labelled gift_count, claimed_by_me, my_spend and unclaimed_count
+        columns, for use with GROUP BY.
+    """
+    mine = Gift.claimed_by_id == user_id
+    unclaimed = and_(
+        Gift.id.is_not(None),
+        Gift.claimed_by_id.is_(None),
+        GiftList.owner_id != user_id,
+    )
+    return (
+        func.count(Gift.id).label("gift_count"),
+        func.coalesce(func.sum(case((mine, 1), else_=0)), 0).label("claimed_by_me"),
+        func.coalesce(func.sum(case((mine, Gift.price), else_=0)), 0).label(
+            "my_spend"
+        ),
+        func.coalesce(func.sum(case((unclaimed, 1), else_=0)), 0).label(
+            "unclaimed_count"
+        ),
+    )
+
+
+def collection_totals(
+    db: Session, user_id: int, collection_ids: list[int]
+) -> dict[int, dict]:
+    """Total up the gifts on every list in each collection.
+
+    Parameters:
+        db: Database session.
+        user_id: The collections' owner.
+        collection_ids: The collections to total.
+
+    Returns:
+        Totals by collection ID; empty collections are left out.
+    """
+    if not collection_ids:
+        return {}
+    rows = db.execute(
+        select(CollectionItem.collection_id, *totals_columns(user_id))
+        .join(GiftList, GiftList.id == CollectionItem.list_id)
+        .outerjoin(Gift, Gift.list_id == GiftList.id)
+        .where(CollectionItem.collection_id.in_(collection_ids))
+        .group_by(CollectionItem.collection_id)
+    ).all()
+    return {
+        row.collection_id: {
+            "gift_count": row.gift_count,
+            "claimed_by_me": row.claimed_by_me,
+            "my_spend": Decimal(row.my_spend),
+            "unclaimed_count": row.unclaimed_count,
+        }
+        for row in rows
+    }
+
+
+def list_totals(db: Session, user_id: int, list_ids: list[int]) -> dict[int, dict]:
+    """Total up the gifts on each of several lists.
+
+    Parameters:
+        db: Database session.
+        user_id: The user the totals are for.
+        list_ids: The lists to total.
+
+    Returns:
+        Totals by list ID.
+    """
+    if not list_ids:
+        return {}
+    rows = db.execute(
+        select(GiftList.id, *totals_columns(user_id))
+        .outerjoin(Gift, Gift.list_id == GiftList.id)
+        .where(GiftList.id.in_(list_ids))
+        .group_by(GiftList.id)
+    ).all()
+    return {
+        row.id: {
+            "gift_count": row.gift_count,
+            "claimed_by_me": row.claimed_by_me,
+            "my_spend": Decimal(row.my_spend),
+            "unclaimed_count": row.unclaimed_count,
+        }
+        for row in rows
+    }
@@ -0,0 +1,54 @@
+from collections.abc import Iterable
+from types import MappingProxyType
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.connection import Connection
+from app.services.user_index import UserIndex
+
+
+class ConnectionIndex(UserIndex[MappingProxyType]):
+    """In-process adjacency sets of accepted connections.
+
+    Each user's entry maps the IDs of the users they're connected with
+    to the connection's ID, loaded lazily from connections.
+    """
+
+    def load(self, db: Session, user_id: int) -> MappingProxyType:
+        rows = db.execute(
+            select(Connection.other_user_id(user_id), Connection.id).where(
+                Connection.status == "accepted",
+                Connection.involving(user_id),
+            )
+        ).tuples()
+        return MappingProxyType(dict(rows.all()))
+
+    def connections(self, db: Session, user_id: int) -> MappingProxyType:
+        """Return a user's accepted connections.
+
+        Parameters:
+            db: Database session used on a cache miss.
+            user_id: The user.
+
+        Returns:
+            Read-only map of connected user ID to connection ID.
+        """
+        return self.get(db, user_id)
+
+    def are_connected(self, db: Session, user_id: int, other_id: int) -> bool:
+        return other_id in self.get(db, user_id)
+
+
+connection_index = ConnectionIndex(settings.connection_cache_size)
+
+
+def invalidate_connections(db: Session, user_ids: Iterable[int]) -> None:
+    """Drop cached adjacency for users gaining or losing a connection.
+
+    Parameters:
+        db: The session making the change.
+        user_ids: Both parties to the connection.
+    """
+    connection_index.invalidate_on_commit(db, user_ids)
@@ -0,0 +1,127 @@
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.connection import Connection
+from app.models.user import User, hash_email, normalize_email
+
+CONNECTED = "connected"
+PENDING_SENT = "pending_sent"
+PENDING_RECEIVED = "pending_received"
+NONE = "none"
+
+
+def _chunks(values: list[str], size: int):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _statuses(db: Session, user_id: int, other_ids: list[int]) -> dict[int, str]:
+    """Return the caller's connection status with each of other_ids."""
+    other = Connection.other_user_id(user_id)
+    rows = db.execute(
+        select(other, Connection.status, Connection.requester_id).where(
+            Connection.involving(user_id), other.in_(other_ids)
+        )
+    ).all()
+    statuses = {}
+    for other_id, connection_status, requester_id in rows:
+        if connection_status == "accepted":
+            statuses[other_id] = CONNECTED
+        elif requester_id == user_id:
+            statuses[other_id] = PENDING_SENT
+        else:
+            statuses[other_id] = PENDING_RECEIVED
+    return statuses
+
+
+def lookup_contacts(
+    db: Session, user_id: int, emails: list[str], hashes: list[str]
+) -> list[dict]:
+    """Match an address book against active members.
+
+    Emails are matched case-insensitively on users.email and hashes on
+    users.email_hash, one IN query per chunk of
+    APP_CONTACT_LOOKUP_CHUNK_SIZE keys, each followed by one query for
+    the caller's connections with that chunk's matches.
+
+    Parameters:
+        db: Database session.
+        user_id: The caller, who is never matched.
+        emails: Plain email addresses.
+        hashes: Hex SHA-256 digests from hash_email.
+
+    Returns:
+        Dicts with the submitted key, the matched user's id and name,
+        and the caller's connection status with them.
+    """
+    # Normalized key -> key as submitted, deduplicated in order
+    by_email = {}
+    for email in emails:
+        by_email.setdefault(normalize_email(email), email)
+    by_hash = {}
+    for digest in hashes:
+        by_hash.setdefault(digest.strip().lower(), digest)
+
+    results = []
+    for column, keys, normalize in (
+        (User.email, by_email, normalize_email),
+        (User.email_hash, by_hash, str.lower),
+    ):
+        for chunk in _chunks(list(keys), settings.contact_lookup_chunk_size):
+            rows = db.execute(
+                select(User.id, User.name, column).where(
+                    column.in_(chunk), User.is_active.is_(True), User.id != user_id
+                )
+            ).all()
+            if not rows:
+                continue
+            statuses = _statuses(db, user_id, [row[0] for row in rows])
+            for match_id, name, stored in rows:
+                # The column's collation also ignores accents and
+                # trailing spaces, so IN can match a row whose stored
+                # value doesn't normalize to any submitted key
+                key = keys.get(normalize(stored))
+                if key is None:
+                    continue
+                results.append(
+                    {
+                        "key": key,
+                        "user_id": match_id,
+                        "name": name,
+                        "status": statuses.get(match_id, NONE),
+                    }
+                )
+    return results
+
+
+def rehash_emails(db: Session, after_id: int, batch_size: int) -> int | None:
+    """Recompute email_hash for the next batch of users with the current salt.
+
+    Hashes are computed in Python with hash_email, so stored digests
+    always match what clients are told to send.
+
+    Parameters:
+        db: Database session.
+        after_id: Resume after this user ID (0 to start).
+        batch_size: Users read per call.
+
+    Returns:
+        The last user ID in the batch, or None once every user is done.
+    """
+    rows = db.execute(
+        select(User.id, User.email, User.email_hash)
+        .where(User.id > after_id)
+        .order_by(User.id)
+        .limit(batch_size)
+    ).all()
+    if not rows:
+        return None
+    stale = [
+        {"id": user_id, "email_hash": digest}
+        for user_id, email, current in rows
+        if (digest := hash_email(email)) != current
+    ]
+    if stale:
+        db.execute(update(User), stale)
+    return rows[-1][0]
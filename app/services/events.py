@@ -0,0 +1,255 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from sqlalchemy import event as orm_event
+from sqlalchemy.orm import Session
+
+PENDING_KEY = "list_events_pending"
+
+
+class Subscription:
+    """A subscriber's queue of events on one channel.
+
+    Must be created inside the event loop that will consume it. Events
+    are delivered thread-safely, so sync route handlers running in the
+    threadpool can publish.
+    """
+
+    def __init__(self, broker: "InProcessBroker", channel: str, maxsize: int):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, event: dict) -> None:
+        """Queue an event. Must be called on the subscription's loop.
+
+        A subscriber that stops reading loses its oldest events rather
+        than growing without bound.
+        """
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Pub/sub broker that fans events out to subscribers in this process.
+
+    Publishing costs one loop wake-up per event loop with subscribers on
+    the channel, not one per subscriber, so thousands of idle
+    subscribers on a list stay cheap.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._channels: dict[str, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(self, channel, self.queue_size)
+        with self._lock:
+            self._channels[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._channels[subscription.channel]
+
+    def subscriber_count(self, channel: str | None = None) -> int:
+        with self._lock:
+            if channel is not None:
+                return len(self._channels.get(channel, ()))
+            return sum(len(s) for s in self._channels.values())
+
+    def publish(self, channel: str, event: dict) -> None:
+        self._deliver(channel, event)
+
+    def _deliver(self, channel: str, event: dict) -> None:
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        by_loop: dict[asyncio.AbstractEventLoop, list[Subscription]] = (
+            defaultdict(list)
+        )
+        for subscription in subscribers:
+            by_loop[subscription.loop].append(subscription)
+        for loop, batch in by_loop.items():
+            if loop.is_closed():
+                continue
+            loop.call_soon_threadsafe(_put_all, batch, event)
+
+
+def _put_all(subscriptions: list[Subscription], event: dict) -> None:
+    for subscription in subscriptions:
+        subscription.put(event)
+
+
+class LocalBus:
+    """In-process stand-in for an external pub/sub server such as Redis.
+
+    Messages cross the bus as JSON strings, as they would on the wire, and
+    reach every attached broker, each standing in for one worker process.
+    """
+
+    def __init__(self):
+        self._brokers: list["RelayBroker"] = []
+        self._lock = threading.Lock()
+
+    def attach(self, broker: "RelayBroker") -> None:
+        with self._lock:
+            self._brokers.append(broker)
+
+    def send(self, channel: str, message: str) -> None:
+        with self._lock:
+            brokers = list(self._brokers)
+        for broker in brokers:
+            broker.receive(channel, message)
+
+
+class RelayBroker(InProcessBroker):
+    """Broker for multi-worker deployments.
+
+    Publishes go out over a shared bus and come back to every worker's
+    broker, which then fans them out to its own local subscribers.
+    """
+
+    def __init__(self, bus: LocalBus, queue_size: int = 100):
+        super().__init__(queue_size)
+        self.bus = bus
+        bus.attach(self)
+
+    def publish(self, channel: str, event: dict) -> None:
+        self.bus.send(channel, json.dumps(event, default=str))
+
+    def receive(self, channel: str, message: str) -> None:
+        self._deliver(channel, json.loads(message))
+
+
+_broker: InProcessBroker = InProcessBroker()
+
+
+def get_broker() -> InProcessBroker:
+    return _broker
+
+
+def set_broker(broker: InProcessBroker) -> None:
+    """Replace the process-wide broker, e.g. with a RelayBroker."""
+    global _broker
+    _broker = broker
+
+
+def list_channel(list_id: int) -> str:
+    return f"list:{list_id}"
+
+
+def publish_list_event(list_id: int, event_type: str, /, **data) -> None:
+    """Publish an event to everyone watching a list.
+
+    Parameters:
+        list_id: The list the event belongs to.
+        event_type: E.g. "gift.created" or "list.deleted".
+        data: JSON-serializable event fields.
+    """
+    get_broker().publish(list_channel(list_id), {"type": event_type, **data})
+
+
+def publish_list_event_on_commit(
+    db: Session, list_id: int, event_type: str, /, **data
+) -> None:
+    """Publish a list event once db's transaction commits.
+
+    Watchers react to events by reading the list, so an event sent
+    before the commit could describe rows they can't see yet, or that
+    get rolled back.
+
+    Parameters:
+        db: The session making the change.
+        list_id: The list the event belongs to.
+        event_type: E.g. "gift.created" or "list.deleted".
+        data: JSON-serializable event fields, captured now.
+    """
+    db.info.setdefault(PENDING_KEY, []).append((list_id, event_type, data))
+
+
+@orm_event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    # Releasing a savepoint also fires after_commit; wait for the real one
+    if session.in_nested_transaction():
+        return
+    for list_id, event_type, data in session.info.pop(PENDING_KEY, ()):
+        publish_list_event(list_id, event_type, **data)
+
+
+@orm_event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    if not session.in_nested_transaction():
+        session.info.pop(PENDING_KEY, None)
+
+
+CLAIM_EVENTS = {"gift.claimed", "gift.unclaimed"}
+
+
+def _format_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def stream_list_events(
+    list_id: int, user_id: int, owner_id: int, keepalive_seconds: float
+):
+    """Yield a list's events to one viewer as Server-Sent Events.
+
+    The list owner never receives claim events or claim fields. The
+    stream ends when the list is deleted or the viewer's share is revoked.
+
+    Parameters:
+        list_id: The list being watched.
+        user_id: The watching user.
+        owner_id: The list's owner.
+        keepalive_seconds: Idle time before a keepalive comment is sent.
+    """
+    is_owner: bool = user_id == owner_id
+    subscription = get_broker().subscribe(list_channel(list_id))
+    try:
+        yield ": connected\n\n"
+        while True:
+            try:
+                event: dict = await asyncio.wait_for(
+                    subscription.get(), timeout=keepalive_seconds
+                )
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            event_type: str = event["type"]
+            if event_type == "share.revoked":
+                if event["user_id"] == user_id:
+                    yield _format_sse(event)
+                    return
+                continue
+            if is_owner:
+                if event_type in CLAIM_EVENTS:
+                    continue
+                if "gift" in event:
+                    gift = dict(event["gift"])
+                    gift.pop("claimed_by_id", None)
+                    gift.pop("claimed_at", None)
+                    event = {**event, "gift": gift}
+            yield _format_sse(event)
+            if event_type == "list.deleted":
+                return
+    finally:
+        subscription.close()
@@ -0,0 +1,185 @@
+import csv
+import io
+import json
+from collections.abc import Iterator
+from typing import IO
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.models.change import Change
+from app.models.gift import Gift
+from app.models.gift_list import GiftList
+from app.schemas.gift import GiftImportRow
+from app.services.changes import UPSERT, list_audience
+from app.services.link_metadata import enricher
+
+CSV = "csv"
+NDJSON = "ndjson"
+FIELDS: tuple[str, ...] = ("name", "description", "url", "price")
+MAX_REPORTED_ERRORS = 100
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+def read_rows(upload: IO[bytes], fmt: str) -> Iterator[tuple[int, dict | str]]:
+    """Parse an uploaded CSV or NDJSON file one row at a time.
+
+    CSV files need a header row with at least a "name" column; blank
+    cells become null. Unknown columns and keys are ignored.
+
+    Parameters:
+        upload: The uploaded file, positioned at the start.
+        fmt: CSV or NDJSON.
+
+    Yields:
+        (line number, row dict) for parsable rows, or (line number, error
+        message) for rows that can't be read.
+
+    Raises:
+        ValueError: If a CSV file has no "name" column.
+    """
+    text = io.TextIOWrapper(upload, encoding="utf-8-sig", errors="replace", newline="")
+    if fmt == CSV:
+        reader = csv.DictReader(text)
+        if reader.fieldnames is None or "name" not in reader.fieldnames:
+            raise ValueError('CSV uploads need a header row with a "name" column.')
+        for record in reader:
+            yield reader.line_num, {
+                key: value or None
+                for key, value in record.items()
+                if key in FIELDS
+            }
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, "Line is not valid JSON."
+            continue
+        if not isinstance(record, dict):
+            yield line_number, "Line is not a JSON object."
+            continue
+        yield line_number, {key: record[key] for key in FIELDS if key in record}
+
+
+def import_gifts(
+    db: Session,
+    gift_list: GiftList,
+    rows: Iterator[tuple[int, dict | str]],
+    batch_size: int,
+) -> dict:
+    """Validate rows and insert the good ones into a list in batches.
+
+    Bad rows are reported rather than aborting the import. Only one
+    batch of rows is held in memory at a time.
+
+    Parameters:
+        db: Database session.
+        gift_list: The list to import into.
+        rows: Output of read_rows.
+        batch_size: Rows per INSERT statement.
+
+    Returns:
+        Dict matching the GiftImportResult schema.
+    """
+    last_id: int = db.execute(select(func.coalesce(func.max(Gift.id), 0))).scalar()
+    imported = 0
+    failed = 0
+    errors: list[dict] = []
+    batch: list[dict] = []
+
+    def flush_batch() -> None:
+        nonlocal imported
+        if batch:
+            db.execute(insert(Gift), batch)
+            imported += len(batch)
+            batch.clear()
+
+    for line_number, row in rows:
+        if isinstance(row, dict):
+            try:
+                gift = GiftImportRow.model_validate(row)
+            except ValidationError as error:
+                row = _describe(error)
+            else:
+                batch.append({"list_id": gift_list.id, **gift.model_dump()})
+                if len(batch) >= batch_size:
+                    flush_batch()
+                continue
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line_number, "error": row})
+    flush_batch()
+
+    if imported:
+        # One set-based feed entry per viewer for everything just inserted
+        for user_id in list_audience(db, gift_list):
+            db.execute(
+                insert(Change).from_select(
+                    ["user_id", "entity", "entity_id", "op"],
+                    select(
+                        literal(user_id),
+                        literal("gift"),
+                        Gift.id,
+                        literal(UPSERT),
+                    ).where(Gift.list_id == gift_list.id, Gift.id > last_id),
+                )
+            )
+        linked = db.execute(
+            select(Gift.id, Gift.url).where(
+                Gift.list_id == gift_list.id,
+                Gift.id > last_id,
+                Gift.url.is_not(None),
+            )
+        )
+        for gift_id, url in linked:
+            enricher.enqueue_on_commit(db, gift_id, url)
+    return {"imported": imported, "failed": failed, "errors": errors}
+
+
+def export_gifts(
+    db: Session, list_id: int, fmt: str, batch_size: int
+) -> Iterator[str]:
+    """Stream a list's gifts from a server-side cursor as CSV or NDJSON.
+
+    Parameters:
+        db: Database session.
+        list_id: The list to export.
+        fmt: CSV or NDJSON.
+        batch_size: Rows fetched from the cursor per chunk.
+
+    Yields:
+        Chunks of the encoded file.
+    """
+    result = db.execute(
+        select(Gift.name, Gift.description, Gift.url, Gift.price)
+        .where(Gift.list_id == list_id)
+        .order_by(Gift.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if fmt == CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(FIELDS)
+        for partition in result.partitions():
+            writer.writerows(partition)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+        return
+
+    for partition in result.partitions():
+        yield "".join(
+            json.dumps(row._asdict(), default=str) + "\n" for row in partition
+        )
@@ -0,0 +1,254 @@
+import asyncio
+from collections.abc import Callable
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.job import Job
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# A handler runs one batch of a job and returns True if work remains
+JobHandler = Callable[[Session, dict, int], bool]
+
+HANDLERS: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Register a handler for a kind of job."""
+
+    def register(handler: JobHandler) -> JobHandler:
+        HANDLERS[kind] = handler
+        return handler
+
+    return register
+
+
+def _seconds_from_now(seconds: int):
+    return func.date_add(
+        func.now(), literal_column(f"INTERVAL {int(seconds)} SECOND")
+    )
+
+
+def enqueue_job(
+    db: Session, kind: str, delay_seconds: int = 0, **payload
+) -> Job:
+    """Queue a job in the caller's transaction.
+
+    The job is only visible to workers once the transaction commits, so
+    it's never run for a write that was rolled back.
+
+    Parameters:
+        db: Database session.
+        kind: A kind registered with job_handler.
+        delay_seconds: How long to wait before the job is due.
+        payload: JSON-serializable arguments for the handler.
+
+    Returns:
+        The new job.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"No handler for job kind {kind!r}")
+    job = Job(kind=kind, payload=payload)
+    if delay_seconds:
+        job.run_after = _seconds_from_now(delay_seconds)
+    db.add(job)
+    db.flush()
+    return job
+
+
+def claim_job(db: Session, lease_seconds: int) -> Job | None:
+    """Claim the oldest due job, skipping rows other workers have locked.
+
+    Parameters:
+        db: Database session.
+        lease_seconds: How long before the job is due again if the
+            worker never reports back.
+
+    Returns:
+        The claimed job, or None if nothing is due.
+    """
+    job = db.execute(
+        select(Job)
+        .where(Job.status.in_([PENDING, RUNNING]), Job.run_after <= func.now())
+        .order_by(Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).scalar_one_or_none()
+    if job is None:
+        return None
+    job.status = RUNNING
+    job.attempts += 1
+    job.run_after = _seconds_from_now(lease_seconds)
+    db.flush()
+    return job
+
+
+def run_job(db: Session, job: Job, batch_size: int, max_attempts: int) -> bool:
+    """Run one batch of a claimed job and record the outcome.
+
+    A failed batch is rolled back and retried with exponential backoff
+    until max_attempts consecutive failures, when the job is marked
+    failed.
+
+    Parameters:
+        db: Database session.
+        job: A job returned by claim_job.
+        batch_size: The most rows the handler should touch.
+        max_attempts: Consecutive failures before giving up.
+
+    Returns:
+        True if the batch succeeded.
+    """
+    try:
+        with db.begin_nested():
+            more = HANDLERS[job.kind](db, job.payload, batch_size)
+    except Exception as error:
+        job.last_error = str(error)[:500]
+        if job.attempts >= max_attempts:
+            job.status = FAILED
+            job.finished_at = func.now()
+        else:
+            job.status = PENDING
+            job.run_after = _seconds_from_now(2 ** job.attempts)
+        db.flush()
+        return False
+    job.attempts = 0
+    if more:
+        job.status = PENDING
+        job.run_after = func.now()
+    else:
+        job.status = DONE
+        job.finished_at = func.now()
+    db.flush()
+    return True
+
+
+def drain_jobs(db: Session, batch_size: int | None = None) -> int:
+    """Run every due job to completion in the caller's session.
+
+    Used by tests and the CLI. Jobs that fail are left for their retry.
+
+    Parameters:
+        db: Database session.
+        batch_size: Rows per batch (defaults to APP_JOB_BATCH_SIZE).
+
+    Returns:
+        The number of batches run.
+    """
+    batches = 0
+    while (job := claim_job(db, settings.job_lease_seconds)) is not None:
+        run_job(
+            db,
+            job,
+            batch_size or settings.job_batch_size,
+            settings.job_max_attempts,
+        )
+        batches += 1
+    return batches
+
+
+def queue_stats(db: Session) -> dict:
+    """Report the queue's depth and lag.
+
+    Parameters:
+        db: Database session.
+
+    Returns:
+        Counts of outstanding and failed jobs and the age in seconds of
+        the oldest outstanding job.
+    """
+    outstanding, oldest = db.execute(
+        select(func.count(), func.min(Job.created_at)).where(
+            Job.status.in_([PENDING, RUNNING])
+        )
+    ).one()
+    failed = db.execute(
+        select(func.count()).where(Job.status == FAILED)
+    ).scalar_one()
+    lag = 0
+    if oldest is not None:
+        lag = db.execute(
+            select(func.timestampdiff(literal_column("SECOND"), oldest, func.now()))
+        ).scalar_one()
+    return {"depth": outstanding, "failed": failed, "lag_seconds": max(lag, 0)}
+
+
+class JobWorker:
+    """Background tasks that claim and run queued jobs.
+
+    Each task runs one batch at a time in a worker thread with its own
+    session, committing after the claim and again after the batch.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        concurrency: int = 2,
+        poll_interval: float = 1.0,
+        batch_size: int = 1000,
+        max_attempts: int = 5,
+        lease_seconds: int = 300,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.batches = 0
+        self.failures = 0
+        self._workers: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop."""
+        self._workers = [
+            asyncio.create_task(self._work()) for _ in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                ran = await asyncio.to_thread(self.run_once)
+            except Exception:
+                self.failures += 1
+                ran = False
+            if not ran:
+                await asyncio.sleep(self.poll_interval)
+
+    def run_once(self) -> bool:
+        """Claim and run one batch. Returns False if nothing was due."""
+        db = self.session_factory()
+        try:
+            job = claim_job(db, self.lease_seconds)
+            if job is None:
+                db.rollback()
+                return False
+            db.commit()
+            if not run_job(db, job, self.batch_size, self.max_attempts):
+                self.failures += 1
+            db.commit()
+            self.batches += 1
+            return True
+        finally:
+            db.close()
+
+
+worker = JobWorker(
+    concurrency=settings.job_concurrency,
+    poll_interval=settings.job_poll_interval,
+    batch_size=settings.job_batch_size,
+    max_attempts=settings.job_max_attempts,
+    lease_seconds=settings.job_lease_seconds,
+)
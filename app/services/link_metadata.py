@@ -0,0 +1,430 @@
+import asyncio
+import http.client
+import ipaddress
+import socket
+import time
+import urllib.request
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from html.parser import HTMLParser
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.gift import Gift
+
+TRACKING_PREFIXES: tuple[str, ...] = ("utm_", "fbclid", "gclid", "mc_")
+MAX_HTML_BYTES = 512 * 1024
+MAX_REDIRECTS = 5
+PENDING_KEY = "link_enrichment_pending"
+
+
+@dataclass(frozen=True)
+class LinkMetadata:
+    title: str | None = None
+    image_url: str | None = None
+    price: Decimal | None = None
+
+
+def normalize_url(url: str) -> str | None:
+    """Normalize a product URL so equivalent links share a cache entry.
+
+    Lowercases the scheme and host, drops default ports, fragments and
+    tracking parameters, and sorts the query string.
+
+    Parameters:
+        url: The URL as entered by the user.
+
+    Returns:
+        The normalized URL, or None if it isn't an http(s) URL.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+class _MetadataParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta: dict[str, str] = {}
+        self.title_parts: list[str] = []
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title":
+            self._in_title = True
+        elif tag == "meta":
+            attributes = dict(attrs)
+            key = attributes.get("property") or attributes.get("name")
+            content = attributes.get("content")
+            if key and content:
+                self.meta.setdefault(key.lower(), content.strip())
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title_parts.append(data)
+
+
+def parse_metadata(html: str) -> LinkMetadata:
+    """Extract title, image and price from Open Graph tags or <title>.
+
+    Parameters:
+        html: The fetched page.
+
+    Returns:
+        Whatever metadata could be found, truncated to column sizes.
+    """
+    parser = _MetadataParser()
+    parser.feed(html)
+    meta = parser.meta
+    title = meta.get("og:title") or "".join(parser.title_parts).strip() or None
+    image_url = meta.get("og:image")
+    price: Decimal | None = None
+    raw_price = meta.get("product:price:amount") or meta.get("og:price:amount")
+    if raw_price:
+        try:
+            price = Decimal(raw_price.replace(",", "")).quantize(Decimal("0.01"))
+        except InvalidOperation:
+            price = None
+        if price is not None and (price < 0 or price >= Decimal("1e8")):
+            price = None
+    return LinkMetadata(
+        title=title[:255] if title else None,
+        image_url=image_url if image_url and len(image_url) <= 2048 else None,
+        price=price,
+    )
+
+
+class BlockedAddressError(OSError):
+    """A URL resolved to an address the fetcher must not connect to."""
+
+
+def is_public_address(address: str) -> bool:
+    """Whether an IP address is routable on the public internet.
+
+    Private, loopback, link-local (including the 169.254.169.254
+    metadata endpoint), reserved, multicast and unspecified addresses
+    are not.
+    """
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def _connect_public(address, timeout, source_address=None):
+    # Connect to the address that was checked rather than the hostname,
+    # so DNS can't answer differently between the check and the connect
+    host, port = address
+    addresses = {
+        info[4][0]
+        for info in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    }
+    if not settings.link_fetch_allow_private:
+        for ip in addresses:
+            if not is_public_address(ip):
+                raise BlockedAddressError(f"{host} resolves to {ip}")
+    error: OSError | None = None
+    for ip in sorted(addresses):
+        try:
+            return socket.create_connection((ip, port), timeout, source_address)
+        except OSError as exc:
+            error = exc
+    raise error or OSError(f"{host} did not resolve")
+
+
+class _PublicHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _connect_public
+
+
+class _PublicHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _connect_public
+
+
+class _PublicHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_PublicHTTPConnection, req)
+
+
+class _PublicHTTPSHandler(urllib.request.HTTPSHandler):
+    def do_open(self, http_class, req, **http_conn_args):
+        return super().do_open(_PublicHTTPSConnection, req, **http_conn_args)
+
+
+class _RedirectHandler(urllib.request.HTTPRedirectHandler):
+    max_redirections = MAX_REDIRECTS
+
+
+def _build_opener() -> urllib.request.OpenerDirector:
+    # Built by hand rather than with build_opener, which would add proxy,
+    # file and ftp handlers a redirect could reach. Redirects go back
+    # through the handlers above, so every hop is checked again.
+    opener = urllib.request.OpenerDirector()
+    for handler in (
+        urllib.request.UnknownHandler(),
+        _PublicHTTPHandler(),
+        _PublicHTTPSHandler(),
+        _RedirectHandler(),
+        urllib.request.HTTPDefaultErrorHandler(),
+        urllib.request.HTTPErrorProcessor(),
+    ):
+        opener.add_handler(handler)
+    return opener
+
+
+_opener = _build_opener()
+
+
+async def fetch_html(url: str) -> str:
+    """Default fetcher: GET the page with urllib in a worker thread.
+
+    Only connects to public addresses, checked again on every redirect,
+    unless settings.link_fetch_allow_private is set.
+
+    Raises:
+        BlockedAddressError: If the URL or a redirect resolves to a
+            private address (wrapped in a URLError by urllib).
+    """
+
+    def get() -> str:
+        request = urllib.request.Request(
+            url, headers={"User-Agent": "BooneGifts-LinkPreview/1.0"}
+        )
+        with _opener.open(request, timeout=settings.link_fetch_timeout) as response:
+            charset = response.headers.get_content_charset() or "utf-8"
+            return response.read(MAX_HTML_BYTES).decode(charset, "replace")
+
+    return await asyncio.to_thread(get)
+
+
+def store_metadata(
+    db: Session, gift_id: int, url: str, metadata: LinkMetadata
+) -> None:
+    """Save metadata on a gift, unless its URL changed in the meantime."""
+    db.execute(
+        update(Gift)
+        .where(Gift.id == gift_id, Gift.url == url)
+        .values(
+            link_title=metadata.title,
+            link_image_url=metadata.image_url,
+            link_price=metadata.price,
+            link_fetched_at=datetime.now(timezone.utc),
+        )
+    )
+
+
+def _store_with_new_session(gift_id: int, url: str, metadata: LinkMetadata) -> None:
+    db = SessionLocal()
+    try:
+        store_metadata(db, gift_id, url, metadata)
+        db.commit()
+    finally:
+        db.close()
+
+
+class LinkEnricher:
+    """Background worker that fetches metadata for gift URLs.
+
+    Jobs are processed by a fixed number of worker tasks. Requests to the
+    same host are spaced at least host_interval seconds apart, and results
+    are cached by normalized URL so a popular product is fetched once.
+    The fetcher and store are pluggable for tests.
+    """
+
+    def __init__(
+        self,
+        fetcher: Callable[[str], Awaitable[str]] = fetch_html,
+        store: Callable[[int, str, LinkMetadata], None] = _store_with_new_session,
+        concurrency: int = 8,
+        host_interval: float = 1.0,
+        cache_size: int = 10_000,
+        cache_ttl: float = 24 * 3600,
+    ):
+        self.fetcher = fetcher
+        self.store = store
+        self.concurrency = concurrency
+        self.host_interval = host_interval
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.fetches = 0
+        self.cache_hits = 0
+        self.failures = 0
+        self._cache: OrderedDict[str, tuple[float, LinkMetadata]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._host_locks: dict[str, asyncio.Lock] = {}
+        self._host_last_fetch: OrderedDict[str, float] = OrderedDict()
+        self._queue: asyncio.Queue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._workers: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._work()) for _ in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._loop = None
+
+    def enqueue_on_commit(self, db: Session, gift_id: int, url: str | None) -> None:
+        """Queue a gift for enrichment once db's transaction commits.
+
+        The worker stores results with its own session, so a job queued
+        before the commit could fetch a URL that is then rolled back.
+
+        Parameters:
+            db: The session saving the gift.
+            gift_id: The gift.
+            url: Its new URL.
+        """
+        db.info.setdefault(PENDING_KEY, []).append((self, gift_id, url))
+
+    def enqueue(self, gift_id: int, url: str | None) -> None:
+        """Queue a gift for enrichment. Safe to call from any thread.
+
+        Does nothing if the worker isn't running or the URL isn't http(s).
+        """
+        loop = self._loop
+        if loop is None or url is None or normalize_url(url) is None:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._queue.put_nowait((gift_id, url))
+        else:
+            loop.call_soon_threadsafe(self._queue.put_nowait, (gift_id, url))
+
+    async def join(self) -> None:
+        """Wait until every queued job has been processed."""
+        await self._queue.join()
+
+    async def _work(self) -> None:
+        while True:
+            gift_id, url = await self._queue.get()
+            try:
+                metadata = await self.lookup(url)
+                if metadata is not None:
+                    await asyncio.to_thread(self.store, gift_id, url, metadata)
+            except Exception:
+                self.failures += 1
+            finally:
+                self._queue.task_done()
+
+    async def lookup(self, url: str) -> LinkMetadata | None:
+        """Return metadata for a URL from the cache, or fetch it once."""
+        key = normalize_url(url)
+        if key is None:
+            return None
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached[1]
+
+        # Concurrent jobs for the same URL share one fetch
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.cache_hits += 1
+            return await pending
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            metadata = parse_metadata(await self._fetch(key))
+        except Exception as error:
+            future.set_exception(error)
+            # Mark retrieved so an unawaited failure isn't logged
+            future.exception()
+            raise
+        else:
+            future.set_result(metadata)
+            self._cache[key] = (time.monotonic(), metadata)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return metadata
+        finally:
+            del self._in_flight[key]
+
+    def _prune_hosts(self) -> None:
+        # _host_last_fetch is in fetch order; a host last fetched more
+        # than host_interval ago no longer holds anyone back
+        cutoff = time.monotonic() - self.host_interval
+        while self._host_last_fetch:
+            host, fetched_at = next(iter(self._host_last_fetch.items()))
+            if fetched_at > cutoff or self._host_locks[host].locked():
+                break
+            del self._host_last_fetch[host]
+            del self._host_locks[host]
+
+    async def _fetch(self, url: str) -> str:
+        host = urlsplit(url).netloc
+        self._prune_hosts()
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            wait = (
+                self._host_last_fetch.get(host, float("-inf"))
+                + self.host_interval
+                - time.monotonic()
+            )
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._host_last_fetch[host] = time.monotonic()
+            self._host_last_fetch.move_to_end(host)
+        self.fetches += 1
+        return await self.fetcher(url)
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_pending(session: Session) -> None:
+    # Releasing a savepoint also fires after_commit; wait for the real one
+    if session.in_nested_transaction():
+        return
+    for link_enricher, gift_id, url in session.info.pop(PENDING_KEY, ()):
+        link_enricher.enqueue(gift_id, url)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    if not session.in_nested_transaction():
+        session.info.pop(PENDING_KEY, None)
+
+
+enricher = LinkEnricher(
+    concurrency=settings.link_fetch_concurrency,
+    host_interval=settings.link_fetch_host_interval,
+    cache_size=settings.link_cache_size,
+    cache_ttl=settings.link_cache_ttl,
+)
@@ -0,0 +1,101 @@
+from fastapi import HTTPException, status
+from sqlalchemy import and_, case, literal, select
+from sqlalchemy.orm import Session, lazyload, raiseload
+
+from app.models.collection import Collection
+from app.models.gift_list import GiftList
+from app.models.list_share import ListShare
+
+OWNER = "owner"
+VIEWER = "viewer"
+NONE = "none"
+
+# Roles that satisfy each required role
+GRANTS = {
+    OWNER: {OWNER},
+    VIEWER: {OWNER, VIEWER},
+}
+
+
+def load_list(db: Session, list_id: int, user_id: int) -> tuple[GiftList | None, str]:
+    """Load a list together with the caller's role on it.
+
+    The list is joined left-outer to the caller's share, so the role is
+    decided by the same query that fetches the row. Its gifts and owner
+    are only loaded if a route touches them.
+
+    Parameters:
+        db: Database session.
+        list_id: The list to load.
+        user_id: The caller.
+
+    Returns:
+        The list (None if it doesn't exist) and OWNER, VIEWER or NONE.
+    """
+    role = case(
+        (GiftList.owner_id == user_id, literal(OWNER)),
+        (ListShare.id.is_not(None), literal(VIEWER)),
+        else_=literal(NONE),
+    )
+    row = db.execute(
+        select(GiftList, role)
+        .outerjoin(
+            ListShare,
+            and_(ListShare.list_id == GiftList.id, ListShare.user_id == user_id),
+        )
+        .where(GiftList.id == list_id)
+        .options(
+            lazyload(GiftList.gifts), lazyload(GiftList.owner), raiseload("*")
+        )
+    ).first()
+    if row is None:
+        return None, NONE
+    return row[0], row[1]
+
+
+def load_collection(
+    db: Session, collection_id: int, user_id: int
+) -> tuple[Collection | None, str]:
+    """Load a collection together with the caller's role on it.
+
+    Collections are never shared, so the role is OWNER or NONE.
+
+    Parameters:
+        db: Database session.
+        collection_id: The collection to load.
+        user_id: The caller.
+
+    Returns:
+        The collection (None if it doesn't exist) and its role.
+    """
+    role = case(
+        (Collection.owner_id == user_id, literal(OWNER)),
+        else_=literal(NONE),
+    )
+    row = db.execute(
+        select(Collection, role).where(Collection.id == collection_id)
+    ).first()
+    if row is None:
+        return None, NONE
+    return row[0], row[1]
+
+
+def authorize(resource, role: str, required: str):
+    """Turn a loaded resource and role into a result or an HTTP error.
+
+    Parameters:
+        resource: The loaded row, or None if it doesn't exist.
+        role: The caller's role on it.
+        required: OWNER or VIEWER.
+
+    Returns:
+        The resource.
+
+    Raises:
+        HTTPException: 404 if it doesn't exist, 403 if role is insufficient.
+    """
+    if resource is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if role not in GRANTS[required]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    return resource
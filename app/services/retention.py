@@ -0,0 +1,98 @@
+"""Pruning of the change feed and the job queue, run by the job queue.
+
+Both tables only ever grow otherwise. The prune job reschedules itself
+every retention_interval_seconds; the app queues the first run at
+startup.
+"""
+from sqlalchemy import delete, func, literal_column, select
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.change import Change
+from app.models.change_horizon import ChangeHorizon
+from app.models.job import Job
+from app.services.jobs import DONE, FAILED, PENDING, enqueue_job, job_handler
+
+RETENTION_PRUNE = "retention.prune"
+
+
+def _days_ago(days: int):
+    return func.date_add(
+        func.now(), literal_column(f"INTERVAL {-int(days) * 86400} SECOND")
+    )
+
+
+def _prune_changes(db: Session, batch_size: int) -> int:
+    ids = db.execute(
+        select(Change.id)
+        .where(Change.created_at < _days_ago(settings.change_retention_days))
+        .order_by(Change.id)
+        .limit(batch_size)
+    ).scalars().all()
+    if not ids:
+        return 0
+    # Prune a prefix of IDs, so one number says which tokens still work;
+    # a younger row that got an earlier ID goes with its neighbours
+    horizon = ids[-1]
+    db.execute(
+        insert(ChangeHorizon)
+        .values(id=1, change_id=horizon)
+        .on_duplicate_key_update(
+            change_id=func.greatest(ChangeHorizon.change_id, horizon)
+        )
+    )
+    db.execute(
+        delete(Change)
+        .where(Change.id <= horizon)
+        .execution_options(synchronize_session=False)
+    )
+    return len(ids)
+
+
+def _prune_jobs(db: Session, batch_size: int) -> int:
+    ids = db.execute(
+        select(Job.id)
+        .where(
+            Job.status.in_([DONE, FAILED]),
+            Job.finished_at < _days_ago(settings.job_retention_days),
+        )
+        .order_by(Job.id)
+        .limit(batch_size)
+    ).scalars().all()
+    if ids:
+        db.execute(
+            delete(Job)
+            .where(Job.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+    return len(ids)
+
+
+def schedule_retention(db: Session, delay_seconds: int = 0) -> None:
+    """Queue the prune job unless a run is already waiting.
+
+    Parameters:
+        db: Database session.
+        delay_seconds: How long until the run is due.
+    """
+    waiting = db.execute(
+        select(Job.id).where(Job.kind == RETENTION_PRUNE, Job.status == PENDING)
+    ).first()
+    if waiting is None:
+        enqueue_job(db, RETENTION_PRUNE, delay_seconds)
+
+
+@job_handler(RETENTION_PRUNE)
+def prune(db: Session, payload: dict, batch_size: int) -> bool:
+    """Delete old change feed entries, then finished jobs past retention.
+
+    Changes older than change_retention_days go first, and the horizon
+    moves up with them so sync can turn away tokens from before it.
+    Jobs that finished (or failed) more than job_retention_days ago go
+    next. When both are done the next run is queued.
+    """
+    if _prune_changes(db, batch_size) or _prune_jobs(db, batch_size):
+        return True
+    schedule_retention(db, settings.retention_interval_seconds)
+    return False
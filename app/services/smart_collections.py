@@ -0,0 +1,133 @@
+"""Membership of smart collections, computed from their rules on demand.
+
+A smart collection holds the lists shared with its owner that match
+every rule. Membership is cached per collection alongside the owner's
+change feed position when it was computed: any list, gift or share
+change the owner can see lands in their feed, so a newer feed entry
+means the cached membership may be stale. While the newest entry is
+younger than change_settle_seconds, an older one may still be about to
+commit without moving the position, so membership isn't cached then.
+"""
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+
+from sqlalchemy import Select, exists, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.change import Change
+from app.models.collection import Collection
+from app.models.gift import Gift
+from app.models.gift_list import GiftList
+from app.models.list_share import ListShare
+from app.services.changes import settled
+
+
+def rules_query(owner_id: int, rules: dict) -> Select:
+    """Build the query for the IDs of lists matching a collection's rules.
+
+    Parameters:
+        owner_id: The collection's owner.
+        rules: The collection's rules, as stored.
+
+    Returns:
+        A select of matching list IDs, in list ID order.
+    """
+    query = (
+        select(GiftList.id)
+        .join(ListShare, ListShare.list_id == GiftList.id)
+        .where(ListShare.user_id == owner_id)
+    )
+    if rules.get("shared_by") is not None:
+        query = query.where(GiftList.owner_id == rules["shared_by"])
+    if rules.get("unclaimed_under") is not None:
+        query = query.where(
+            exists().where(
+                Gift.list_id == GiftList.id,
+                Gift.claimed_by_id.is_(None),
+                Gift.price < Decimal(str(rules["unclaimed_under"])),
+            )
+        )
+    return query.order_by(GiftList.id)
+
+
+def feed_version(db: Session, user_id: int) -> int | None:
+    """Return the ID of the newest entry in a user's change feed.
+
+    Returns None while that entry hasn't settled, since a change with a
+    lower ID could still commit without changing the result.
+    """
+    row = db.execute(
+        select(Change.id, settled())
+        .where(Change.user_id == user_id)
+        .order_by(Change.id.desc())
+        .limit(1)
+    ).first()
+    if row is None:
+        return 0
+    change_id, is_settled = row
+    return change_id if is_settled else None
+
+
+class MembershipCache:
+    """In-process LRU cache of smart collection membership.
+
+    Entries remember the rules and feed version they were computed from
+    and are only served while both still match.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, tuple[int, dict, tuple[int, ...]]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def list_ids(
+        self, db: Session, collection: Collection, version: int | None
+    ) -> tuple[int, ...]:
+        """Return the IDs of the lists in a smart collection.
+
+        Parameters:
+            db: Database session.
+            collection: A collection with rules.
+            version: The owner's feed_version. None computes membership
+                without caching it.
+
+        Returns:
+            Matching list IDs, in list ID order.
+        """
+        with self._lock:
+            entry = self._entries.get(collection.id)
+            if (
+                version is not None
+                and entry is not None
+                and entry[:2] == (version, collection.rules)
+            ):
+                self._entries.move_to_end(collection.id)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        list_ids = tuple(
+            db.execute(rules_query(collection.owner_id, collection.rules)).scalars()
+        )
+        if version is None:
+            return list_ids
+        with self._lock:
+            self._entries[collection.id] = (version, collection.rules, list_ids)
+            self._entries.move_to_end(collection.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return list_ids
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+smart_membership = MembershipCache(settings.smart_collection_cache_size)
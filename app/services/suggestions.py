@@ -0,0 +1,190 @@
+from sqlalchemy import and_, delete, exists, func, literal, or_, select, update
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.orm import Session
+
+from app.models.connection import Connection
+from app.models.connection_suggestion import ConnectionSuggestion
+from app.models.user import User
+
+
+def lock_endpoints(db: Session, *user_ids: int) -> None:
+    """Lock the user rows at the ends of connections about to change.
+
+    Two connection changes can only move the same mutual count if they
+    share an endpoint, so holding these locks (taken in id order) from
+    before the connection row is touched until commit serializes every
+    pair of changes whose adjustments could race. The reads in _adjust
+    are locking reads, so the second one to run sees the first's
+    committed connection.
+
+    Parameters:
+        db: Database session.
+        user_ids: Both ends of each connection being accepted or removed.
+    """
+    db.execute(
+        select(User.id)
+        .where(User.id.in_(set(user_ids)))
+        .order_by(User.id)
+        .with_for_update()
+    ).all()
+
+
+def _adjust(db: Session, center: int, other: int, delta: int) -> None:
+    """Change the mutual count between other and each of center's connections.
+
+    When center and other connect (or disconnect), center is gained (or
+    lost) as a mutual connection between other and every other user
+    center is connected with. Callers hold lock_endpoints on both users.
+    """
+    neighbor = Connection.other_user_id(center)
+    criteria = (
+        Connection.status == "accepted",
+        Connection.involving(center),
+        neighbor != other,
+    )
+    if delta > 0:
+        for columns in (
+            (literal(other), neighbor),
+            (neighbor, literal(other)),
+        ):
+            statement = insert(ConnectionSuggestion).from_select(
+                ["user_id", "candidate_id", "mutual_count"],
+                select(*columns, literal(delta)).where(*criteria),
+            )
+            db.execute(
+                statement.on_duplicate_key_update(
+                    mutual_count=ConnectionSuggestion.mutual_count + delta
+                )
+            )
+        return
+    neighbors = select(neighbor).where(*criteria)
+    db.execute(
+        update(ConnectionSuggestion)
+        .where(
+            or_(
+                and_(
+                    ConnectionSuggestion.user_id == other,
+                    ConnectionSuggestion.candidate_id.in_(neighbors),
+                ),
+                and_(
+                    ConnectionSuggestion.candidate_id == other,
+                    ConnectionSuggestion.user_id.in_(neighbors),
+                ),
+            )
+        )
+        .values(mutual_count=ConnectionSuggestion.mutual_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        delete(ConnectionSuggestion)
+        .where(
+            ConnectionSuggestion.mutual_count <= 0,
+            or_(
+                ConnectionSuggestion.user_id == other,
+                ConnectionSuggestion.candidate_id == other,
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def connection_added(db: Session, user_a: int, user_b: int) -> None:
+    """Update mutual counts for a newly accepted connection.
+
+    Call with both users locked by lock_endpoints, taken before the
+    connection row was read and changed.
+
+    Parameters:
+        db: Database session.
+        user_a: One party.
+        user_b: The other party.
+    """
+    _adjust(db, user_a, user_b, 1)
+    _adjust(db, user_b, user_a, 1)
+
+
+def connection_removed(db: Session, user_a: int, user_b: int) -> None:
+    """Update mutual counts for an accepted connection being removed.
+
+    Call before the connection row is deleted or stops being accepted,
+    with both users locked by lock_endpoints and the row re-read since.
+
+    Parameters:
+        db: Database session.
+        user_a: One party.
+        user_b: The other party.
+    """
+    _adjust(db, user_a, user_b, -1)
+    _adjust(db, user_b, user_a, -1)
+
+
+def rebuild_suggestions(db: Session) -> None:
+    """Recompute every mutual count from the connections table.
+
+    A one-off self-join over accepted connections, for backfills and
+    repairs; day-to-day changes go through connection_added and
+    connection_removed.
+
+    Parameters:
+        db: Database session.
+    """
+    edges = (
+        select(
+            Connection.low_user_id.label("user_id"),
+            Connection.high_user_id.label("friend_id"),
+        )
+        .where(Connection.status == "accepted")
+        .union_all(
+            select(Connection.high_user_id, Connection.low_user_id).where(
+                Connection.status == "accepted"
+            )
+        )
+        .subquery()
+    )
+    mine = edges.alias("mine")
+    theirs = edges.alias("theirs")
+    db.execute(delete(ConnectionSuggestion))
+    db.execute(
+        insert(ConnectionSuggestion).from_select(
+            ["user_id", "candidate_id", "mutual_count"],
+            select(mine.c.user_id, theirs.c.user_id, func.count())
+            .join(theirs, theirs.c.friend_id == mine.c.friend_id)
+            .where(mine.c.user_id != theirs.c.user_id)
+            .group_by(mine.c.user_id, theirs.c.user_id),
+        )
+    )
+
+
+def suggest_connections(db: Session, user_id: int, limit: int) -> list[dict]:
+    """Suggest active users who share the most connections with a user.
+
+    Anyone the user is already connected to, or has a pending request
+    with, is left out.
+
+    Parameters:
+        db: Database session.
+        user_id: The user.
+        limit: Maximum number of suggestions.
+
+    Returns:
+        Dicts with id, name and mutual_count, most mutuals first.
+    """
+    already_linked = exists().where(
+        Connection.low_user_id
+        == func.least(user_id, ConnectionSuggestion.candidate_id),
+        Connection.high_user_id
+        == func.greatest(user_id, ConnectionSuggestion.candidate_id),
+    )
+    rows = db.execute(
+        select(User.id, User.name, ConnectionSuggestion.mutual_count)
+        .join(User, User.id == ConnectionSuggestion.candidate_id)
+        .where(
+            ConnectionSuggestion.user_id == user_id,
+            ConnectionSuggestion.mutual_count > 0,
+            User.is_active.is_(True),
+            ~already_linked,
+        )
+        .order_by(ConnectionSuggestion.mutual_count.desc(), User.id)
+        .limit(limit)
+    ).all()
+    return [row._asdict() for row in rows]
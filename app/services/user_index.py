@@ -0,0 +1,110 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Generic, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+PENDING_KEY = "user_index_invalidations"
+
+T = TypeVar("T")
+
+
+class UserIndex(Generic[T]):
+    """In-process LRU cache of one value per user, loaded lazily.
+
+    Each user has a version that invalidation bumps, so a load that
+    raced with an invalidation is never cached. Subclasses implement
+    load().
+    """
+
+    def __init__(self, max_users: int = 10_000):
+        self.max_users = max_users
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[int, T] = OrderedDict()
+        self._versions: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def load(self, db: Session, user_id: int) -> T:
+        raise NotImplementedError
+
+    def get(self, db: Session, user_id: int) -> T:
+        """Return a user's cached value, loading it on a miss.
+
+        Parameters:
+            db: Database session used on a cache miss.
+            user_id: The user.
+
+        Returns:
+            The value for the user.
+        """
+        with self._lock:
+            cached = self._entries.get(user_id)
+            if cached is not None:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return cached
+            self.misses += 1
+            version = self._versions.get(user_id, 0)
+
+        value = self.load(db, user_id)
+
+        with self._lock:
+            if self._versions.get(user_id, 0) == version:
+                self._entries[user_id] = value
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_users:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        with self._lock:
+            for user_id in set(user_ids):
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+                self._entries.pop(user_id, None)
+                self.invalidations += 1
+
+    def invalidate_on_commit(self, db: Session, user_ids: Iterable[int]) -> None:
+        """Drop cached values for users whose data is changing.
+
+        Invalidates now and again when the transaction ends, so an entry
+        reloaded before the commit (or from rows that were rolled back)
+        doesn't outlive it.
+
+        Parameters:
+            db: The session making the change.
+            user_ids: Users whose values are changing.
+        """
+        user_ids = set(user_ids)
+        self.invalidate(user_ids)
+        pending = db.info.setdefault(PENDING_KEY, {})
+        pending.setdefault(self, set()).update(user_ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self.hits = self.misses = self.invalidations = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "users": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _invalidate_pending(session: Session) -> None:
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        for index, user_ids in pending.items():
+            index.invalidate(user_ids)
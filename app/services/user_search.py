@@ -0,0 +1,170 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import and_, or_, select, union
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.connection import Connection
+from app.models.user import User
+from app.services.connection_graph import connection_index
+
+CONNECTED = "connected"
+FRIEND_OF_FRIEND = "friend_of_friend"
+NONE = "none"
+
+RANK = {CONNECTED: 0, FRIEND_OF_FRIEND: 1, NONE: 2}
+
+
+class PrefixCache:
+    """Short-lived LRU cache of prefix matches, shared by every caller.
+
+    Entries expire after ttl seconds, so new users and renames show up
+    without any invalidation.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, tuple]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] >= self.ttl:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: tuple) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+prefix_cache = PrefixCache(settings.user_search_cache_size, settings.user_search_cache_ttl)
+
+
+def match_prefix(db: Session, q: str, limit: int) -> tuple:
+    """Find active users whose name, or email, starts with q.
+
+    Name and email are probed separately so each uses its own index.
+    Email is only matched when q contains "@", so members can't list
+    addresses by typing a letter.
+
+    Parameters:
+        db: Database session.
+        q: The prefix.
+        limit: The most matches to return from each index.
+
+    Returns:
+        Tuple of (id, name) rows, cached by lowercased prefix.
+    """
+    key = f"{limit}:{q.lower()}"
+    cached = prefix_cache.get(key)
+    if cached is not None:
+        return cached
+    queries = [
+        select(User.id, User.name)
+        .where(User.name.startswith(q, autoescape=True), User.is_active.is_(True))
+        .order_by(User.name)
+        .limit(limit)
+    ]
+    if "@" in q:
+        queries.append(
+            select(User.id, User.name)
+            .where(User.email.startswith(q, autoescape=True), User.is_active.is_(True))
+            .order_by(User.email)
+            .limit(limit)
+        )
+    statement = union(*queries) if len(queries) > 1 else queries[0]
+    rows = tuple(tuple(row) for row in db.execute(statement))
+    prefix_cache.put(key, rows)
+    return rows
+
+
+def _friends_of_friends(
+    db: Session, candidate_ids: set[int], my_connections: set[int]
+) -> set[int]:
+    """Return the candidates connected to at least one of my connections."""
+    if not candidate_ids or not my_connections:
+        return set()
+    rows = db.execute(
+        select(Connection.low_user_id, Connection.high_user_id).where(
+            Connection.status == "accepted",
+            or_(
+                and_(
+                    Connection.low_user_id.in_(candidate_ids),
+                    Connection.high_user_id.in_(my_connections),
+                ),
+                and_(
+                    Connection.high_user_id.in_(candidate_ids),
+                    Connection.low_user_id.in_(my_connections),
+                ),
+            ),
+        )
+    ).all()
+    return {
+        user_id for pair in rows for user_id in pair if user_id in candidate_ids
+    }
+
+
+def search_users(db: Session, user_id: int, q: str, limit: int) -> list[dict]:
+    """Rank prefix matches for one user.
+
+    Existing connections come first, then friends of friends, then
+    everyone else, each group ordered by name.
+
+    Parameters:
+        db: Database session.
+        user_id: The user searching, who is left out of the results.
+        q: The prefix.
+        limit: Maximum number of results.
+
+    Returns:
+        Dicts with id, name and relationship.
+    """
+    my_connections = set(connection_index.connections(db, user_id))
+    matches = {
+        row[0]: row[1] for row in match_prefix(db, q, limit) if row[0] != user_id
+    }
+    # Connections past the shared cut-off still rank first
+    if my_connections:
+        matches.update(
+            db.execute(
+                select(User.id, User.name)
+                .where(
+                    User.id.in_(my_connections),
+                    User.name.startswith(q, autoescape=True),
+                    User.is_active.is_(True),
+                )
+                .limit(limit)
+            ).tuples().all()
+        )
+    candidate_ids = set(matches) - my_connections
+    nearby = _friends_of_friends(db, candidate_ids, my_connections)
+
+    results = []
+    for match_id, name in matches.items():
+        if match_id in my_connections:
+            relationship = CONNECTED
+        elif match_id in nearby:
+            relationship = FRIEND_OF_FRIEND
+        else:
+            relationship = NONE
+        results.append({"id": match_id, "name": name, "relationship": relationship})
+    results.sort(key=lambda r: (RANK[r["relationship"]], r["name"].lower(), r["id"]))
+    return results[:limit]
@@ -0,0 +1,97 @@
+"""Cascade benchmark for removing an accepted connection.
+
+Seeds two connected users against the test database, where one owns
+10,000 lists shared with the other and the other keeps all of them in a
+collection, then times delete_connection and counts the statements it
+runs. Everything happens in one transaction that is rolled back.
+
+Usage: python -m benchmarks.connection_cascade
+"""
+import time
+
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import Base
+from app.models.collection import Collection
+from app.models.collection_item import CollectionItem
+from app.models.connection import Connection
+from app.models.gift_list import GiftList
+from app.models.list_share import ListShare
+from app.models.user import User
+from app.routers.connections import delete_connection
+
+SHARES = 10_000
+
+
+def seed(db: Session) -> tuple[Connection, User]:
+    owner = User(email="bench-owner@test.com", name="Owner", password_hash="x")
+    viewer = User(email="bench-viewer@test.com", name="Viewer", password_hash="x")
+    db.add_all([owner, viewer])
+    db.flush()
+    connection = Connection(
+        requester_id=owner.id, addressee_id=viewer.id, status="accepted"
+    )
+    collection = Collection(name="Everything", owner_id=viewer.id)
+    db.add_all([connection, collection])
+    db.flush()
+
+    db.execute(
+        insert(GiftList),
+        [{"name": f"List {n}", "owner_id": owner.id} for n in range(SHARES)],
+    )
+    list_ids = db.execute(
+        select(GiftList.id).where(GiftList.owner_id == owner.id)
+    ).scalars().all()
+    db.execute(
+        insert(ListShare),
+        [{"list_id": list_id, "user_id": viewer.id} for list_id in list_ids],
+    )
+    db.execute(
+        insert(CollectionItem),
+        [
+            {"collection_id": collection.id, "list_id": list_id}
+            for list_id in list_ids
+        ],
+    )
+    return connection, owner
+
+
+def main() -> None:
+    engine = create_engine(settings.test_database_url)
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        db = Session(bind=conn)
+        connection, owner = seed(db)
+        connection_id, viewer_id = connection.id, connection.addressee_id
+        db.expunge_all()
+        owner = db.get(User, owner.id)
+
+        statements = 0
+
+        def count(*args):
+            nonlocal statements
+            statements += 1
+
+        event.listen(conn, "before_cursor_execute", count)
+        start = time.perf_counter()
+        delete_connection(connection_id, owner, db)
+        elapsed = time.perf_counter() - start
+        event.remove(conn, "before_cursor_execute", count)
+
+        remaining = db.execute(
+            select(ListShare.id).where(ListShare.user_id == viewer_id).limit(1)
+        ).first()
+        print(
+            f"delete_connection with {SHARES:,} shares and collection items: "
+            f"{elapsed * 1000:8.1f} ms, {statements} statements"
+        )
+        assert remaining is None
+        db.close()
+        transaction.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Suggestion benchmark on a synthetic connection graph.
+
+Seeds 100,000 users against the test database, each connected to a few
+neighbours on a ring and a few random users, builds the suggestion table
+once, then compares reading suggestions from it with the equivalent
+friends-of-friends self-join, and times keeping it up to date as a
+connection is accepted and removed. Everything happens in one
+transaction that is rolled back.
+
+Usage: python -m benchmarks.connection_suggestions
+"""
+import random
+import time
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session, aliased
+
+from app.config import settings
+from app.database import Base
+from app.models.connection import Connection
+from app.models.user import User
+from app.services.suggestions import (
+    connection_added,
+    connection_removed,
+    rebuild_suggestions,
+    suggest_connections,
+)
+
+USERS = 100_000
+RING = 2
+RANDOM = 3
+CHUNK = 10_000
+RUNS = 100
+
+
+def seed(db: Session) -> list[int]:
+    for start in range(0, USERS, CHUNK):
+        db.execute(
+            insert(User),
+            [
+                {
+                    "email": f"bench-{n}@test.com",
+                    "name": f"User {n}",
+                    "password_hash": "x",
+                }
+                for n in range(start, min(start + CHUNK, USERS))
+            ],
+        )
+    user_ids = db.execute(
+        select(User.id).where(User.email.startswith("bench-")).order_by(User.id)
+    ).scalars().all()
+
+    rng = random.Random(0)
+    pairs: set[tuple[int, int]] = set()
+    for index, user_id in enumerate(user_ids):
+        others = [user_ids[(index + step) % USERS] for step in range(1, RING + 1)]
+        others += rng.sample(user_ids, RANDOM)
+        for other_id in others:
+            if other_id != user_id:
+                pairs.add((min(user_id, other_id), max(user_id, other_id)))
+    rows = [
+        {
+            "requester_id": low,
+            "addressee_id": high,
+            "low_user_id": low,
+            "high_user_id": high,
+            "status": "accepted",
+        }
+        for low, high in pairs
+    ]
+    for start in range(0, len(rows), CHUNK):
+        db.execute(insert(Connection), rows[start:start + CHUNK])
+    return user_ids
+
+
+def naive_suggestions(db: Session, user_id: int, limit: int) -> list:
+    mine = aliased(Connection)
+    theirs = aliased(Connection)
+    friend = Connection.other_user_id(user_id)
+    friend_ids = select(friend).where(
+        Connection.involving(user_id), Connection.status == "accepted"
+    )
+    mine_friend = mine.low_user_id + mine.high_user_id - user_id
+    candidate = theirs.low_user_id + theirs.high_user_id - mine_friend
+    return db.execute(
+        select(candidate, func.count())
+        .select_from(mine)
+        .join(
+            theirs,
+            (theirs.status == "accepted")
+            & ((theirs.low_user_id == mine_friend) | (theirs.high_user_id == mine_friend)),
+        )
+        .where(
+            (mine.low_user_id == user_id) | (mine.high_user_id == user_id),
+            mine.status == "accepted",
+            candidate != user_id,
+            candidate.not_in(friend_ids),
+        )
+        .group_by(candidate)
+        .order_by(func.count().desc())
+        .limit(limit)
+    ).all()
+
+
+def timed(label: str, run) -> None:
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        run()
+    elapsed = (time.perf_counter() - start) / RUNS
+    print(f"{label:<40} {elapsed * 1000:8.2f} ms")
+
+
+def main() -> None:
+    engine = create_engine(settings.test_database_url)
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        db = Session(bind=conn)
+        user_ids = seed(db)
+
+        start = time.perf_counter()
+        rebuild_suggestions(db)
+        print(
+            f"{'rebuild for ' + format(USERS, ',') + ' users':<40} "
+            f"{(time.perf_counter() - start) * 1000:8.1f} ms"
+        )
+
+        rng = random.Random(1)
+        readers = [rng.choice(user_ids) for _ in range(RUNS)]
+        picks = iter(readers * 2)
+        timed("suggestions from table", lambda: suggest_connections(db, next(picks), 10))
+        timed("suggestions by self-join", lambda: naive_suggestions(db, next(picks), 10))
+
+        user_a, user_b = user_ids[0], user_ids[USERS // 2]
+        connection = Connection(
+            requester_id=user_a, addressee_id=user_b, status="accepted"
+        )
+        db.add(connection)
+        db.flush()
+
+        def toggle() -> None:
+            connection_added(db, user_a, user_b)
+            connection_removed(db, user_a, user_b)
+
+        timed("accept + remove maintenance", toggle)
+        db.close()
+        transaction.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Fan-out benchmark for the list event broker.
+
+Subscribes thousands of idle SSE-style consumers to one list channel,
+with more idle subscribers parked on other lists, then publishes from a
+worker thread the way sync route handlers do and measures how long it
+takes for every subscriber to receive every event.
+
+Usage: python -m benchmarks.event_fanout
+"""
+import asyncio
+import threading
+import time
+
+from app.services.events import InProcessBroker, LocalBus, RelayBroker
+
+EVENTS = 100
+BYSTANDERS = 10_000
+
+
+async def run(broker, publisher, subscribers: int) -> float:
+    watching = [broker.subscribe("list:1") for _ in range(subscribers)]
+    idle = [broker.subscribe(f"list:{n + 2}") for n in range(BYSTANDERS)]
+
+    async def drain(subscription):
+        for _ in range(EVENTS):
+            await subscription.get()
+
+    def publish():
+        for n in range(EVENTS):
+            publisher.publish("list:1", {"type": "gift.updated", "n": n})
+
+    start = time.perf_counter()
+    thread = threading.Thread(target=publish)
+    thread.start()
+    await asyncio.gather(*(drain(s) for s in watching))
+    elapsed = time.perf_counter() - start
+    thread.join()
+    for subscription in watching + idle:
+        subscription.close()
+    return elapsed
+
+
+def main() -> None:
+    for subscribers in (1_000, 5_000, 10_000):
+        broker = InProcessBroker(queue_size=EVENTS)
+        elapsed = asyncio.run(run(broker, broker, subscribers))
+        deliveries = subscribers * EVENTS
+        print(
+            f"in-process {subscribers:>6} subscribers: "
+            f"{elapsed * 1000:8.1f} ms, "
+            f"{deliveries / elapsed:>12,.0f} deliveries/s"
+        )
+
+    for subscribers in (1_000, 5_000):
+        bus = LocalBus()
+        worker_a = RelayBroker(bus, queue_size=EVENTS)
+        worker_b = RelayBroker(bus, queue_size=EVENTS)
+        elapsed = asyncio.run(run(worker_b, worker_a, subscribers))
+        deliveries = subscribers * EVENTS
+        print(
+            f"relay      {subscribers:>6} subscribers: "
+            f"{elapsed * 1000:8.1f} ms, "
+            f"{deliveries / elapsed:>12,.0f} deliveries/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
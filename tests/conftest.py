@@ -1,5 +1,7 @@
+from contextlib import contextmanager
+
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
@@ -8,6 +10,18 @@ from app.database import Base
 from app.dependencies import get_db, create_access_token
 from app.main import app
 from app.models.user import User
+from app.services.connection_graph import connection_index
+from app.services.smart_collections import smart_membership
+from app.services.user_search import prefix_cache
+
+# InnoDB only updates FULLTEXT indexes on commit, and every test rolls back
+settings.gift_search_fulltext = False
+# Tests drive the link enricher directly instead of fetching real URLs
+settings.link_enrichment_enabled = False
+# Tests drain queued jobs inside their own transaction
+settings.job_worker_enabled = False
+# Tests read the change feed right after writing to it
+settings.change_settle_seconds = 0
 
 test_engine = create_engine(settings.test_database_url)
 TestSession = sessionmaker(bind=test_engine)
@@ -20,6 +34,18 @@ def setup_test_db():
     Base.metadata.drop_all(bind=test_engine)
 
 
+@pytest.fixture(autouse=True)
+def reset_user_indexes():
+    # Fixtures write shares and connections directly and every test rolls back
+    connection_index.clear()
+    prefix_cache.clear()
+    smart_membership.clear()
+    yield
+    connection_index.clear()
+    prefix_cache.clear()
+    smart_membership.clear()
+
+
 @pytest.fixture
 def db():
     connection = test_engine.connect()
@@ -32,10 +58,34 @@ def db():
     connection.close()
 
 
+@pytest.fixture
+def count_queries(db):
+    """Context manager collecting the SQL statements run on the test connection."""
+
+    @contextmanager
+    def counter():
+        statements: list[str] = []
+
+        def before_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        bind = db.get_bind()
+        event.listen(bind, "before_cursor_execute", before_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(bind, "before_cursor_execute", before_execute)
+
+    return counter
+
+
 @pytest.fixture
 def client(db):
     def override_get_db():
+        # Commits end the session's transaction but not the connection's,
+        # so commit hooks run and the test still rolls everything back
         yield db
+        db.commit()
 
     app.dependency_overrides[get_db] = override_get_db
     with TestClient(app) as c:
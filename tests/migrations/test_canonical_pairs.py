@@ -0,0 +1,67 @@
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+
+pytestmark = pytest.mark.skipif(
+    not settings.migration_test_database_url.startswith("mysql"),
+    reason="needs an empty MySQL database in APP_MIGRATION_TEST_DATABASE_URL",
+)
+
+BEFORE = "e20db4322d70"
+CANONICAL_PAIRS = "f1c702f8dc63"
+
+
+@pytest.fixture
+def alembic_config(monkeypatch):
+    # env.py migrates settings.database_url
+    monkeypatch.setattr(settings, "database_url", settings.migration_test_database_url)
+    config = Config("alembic.ini")
+    command.downgrade(config, "base")
+    yield config
+    command.downgrade(config, "base")
+
+
+def test_reverse_duplicates_are_dropped(alembic_config):
+    command.upgrade(alembic_config, BEFORE)
+    engine = create_engine(settings.migration_test_database_url)
+    with engine.begin() as connection:
+        for user_id in (1, 2, 3, 4):
+            connection.execute(
+                text(
+                    "INSERT INTO users (id, email, name, password_hash, role, is_active) "
+                    "VALUES (:id, :email, 'User', 'x', 'member', 1)"
+                ),
+                {"id": user_id, "email": f"user{user_id}@test.com"},
+            )
+        connection.execute(
+            text(
+                "INSERT INTO connections (id, requester_id, addressee_id, status) VALUES "
+                # Both pending: the older request stays
+                "(1, 1, 2, 'pending'), (2, 2, 1, 'pending'), "
+                # The accepted one stays even though it's newer
+                "(3, 3, 1, 'pending'), (4, 1, 3, 'accepted'), "
+                # No reverse row
+                "(5, 4, 1, 'accepted')"
+            )
+        )
+
+    command.upgrade(alembic_config, CANONICAL_PAIRS)
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text(
+                "SELECT id, low_user_id, high_user_id FROM connections ORDER BY id"
+            )
+        ).all()
+        tombstones = connection.execute(
+            text(
+                "SELECT user_id, entity_id FROM changes "
+                "WHERE entity = 'connection' AND op = 'delete' "
+                "ORDER BY entity_id, user_id"
+            )
+        ).all()
+    engine.dispose()
+    assert [tuple(row) for row in rows] == [(1, 1, 2), (4, 1, 3), (5, 1, 4)]
+    assert [tuple(row) for row in tombstones] == [(1, 2), (2, 2), (1, 3), (3, 3)]
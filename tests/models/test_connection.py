@@ -63,3 +63,34 @@ def test_connection_unique_constraint(db):
 
     with pytest.raises(sqlalchemy.exc.IntegrityError):
         db.flush()
+
+
+def test_connection_canonical_pair(db):
+    user_a = User(email="usera4@test.com", name="User A", password_hash="h")
+    user_b = User(email="userb4@test.com", name="User B", password_hash="h")
+    db.add_all([user_a, user_b])
+    db.flush()
+
+    connection = Connection(requester_id=user_b.id, addressee_id=user_a.id)
+    db.add(connection)
+    db.flush()
+
+    assert connection.low_user_id == min(user_a.id, user_b.id)
+    assert connection.high_user_id == max(user_a.id, user_b.id)
+    found = db.execute(
+        sqlalchemy.select(Connection).where(Connection.between(user_a.id, user_b.id))
+    ).scalar_one()
+    assert found is connection
+
+
+def test_connection_reverse_pair_unique(db):
+    user_a = User(email="usera5@test.com", name="User A", password_hash="h")
+    user_b = User(email="userb5@test.com", name="User B", password_hash="h")
+    db.add_all([user_a, user_b])
+    db.flush()
+
+    db.add(Connection(requester_id=user_a.id, addressee_id=user_b.id))
+    db.flush()
+    db.add(Connection(requester_id=user_b.id, addressee_id=user_a.id))
+    with pytest.raises(sqlalchemy.exc.IntegrityError):
+        db.flush()
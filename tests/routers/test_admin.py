@@ -0,0 +1,18 @@
+def test_stats_as_admin(client, admin_headers, admin_user, member_user, connection, db):
+    from app.services.connection_graph import connection_index
+
+    for _ in range(2):
+        assert connection_index.are_connected(db, member_user.id, admin_user.id)
+
+    response = client.get("/admin/stats", headers=admin_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {"connections", "jobs"}
+    assert data["connections"]["misses"] == 1
+    assert data["connections"]["hits"] == 1
+    assert data["connections"]["hit_ratio"] == 0.5
+
+
+def test_stats_as_member(client, member_headers):
+    response = client.get("/admin/stats", headers=member_headers)
+    assert response.status_code == 403
@@ -174,3 +174,260 @@ def test_remove_item_not_found(client, member_headers, collection):
         headers=member_headers,
     )
     assert response.status_code == 404
+
+
+def test_get_collection_query_count(
+    client, member_user, member_headers, collection, db, count_queries
+):
+    from app.models.collection_item import CollectionItem
+    from app.models.gift import Gift
+    from app.models.gift_list import GiftList
+
+    def add_lists(count):
+        for i in range(count):
+            gift_list = GiftList(name=f"List {i}", owner_id=member_user.id)
+            db.add(gift_list)
+            db.flush()
+            db.add(Gift(list_id=gift_list.id, name=f"Gift {i}"))
+            db.add(CollectionItem(collection_id=collection.id, list_id=gift_list.id))
+        db.flush()
+        db.expire_all()
+
+    add_lists(1)
+    with count_queries() as few:
+        client.get(f"/collections/{collection.id}", headers=member_headers)
+
+    add_lists(10)
+    with count_queries() as many:
+        response = client.get(f"/collections/{collection.id}", headers=member_headers)
+    assert len(response.json()["lists"]) == 11
+    assert len(many) == len(few)
+
+
+def _add_totals_fixtures(db, member_user, admin_user, collection, sample_list):
+    from decimal import Decimal
+
+    from app.models.collection_item import CollectionItem
+    from app.models.gift import Gift
+    from app.models.gift_list import GiftList
+
+    # member's collection holds the admin's list and one of their own
+    theirs = GiftList(name="Admin's List", owner_id=admin_user.id)
+    db.add(theirs)
+    db.flush()
+    db.add_all([
+        Gift(list_id=theirs.id, name="Mine", price=Decimal("20.00"),
+             claimed_by_id=member_user.id),
+        Gift(list_id=theirs.id, name="Unpriced", claimed_by_id=member_user.id),
+        Gift(list_id=theirs.id, name="Open", price=Decimal("5.00")),
+        Gift(list_id=sample_list.id, name="Own gift"),
+        CollectionItem(collection_id=collection.id, list_id=theirs.id),
+        CollectionItem(collection_id=collection.id, list_id=sample_list.id),
+    ])
+    db.flush()
+    return theirs
+
+
+def test_collection_totals(
+    client, member_user, member_headers, admin_user, collection, sample_list, db
+):
+    theirs = _add_totals_fixtures(db, member_user, admin_user, collection, sample_list)
+
+    data = client.get(f"/collections/{collection.id}", headers=member_headers).json()
+    assert (
+        data["gift_count"], data["claimed_by_me"], data["unclaimed_count"]
+    ) == (4, 2, 1)
+    assert float(data["my_spend"]) == 20.0
+    by_id = {entry["id"]: entry for entry in data["lists"]}
+    assert by_id[theirs.id]["unclaimed_count"] == 1
+    assert by_id[sample_list.id]["unclaimed_count"] is None
+
+    listed = client.get("/collections", headers=member_headers).json()
+    assert (
+        listed[0]["gift_count"], listed[0]["claimed_by_me"], listed[0]["unclaimed_count"]
+    ) == (4, 2, 1)
+    assert float(listed[0]["my_spend"]) == 20.0
+
+
+def test_set_items_full_set(
+    client, member_user, member_headers, collection, collection_item, db
+):
+    from app.models.gift_list import GiftList
+
+    other = GiftList(name="Another", owner_id=member_user.id)
+    db.add(other)
+    db.flush()
+
+    response = client.put(
+        f"/collections/{collection.id}/items",
+        json={"list_ids": [other.id]},
+        headers=member_headers,
+    )
+    assert response.status_code == 200
+    assert [entry["id"] for entry in response.json()["lists"]] == [other.id]
+
+
+def test_set_items_diff(client, member_user, member_headers, collection, collection_item, db):
+    from app.models.gift_list import GiftList
+
+    lists = [GiftList(name=f"List {i}", owner_id=member_user.id) for i in range(3)]
+    db.add_all(lists)
+    db.flush()
+
+    response = client.put(
+        f"/collections/{collection.id}/items",
+        json={"add": [lists[2].id, lists[0].id], "remove": [collection_item.list_id]},
+        headers=member_headers,
+    )
+    assert response.status_code == 200
+    assert [entry["id"] for entry in response.json()["lists"]] == [
+        lists[2].id,
+        lists[0].id,
+    ]
+
+
+def test_set_items_forbidden_changes_nothing(
+    client, member_headers, admin_user, collection, collection_item, db
+):
+    from app.models.gift_list import GiftList
+
+    unshared = GiftList(name="Private", owner_id=admin_user.id)
+    db.add(unshared)
+    db.flush()
+
+    response = client.put(
+        f"/collections/{collection.id}/items",
+        json={"list_ids": [unshared.id]},
+        headers=member_headers,
+    )
+    assert response.status_code == 403
+    detail = client.get(f"/collections/{collection.id}", headers=member_headers).json()
+    assert [entry["id"] for entry in detail["lists"]] == [collection_item.list_id]
+
+
+def test_set_items_nonexistent_list(client, member_headers, collection):
+    response = client.put(
+        f"/collections/{collection.id}/items",
+        json={"add": [99999]},
+        headers=member_headers,
+    )
+    assert response.status_code == 404
+
+
+def test_set_items_rejects_set_and_diff(client, member_headers, collection):
+    response = client.put(
+        f"/collections/{collection.id}/items",
+        json={"list_ids": [], "add": [1]},
+        headers=member_headers,
+    )
+    assert response.status_code == 422
+
+
+def _admin_list_shared_with_member(db, admin_user, member_user, name="Admin's List"):
+    from app.models.gift_list import GiftList
+    from app.models.list_share import ListShare
+
+    gift_list = GiftList(name=name, owner_id=admin_user.id)
+    db.add(gift_list)
+    db.flush()
+    db.add(ListShare(list_id=gift_list.id, user_id=member_user.id))
+    db.flush()
+    return gift_list
+
+
+def _create_smart(client, headers, rules):
+    response = client.post(
+        "/collections", json={"name": "Smart", "rules": rules}, headers=headers
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_smart_collection_shared_by(
+    client, member_user, member_headers, admin_user, admin_headers, connection, db
+):
+    from app.models.gift_list import GiftList
+
+    first = _admin_list_shared_with_member(db, admin_user, member_user)
+    collection_id = _create_smart(client, member_headers, {"shared_by": admin_user.id})
+
+    detail = client.get(f"/collections/{collection_id}", headers=member_headers).json()
+    assert detail["rules"]["shared_by"] == admin_user.id
+    assert [entry["id"] for entry in detail["lists"]] == [first.id]
+
+    second = GiftList(name="Later", owner_id=admin_user.id)
+    db.add(second)
+    db.flush()
+    client.post(
+        f"/lists/{second.id}/shares",
+        json={"user_id": member_user.id},
+        headers=admin_headers,
+    )
+    detail = client.get(f"/collections/{collection_id}", headers=member_headers).json()
+    assert [entry["id"] for entry in detail["lists"]] == [first.id, second.id]
+
+
+def test_smart_collection_unclaimed_under(
+    client, member_user, member_headers, admin_user, connection, db
+):
+    from app.models.gift import Gift
+
+    gift_list = _admin_list_shared_with_member(db, admin_user, member_user)
+    gift = Gift(list_id=gift_list.id, name="Book", price=30)
+    db.add(gift)
+    db.flush()
+    collection_id = _create_smart(client, member_headers, {"unclaimed_under": "50"})
+
+    detail = client.get(f"/collections/{collection_id}", headers=member_headers).json()
+    assert [entry["id"] for entry in detail["lists"]] == [gift_list.id]
+    assert detail["gift_count"] == 1
+
+    client.post(
+        f"/lists/{gift_list.id}/gifts/{gift.id}/claim", headers=member_headers
+    )
+    detail = client.get(f"/collections/{collection_id}", headers=member_headers).json()
+    assert detail["lists"] == []
+    listed = client.get("/collections", headers=member_headers).json()
+    assert listed[0]["gift_count"] == 0
+
+
+def test_smart_collection_membership_is_cached(
+    client, member_user, member_headers, admin_user, connection, db, count_queries
+):
+    _admin_list_shared_with_member(db, admin_user, member_user)
+    from app.services.smart_collections import smart_membership
+
+    collection_id = _create_smart(client, member_headers, {"shared_by": admin_user.id})
+    smart_membership.clear()
+
+    with count_queries() as first:
+        client.get(f"/collections/{collection_id}", headers=member_headers)
+    with count_queries() as second:
+        client.get(f"/collections/{collection_id}", headers=member_headers)
+    assert len(second) == len(first) - 1
+
+
+def test_smart_collection_membership_waits_for_settled_feed(
+    client, member_user, member_headers, admin_user, connection, db, monkeypatch
+):
+    from app.config import settings
+    from app.services.smart_collections import smart_membership
+
+    _admin_list_shared_with_member(db, admin_user, member_user)
+    collection_id = _create_smart(client, member_headers, {"shared_by": admin_user.id})
+    smart_membership.clear()
+    monkeypatch.setattr(settings, "change_settle_seconds", 60)
+
+    client.get(f"/collections/{collection_id}", headers=member_headers)
+    client.get(f"/collections/{collection_id}", headers=member_headers)
+    assert (smart_membership.hits, smart_membership.misses) == (0, 2)
+
+
+def test_smart_collection_rejects_items(client, member_headers, admin_user, sample_list):
+    collection_id = _create_smart(client, member_headers, {"shared_by": admin_user.id})
+    response = client.post(
+        f"/collections/{collection_id}/items",
+        json={"list_id": sample_list.id},
+        headers=member_headers,
+    )
+    assert response.status_code == 409
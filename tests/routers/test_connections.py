@@ -1,4 +1,8 @@
+from sqlalchemy import select
+
 from app.models.connection import Connection
+from app.models.user import User
+from app.services.jobs import drain_jobs
 
 
 def test_send_request_by_user_id(client, member_user, member_headers, admin_user):
@@ -264,6 +268,7 @@ def test_disconnect_unclaims_gifts(
         headers=member_headers,
     )
     assert response.status_code == 204
+    drain_jobs(db)
 
     db.refresh(gift)
     assert gift.claimed_by_id is None
@@ -303,6 +308,7 @@ def test_disconnect_removes_collection_items(
         headers=member_headers,
     )
     assert response.status_code == 204
+    drain_jobs(db)
 
     from sqlalchemy import select
 
@@ -313,3 +319,224 @@ def test_disconnect_removes_collection_items(
         )
     ).scalar_one_or_none()
     assert remaining is None
+
+
+def test_accept_updates_cached_connections(
+    client, member_user, member_headers, admin_user, db
+):
+    pending = Connection(requester_id=admin_user.id, addressee_id=member_user.id)
+    db.add(pending)
+    db.flush()
+    assert client.get("/connections", headers=member_headers).json() == []
+
+    client.post(f"/connections/{pending.id}/accept", headers=member_headers)
+    response = client.get("/connections", headers=member_headers)
+    assert [c["id"] for c in response.json()] == [pending.id]
+
+
+def test_disconnect_updates_cached_connections(
+    client, member_headers, admin_user, sample_list, connection
+):
+    assert len(client.get("/connections", headers=member_headers).json()) == 1
+
+    client.delete(f"/connections/{connection.id}", headers=member_headers)
+    assert client.get("/connections", headers=member_headers).json() == []
+    response = client.post(
+        f"/lists/{sample_list.id}/shares",
+        json={"user_id": admin_user.id},
+        headers=member_headers,
+    )
+    assert response.status_code == 403
+
+
+def _add_connections(db, user, count, status, prefix="friend"):
+    for i in range(count):
+        other = User(
+            email=f"{prefix}{i}@test.com", name=f"Friend {i}", password_hash="x"
+        )
+        db.add(other)
+        db.flush()
+        db.add(Connection(requester_id=other.id, addressee_id=user.id, status=status))
+    db.flush()
+
+
+def test_list_connections_query_count(
+    client, member_user, member_headers, connection, db, count_queries
+):
+    from app.services.connection_graph import connection_index
+
+    with count_queries() as few:
+        response = client.get("/connections", headers=member_headers)
+    assert len(response.json()) == 1
+
+    _add_connections(db, member_user, 5, "accepted")
+    connection_index.clear()
+    with count_queries() as many:
+        response = client.get("/connections", headers=member_headers)
+    assert len(response.json()) == 6
+    assert len(many) == len(few)
+
+
+def test_list_requests_query_count(
+    client, member_user, member_headers, db, count_queries
+):
+    _add_connections(db, member_user, 1, "pending")
+    with count_queries() as few:
+        client.get("/connections/requests", headers=member_headers)
+
+    _add_connections(db, member_user, 4, "pending", prefix="other")
+    with count_queries() as many:
+        response = client.get("/connections/requests", headers=member_headers)
+    assert len(response.json()) == 5
+    assert len(many) == len(few)
+
+
+def test_disconnect_query_count(
+    client, member_user, member_headers, admin_user, db, count_queries
+):
+    from app.models.gift_list import GiftList
+    from app.models.list_share import ListShare
+
+    def connect_with_shares(count):
+        conn = Connection(
+            requester_id=admin_user.id,
+            addressee_id=member_user.id,
+            status="accepted",
+        )
+        db.add(conn)
+        for i in range(count):
+            gift_list = GiftList(name=f"List {i}", owner_id=member_user.id)
+            db.add(gift_list)
+            db.flush()
+            db.add(ListShare(list_id=gift_list.id, user_id=admin_user.id))
+        db.flush()
+        return conn
+
+    conn = connect_with_shares(1)
+    with count_queries() as few:
+        client.delete(f"/connections/{conn.id}", headers=member_headers)
+
+    conn = connect_with_shares(5)
+    with count_queries() as many:
+        client.delete(f"/connections/{conn.id}", headers=member_headers)
+    assert len(many) == len(few)
+    remaining = db.execute(
+        select(ListShare).where(ListShare.user_id == admin_user.id)
+    ).scalars().all()
+    assert remaining == []
+
+
+def _accept_via_api(client, db, requester, addressee):
+    from app.dependencies import create_access_token
+
+    pending = Connection(requester_id=requester.id, addressee_id=addressee.id)
+    db.add(pending)
+    db.flush()
+    headers = {"Authorization": f"Bearer {create_access_token(addressee)}"}
+    client.post(f"/connections/{pending.id}/accept", headers=headers)
+    return pending, headers
+
+
+def test_suggestions_and_mutual(client, member_headers, admin_user, connection, db):
+    carol = User(email="carol@test.com", name="Carol", password_hash="x")
+    db.add(carol)
+    db.flush()
+    _accept_via_api(client, db, carol, admin_user)
+
+    response = client.get("/connections/suggestions", headers=member_headers)
+    assert response.status_code == 200
+    assert response.json() == [{"id": carol.id, "name": "Carol", "mutual_count": 1}]
+
+    response = client.get(f"/connections/{carol.id}/mutual", headers=member_headers)
+    assert response.status_code == 200
+    assert [u["id"] for u in response.json()] == [admin_user.id]
+
+
+def test_suggestions_exclude_pending_requests(
+    client, member_user, member_headers, admin_user, connection, db
+):
+    carol = User(email="carol@test.com", name="Carol", password_hash="x")
+    db.add(carol)
+    db.flush()
+    _accept_via_api(client, db, carol, admin_user)
+    db.add(Connection(requester_id=member_user.id, addressee_id=carol.id))
+    db.flush()
+
+    response = client.get("/connections/suggestions", headers=member_headers)
+    assert response.json() == []
+
+
+def test_disconnect_removes_suggestions(
+    client, member_headers, admin_user, connection, db
+):
+    carol = User(email="carol@test.com", name="Carol", password_hash="x")
+    db.add(carol)
+    db.flush()
+    pending, admin_headers = _accept_via_api(client, db, carol, admin_user)
+
+    client.delete(f"/connections/{pending.id}", headers=admin_headers)
+    response = client.get("/connections/suggestions", headers=member_headers)
+    assert response.json() == []
+
+
+def test_mutual_unknown_user(client, member_headers):
+    response = client.get("/connections/99999/mutual", headers=member_headers)
+    assert response.status_code == 404
+
+
+def test_lookup_by_email_and_hash(
+    client, member_user, member_headers, admin_user, connection, db
+):
+    from app.models.user import hash_email
+
+    carol = User(email="carol@test.com", name="Carol", password_hash="x")
+    db.add(carol)
+    db.flush()
+    db.add(Connection(requester_id=member_user.id, addressee_id=carol.id))
+    db.flush()
+
+    response = client.post(
+        "/connections/lookup",
+        json={
+            "emails": ["Admin@Test.com", "member@test.com", "nobody@test.com"],
+            "hashes": [hash_email("carol@test.com")],
+        },
+        headers=member_headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"key": "Admin@Test.com", "user_id": admin_user.id, "name": "Admin", "status": "connected"},
+        {"key": hash_email("carol@test.com"), "user_id": carol.id, "name": "Carol", "status": "pending_sent"},
+    ]
+
+
+def test_lookup_skips_collation_only_matches(client, member_headers, db):
+    dana = User(email="dana@test.com", name="Dana", password_hash="x")
+    jose = User(email="jos\u00e9@test.com", name="Jose", password_hash="x")
+    db.add_all([dana, jose])
+    db.flush()
+
+    # MySQL's accent-insensitive collation matches jose@ to josé@, which
+    # isn't what was submitted
+    response = client.post(
+        "/connections/lookup",
+        json={"emails": ["DANA@Test.com", "jose@test.com"]},
+        headers=member_headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"key": "DANA@Test.com", "user_id": dana.id, "name": "Dana", "status": "none"},
+    ]
+
+
+def test_lookup_in_chunks(client, member_headers, admin_user, db, monkeypatch):
+    from app.config import settings
+
+    _add_connections(db, admin_user, 3, "pending")
+    monkeypatch.setattr(settings, "contact_lookup_chunk_size", 2)
+    response = client.post(
+        "/connections/lookup",
+        json={"emails": [f"friend{i}@test.com" for i in range(3)]},
+        headers=member_headers,
+    )
+    assert [m["status"] for m in response.json()] == ["none"] * 3
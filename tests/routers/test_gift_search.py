@@ -0,0 +1,120 @@
+from app.models.gift import Gift
+from app.models.gift_list import GiftList
+
+
+def test_search_own_list(client, member_headers, sample_list, db):
+    db.add_all([
+        Gift(list_id=sample_list.id, name="Blue Scarf"),
+        Gift(list_id=sample_list.id, name="Board Game"),
+    ])
+    db.flush()
+
+    response = client.get("/gifts/search?q=scarf", headers=member_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [g["name"] for g in data["items"]] == ["Blue Scarf"]
+    assert data["items"][0]["list_name"] == "Member's Wishlist"
+    assert data["next_cursor"] is None
+
+
+def test_search_shared_list(client, admin_headers, shared_list, db):
+    db.add(Gift(list_id=shared_list.id, name="Headphones"))
+    db.flush()
+
+    response = client.get("/gifts/search?q=headphones", headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 1
+
+
+def test_search_excludes_unshared(client, admin_headers, sample_list, db):
+    db.add(Gift(list_id=sample_list.id, name="Headphones"))
+    db.flush()
+
+    response = client.get("/gifts/search?q=headphones", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+
+
+def test_search_hides_claims_from_owner(
+    client, member_headers, admin_user, shared_list, db
+):
+    gift = Gift(list_id=shared_list.id, name="Camera")
+    gift.claimed_by_id = admin_user.id
+    db.add(gift)
+    db.flush()
+
+    response = client.get("/gifts/search?q=camera", headers=member_headers)
+    assert response.status_code == 200
+    assert response.json()["items"][0]["claimed_by_id"] is None
+
+
+def test_search_shows_claims_to_viewer(
+    client, admin_headers, admin_user, shared_list, db
+):
+    gift = Gift(list_id=shared_list.id, name="Camera")
+    gift.claimed_by_id = admin_user.id
+    db.add(gift)
+    db.flush()
+
+    response = client.get("/gifts/search?q=camera", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["items"][0]["claimed_by_id"] == admin_user.id
+
+
+def test_search_ranks_name_above_description(
+    client, member_headers, sample_list, db
+):
+    by_description = Gift(
+        list_id=sample_list.id, name="Mug", description="Coffee lover"
+    )
+    by_name = Gift(list_id=sample_list.id, name="Coffee Grinder")
+    db.add_all([by_name, by_description])
+    db.flush()
+
+    response = client.get("/gifts/search?q=coffee", headers=member_headers)
+    assert response.status_code == 200
+    names = [g["name"] for g in response.json()["items"]]
+    assert names == ["Coffee Grinder", "Mug"]
+
+
+def test_search_pagination(client, member_headers, member_user, db):
+    gift_list = GiftList(name="Many", owner_id=member_user.id)
+    db.add(gift_list)
+    db.flush()
+    db.add_all([
+        Gift(list_id=gift_list.id, name=f"Sock {i}") for i in range(5)
+    ])
+    db.flush()
+
+    seen: list[str] = []
+    cursor = None
+    for _ in range(3):
+        url = "/gifts/search?q=sock&limit=2"
+        if cursor is not None:
+            url += f"&cursor={cursor}"
+        data = client.get(url, headers=member_headers).json()
+        seen.extend(g["name"] for g in data["items"])
+        cursor = data["next_cursor"]
+    assert cursor is None
+    assert sorted(seen) == [f"Sock {i}" for i in range(5)]
+
+
+def test_search_escapes_wildcards(client, member_headers, sample_list, db):
+    db.add(Gift(list_id=sample_list.id, name="Puzzle"))
+    db.flush()
+
+    response = client.get("/gifts/search?q=%25", headers=member_headers)
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+
+
+def test_search_invalid_cursor(client, member_headers):
+    response = client.get(
+        "/gifts/search?q=sock&cursor=not-a-cursor", headers=member_headers
+    )
+    assert response.status_code == 400
+
+
+def test_search_requires_query(client, member_headers):
+    response = client.get("/gifts/search", headers=member_headers)
+    assert response.status_code == 422
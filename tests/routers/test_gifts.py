@@ -1,4 +1,11 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
 from app.models.gift import Gift
+from app.models.gift_list import GiftList
 
 
 def test_create_gift(client, member_headers, sample_list):
@@ -213,3 +220,331 @@ def test_get_list_shows_claims_to_shared_user(
     assert response.status_code == 200
     gift_data = response.json()["gifts"][0]
     assert gift_data["claimed_by_id"] == admin_user.id
+
+
+def _add_priced_gifts(db, list_id):
+    gifts = [
+        Gift(list_id=list_id, name="Candle", price=Decimal("12.00")),
+        Gift(list_id=list_id, name="Blender", price=Decimal("80.00")),
+        Gift(list_id=list_id, name="Apron", price=None),
+        Gift(list_id=list_id, name="Bookmark", price=Decimal("5.00")),
+    ]
+    for day, gift in enumerate(gifts, start=1):
+        gift.created_at = datetime(2026, 12, day)
+    db.add_all(gifts)
+    db.flush()
+    return gifts
+
+
+def test_list_gifts_as_owner(client, member_headers, sample_list, db):
+    _add_priced_gifts(db, sample_list.id)
+
+    response = client.get(
+        f"/lists/{sample_list.id}/gifts", headers=member_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["items"]) == 4
+    assert "claimed_by_id" not in data["items"][0]
+    assert data["next_cursor"] is None
+
+
+def test_list_gifts_sort_by_price(client, member_headers, sample_list, db):
+    _add_priced_gifts(db, sample_list.id)
+
+    response = client.get(
+        f"/lists/{sample_list.id}/gifts?sort=price", headers=member_headers
+    )
+    names = [g["name"] for g in response.json()["items"]]
+    assert names == ["Apron", "Bookmark", "Candle", "Blender"]
+
+    response = client.get(
+        f"/lists/{sample_list.id}/gifts?sort=price&order=desc",
+        headers=member_headers,
+    )
+    names = [g["name"] for g in response.json()["items"]]
+    assert names == ["Blender", "Candle", "Bookmark", "Apron"]
+
+
+def test_list_gifts_filters(client, member_headers, sample_list, db):
+    _add_priced_gifts(db, sample_list.id)
+
+    response = client.get(
+        f"/lists/{sample_list.id}/gifts?min_price=5&max_price=20&sort=name",
+        headers=member_headers,
+    )
+    names = [g["name"] for g in response.json()["items"]]
+    assert names == ["Bookmark", "Candle"]
+
+    response = client.get(
+        f"/lists/{sample_list.id}/gifts?name_prefix=B&sort=name",
+        headers=member_headers,
+    )
+    names = [g["name"] for g in response.json()["items"]]
+    assert names == ["Blender", "Bookmark"]
+
+
+def test_list_gifts_claimed_filter(
+    client, admin_user, admin_headers, shared_list, db
+):
+    gifts = _add_priced_gifts(db, shared_list.id)
+    gifts[0].claimed_by_id = admin_user.id
+    db.flush()
+
+    response = client.get(
+        f"/lists/{shared_list.id}/gifts?claimed=true", headers=admin_headers
+    )
+    assert [g["name"] for g in response.json()["items"]] == ["Candle"]
+
+    response = client.get(
+        f"/lists/{shared_list.id}/gifts?claimed=false", headers=admin_headers
+    )
+    assert len(response.json()["items"]) == 3
+
+
+def test_list_gifts_claimed_filter_as_owner(client, member_headers, sample_list):
+    response = client.get(
+        f"/lists/{sample_list.id}/gifts?claimed=true", headers=member_headers
+    )
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize("sort", ["price", "name", "created_at"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_list_gifts_pagination(client, member_headers, sample_list, db, sort, order):
+    _add_priced_gifts(db, sample_list.id)
+    db.add(
+        Gift(
+            list_id=sample_list.id,
+            name="Apron",
+            price=None,
+            created_at=datetime(2026, 12, 3),
+        )
+    )
+    db.flush()
+
+    full = client.get(
+        f"/lists/{sample_list.id}/gifts?sort={sort}&order={order}",
+        headers=member_headers,
+    ).json()["items"]
+
+    paged: list[int] = []
+    url = f"/lists/{sample_list.id}/gifts?sort={sort}&order={order}&limit=2"
+    cursor = None
+    for _ in range(5):
+        data = client.get(
+            url + (f"&cursor={cursor}" if cursor else ""),
+            headers=member_headers,
+        ).json()
+        paged.extend(g["id"] for g in data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert cursor is None
+    assert paged == [g["id"] for g in full]
+    assert len(paged) == 5
+
+
+def test_list_gifts_cursor_sort_mismatch(client, member_headers, sample_list, db):
+    _add_priced_gifts(db, sample_list.id)
+
+    cursor = client.get(
+        f"/lists/{sample_list.id}/gifts?sort=name&limit=1",
+        headers=member_headers,
+    ).json()["next_cursor"]
+    response = client.get(
+        f"/lists/{sample_list.id}/gifts?sort=price&cursor={cursor}",
+        headers=member_headers,
+    )
+    assert response.status_code == 400
+
+
+def test_list_gifts_not_shared(client, admin_headers, sample_list):
+    response = client.get(
+        f"/lists/{sample_list.id}/gifts", headers=admin_headers
+    )
+    assert response.status_code == 403
+
+
+def test_gift_changes_publish_events(client, member_headers, sample_list, monkeypatch):
+    from app.services import events
+
+    published = []
+    monkeypatch.setattr(
+        events,
+        "publish_list_event",
+        lambda list_id, event_type, **data: published.append((list_id, event_type)),
+    )
+
+    response = client.post(
+        f"/lists/{sample_list.id}/gifts",
+        headers=member_headers,
+        json={"name": "Kite"},
+    )
+    gift_id = response.json()["id"]
+    client.put(
+        f"/lists/{sample_list.id}/gifts/{gift_id}",
+        headers=member_headers,
+        json={"name": "Red Kite"},
+    )
+    client.delete(
+        f"/lists/{sample_list.id}/gifts/{gift_id}", headers=member_headers
+    )
+    assert published == [
+        (sample_list.id, "gift.created"),
+        (sample_list.id, "gift.updated"),
+        (sample_list.id, "gift.deleted"),
+    ]
+
+
+def test_bulk_update_gifts(client, member_headers, sample_list, db):
+    gifts = _add_priced_gifts(db, sample_list.id)
+    ids = [gifts[0].id, gifts[1].id]
+
+    response = client.patch(
+        f"/lists/{sample_list.id}/gifts",
+        headers=member_headers,
+        json={
+            "updates": [
+                {"id": ids[0], "price": "9.99"},
+                {"id": ids[1], "price": "19.99", "name": "Big Candle"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [g["id"] for g in data] == sorted(ids)
+    assert [g["price"] for g in data] == ["9.99", "19.99"]
+    assert data[1]["name"] == "Big Candle"
+    assert gifts[3].price == Decimal("5.00")
+
+
+def test_bulk_update_gifts_rejects_null_name(client, member_headers, sample_list, db):
+    gifts = _add_priced_gifts(db, sample_list.id)
+
+    response = client.patch(
+        f"/lists/{sample_list.id}/gifts",
+        headers=member_headers,
+        json={"updates": [{"id": gifts[0].id, "name": None}]},
+    )
+    assert response.status_code == 422
+
+
+def test_bulk_update_gifts_rejects_repeated_ids(client, member_headers, sample_list, db):
+    gifts = _add_priced_gifts(db, sample_list.id)
+
+    response = client.patch(
+        f"/lists/{sample_list.id}/gifts",
+        headers=member_headers,
+        json={"updates": [{"id": gifts[0].id}, {"id": gifts[0].id, "price": "1"}]},
+    )
+    assert response.status_code == 422
+
+
+def test_bulk_update_gifts_other_list(client, member_headers, member_user, sample_list, db):
+    other_list = GiftList(name="Other", owner_id=member_user.id)
+    db.add(other_list)
+    db.flush()
+    mine = _add_priced_gifts(db, sample_list.id)
+    theirs = _add_priced_gifts(db, other_list.id)
+
+    response = client.patch(
+        f"/lists/{sample_list.id}/gifts",
+        headers=member_headers,
+        json={"updates": [{"id": mine[0].id, "name": "X"}, {"id": theirs[0].id}]},
+    )
+    assert response.status_code == 404
+    db.refresh(mine[0])
+    assert mine[0].name == "Candle"
+
+
+def test_bulk_update_gifts_not_owner(client, admin_headers, shared_list, db):
+    gifts = _add_priced_gifts(db, shared_list.id)
+
+    response = client.patch(
+        f"/lists/{shared_list.id}/gifts",
+        headers=admin_headers,
+        json={"updates": [{"id": gifts[0].id, "name": "Hacked"}]},
+    )
+    assert response.status_code == 403
+
+
+def test_bulk_delete_gifts(client, member_headers, sample_list, db):
+    gifts = _add_priced_gifts(db, sample_list.id)
+    ids = [gifts[0].id, gifts[1].id]
+
+    response = client.delete(
+        f"/lists/{sample_list.id}/gifts?ids={ids[0]}&ids={ids[1]}",
+        headers=member_headers,
+    )
+    assert response.status_code == 204
+    remaining = db.execute(
+        select(Gift.id).where(Gift.list_id == sample_list.id)
+    ).scalars().all()
+    assert sorted(remaining) == sorted([gifts[2].id, gifts[3].id])
+
+
+def test_bulk_delete_gifts_claimed(client, member_headers, admin_user, shared_list, db):
+    gifts = _add_priced_gifts(db, shared_list.id)
+    gifts[1].claimed_by_id = admin_user.id
+    db.flush()
+
+    response = client.delete(
+        f"/lists/{shared_list.id}/gifts?ids={gifts[0].id}&ids={gifts[1].id}",
+        headers=member_headers,
+    )
+    assert response.status_code == 409
+    remaining = db.execute(
+        select(func.count()).where(Gift.list_id == shared_list.id)
+    ).scalar_one()
+    assert remaining == 4
+
+
+def test_bulk_delete_gifts_not_found(client, member_headers, sample_list, db):
+    gifts = _add_priced_gifts(db, sample_list.id)
+
+    response = client.delete(
+        f"/lists/{sample_list.id}/gifts?ids={gifts[0].id}&ids=99999",
+        headers=member_headers,
+    )
+    assert response.status_code == 404
+
+
+def test_bulk_delete_gifts_requires_ids(client, member_headers, sample_list):
+    response = client.delete(
+        f"/lists/{sample_list.id}/gifts", headers=member_headers
+    )
+    assert response.status_code == 422
+
+
+def test_gift_url_changes_queue_enrichment(client, member_headers, sample_list, db, monkeypatch):
+    from app.services.link_metadata import enricher
+
+    queued = []
+    monkeypatch.setattr(enricher, "enqueue", lambda gift_id, url: queued.append(url))
+
+    response = client.post(
+        f"/lists/{sample_list.id}/gifts",
+        headers=member_headers,
+        json={"name": "Skillet", "url": "https://shop.example.com/skillet"},
+    )
+    gift_id = response.json()["id"]
+    gift = db.get(Gift, gift_id)
+    gift.link_title = "Old Title"
+    db.flush()
+
+    client.put(
+        f"/lists/{sample_list.id}/gifts/{gift_id}",
+        headers=member_headers,
+        json={"name": "Big Skillet"},
+    )
+    response = client.put(
+        f"/lists/{sample_list.id}/gifts/{gift_id}",
+        headers=member_headers,
+        json={"url": "https://shop.example.com/big-skillet"},
+    )
+    assert response.json()["link_title"] is None
+    assert queued == [
+        "https://shop.example.com/skillet",
+        "https://shop.example.com/big-skillet",
+    ]
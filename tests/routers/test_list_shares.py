@@ -1,3 +1,6 @@
+from app.services.jobs import drain_jobs
+
+
 def test_share_list(client, member_user, member_headers, sample_list, admin_user, connection):
     response = client.post(
         f"/lists/{sample_list.id}/shares",
@@ -135,6 +138,7 @@ def test_unshare_removes_collection_items(
         headers=member_headers,
     )
     assert response.status_code == 204
+    drain_jobs(db)
 
     from sqlalchemy import select
 
@@ -145,3 +149,32 @@ def test_unshare_removes_collection_items(
         )
     ).scalar_one_or_none()
     assert remaining is None
+
+
+def test_unshare_revokes_cached_access(
+    client, member_headers, admin_headers, shared_list, admin_user
+):
+    response = client.get(f"/lists/{shared_list.id}", headers=admin_headers)
+    assert response.status_code == 200
+
+    client.delete(
+        f"/lists/{shared_list.id}/shares/{admin_user.id}",
+        headers=member_headers,
+    )
+    response = client.get(f"/lists/{shared_list.id}", headers=admin_headers)
+    assert response.status_code == 403
+
+
+def test_share_grants_cached_access(
+    client, member_headers, admin_headers, sample_list, admin_user, connection
+):
+    response = client.get(f"/lists/{sample_list.id}", headers=admin_headers)
+    assert response.status_code == 403
+
+    client.post(
+        f"/lists/{sample_list.id}/shares",
+        json={"user_id": admin_user.id},
+        headers=member_headers,
+    )
+    response = client.get(f"/lists/{sample_list.id}", headers=admin_headers)
+    assert response.status_code == 200
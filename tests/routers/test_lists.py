@@ -1,3 +1,6 @@
+from sqlalchemy import func, select
+
+
 def test_create_list(client, member_user, member_headers):
     response = client.post(
         "/lists",
@@ -123,3 +126,178 @@ def test_delete_list_as_owner(client, member_headers, sample_list):
 def test_delete_list_as_shared_user(client, admin_headers, shared_list):
     response = client.delete(f"/lists/{shared_list.id}", headers=admin_headers)
     assert response.status_code == 403
+
+
+def test_list_events_not_shared(client, admin_headers, sample_list):
+    response = client.get(f"/lists/{sample_list.id}/events", headers=admin_headers)
+    assert response.status_code == 403
+
+
+def test_list_events_not_found(client, member_headers):
+    response = client.get("/lists/99999/events", headers=member_headers)
+    assert response.status_code == 404
+
+
+def test_import_csv(client, member_headers, sample_list, db):
+    from app.models.gift import Gift
+
+    body = (
+        "name,description,url,price\n"
+        "Book,A novel,https://example.com/book,19.99\n"
+        ",Missing name,,\n"
+        "Kite,,,not-a-price\n"
+        '"Mug, large","Says ""hi""",,8\n'
+    )
+    response = client.post(
+        f"/lists/{sample_list.id}/import",
+        headers={**member_headers, "Content-Type": "text/csv"},
+        content=body,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] == 2
+    assert data["failed"] == 2
+    assert [e["line"] for e in data["errors"]] == [3, 4]
+    names = db.execute(
+        select(Gift.name).where(Gift.list_id == sample_list.id).order_by(Gift.id)
+    ).scalars().all()
+    assert names == ["Book", "Mug, large"]
+
+
+def test_import_ndjson(client, member_headers, sample_list):
+    body = (
+        '{"name": "Book", "price": "5.00"}\n'
+        "\n"
+        "not json\n"
+        '["a list"]\n'
+        '{"name": "Kite", "extra": true}\n'
+    )
+    response = client.post(
+        f"/lists/{sample_list.id}/import",
+        headers={**member_headers, "Content-Type": "application/x-ndjson"},
+        content=body,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] == 2
+    assert [e["line"] for e in data["errors"]] == [3, 4]
+
+
+def test_import_in_batches(client, member_headers, sample_list, db, monkeypatch):
+    from app.config import settings
+    from app.models.gift import Gift
+
+    monkeypatch.setattr(settings, "import_batch_size", 2)
+    body = "name\n" + "".join(f"Gift {i}\n" for i in range(5))
+    response = client.post(
+        f"/lists/{sample_list.id}/import",
+        headers={**member_headers, "Content-Type": "text/csv"},
+        content=body,
+    )
+    assert response.json()["imported"] == 5
+    count = db.execute(
+        select(func.count()).where(Gift.list_id == sample_list.id)
+    ).scalar_one()
+    assert count == 5
+
+
+def test_import_csv_without_name_column(client, member_headers, sample_list):
+    response = client.post(
+        f"/lists/{sample_list.id}/import",
+        headers={**member_headers, "Content-Type": "text/csv"},
+        content="title\nBook\n",
+    )
+    assert response.status_code == 400
+
+
+def test_import_unsupported_type(client, member_headers, sample_list):
+    response = client.post(
+        f"/lists/{sample_list.id}/import",
+        headers={**member_headers, "Content-Type": "application/pdf"},
+        content="%PDF",
+    )
+    assert response.status_code == 415
+
+
+def test_import_too_large(client, member_headers, sample_list, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "import_max_bytes", 10)
+    response = client.post(
+        f"/lists/{sample_list.id}/import",
+        headers={**member_headers, "Content-Type": "text/csv"},
+        content="name\nA very long gift name\n",
+    )
+    assert response.status_code == 413
+
+
+def test_import_not_owner(client, admin_headers, shared_list):
+    response = client.post(
+        f"/lists/{shared_list.id}/import",
+        headers={**admin_headers, "Content-Type": "text/csv"},
+        content="name\nBook\n",
+    )
+    assert response.status_code == 403
+
+
+def test_export_csv(client, member_headers, sample_list, db):
+    from decimal import Decimal
+
+    from app.models.gift import Gift
+
+    db.add_all([
+        Gift(list_id=sample_list.id, name="Book", price=Decimal("19.99")),
+        Gift(list_id=sample_list.id, name="Mug, large"),
+    ])
+    db.flush()
+
+    response = client.get(
+        f"/lists/{sample_list.id}/export", headers=member_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines() == [
+        "name,description,url,price",
+        "Book,,,19.99",
+        '"Mug, large",,,',
+    ]
+
+
+def test_export_ndjson_round_trip(client, member_headers, member_user, sample_list, db):
+    from app.models.gift import Gift
+    from app.models.gift_list import GiftList
+
+    db.add(Gift(list_id=sample_list.id, name="Book", description="Novel"))
+    db.flush()
+    exported = client.get(
+        f"/lists/{sample_list.id}/export?format=ndjson", headers=member_headers
+    ).text
+
+    copy = GiftList(name="Copy", owner_id=member_user.id)
+    db.add(copy)
+    db.flush()
+    response = client.post(
+        f"/lists/{copy.id}/import",
+        headers={**member_headers, "Content-Type": "application/x-ndjson"},
+        content=exported,
+    )
+    assert response.json()["imported"] == 1
+
+
+def test_export_not_owner(client, admin_headers, shared_list):
+    response = client.get(f"/lists/{shared_list.id}/export", headers=admin_headers)
+    assert response.status_code == 403
+
+
+def test_delete_shared_list(client, member_headers, shared_list, collection_item, db):
+    from app.models.gift import Gift
+    from app.models.gift_list import GiftList
+
+    db.add(Gift(list_id=shared_list.id, name="Socks"))
+    db.flush()
+    list_id = shared_list.id
+
+    response = client.delete(f"/lists/{list_id}", headers=member_headers)
+    assert response.status_code == 204
+    db.expunge_all()
+    assert db.get(GiftList, list_id) is None
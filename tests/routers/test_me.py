@@ -0,0 +1,105 @@
+from decimal import Decimal
+
+from app.models.gift import Gift
+from app.models.gift_list import GiftList
+
+
+def test_list_claims(client, admin_user, admin_headers, member_user, shared_list, db):
+    second_list = GiftList(name="Birthday", owner_id=member_user.id)
+    db.add(second_list)
+    db.flush()
+    db.add_all([
+        Gift(
+            list_id=shared_list.id,
+            name="Book",
+            price=Decimal("20.00"),
+            claimed_by_id=admin_user.id,
+        ),
+        Gift(
+            list_id=second_list.id,
+            name="Kite",
+            price=Decimal("15.50"),
+            claimed_by_id=admin_user.id,
+        ),
+        Gift(list_id=second_list.id, name="Surprise", claimed_by_id=admin_user.id),
+        Gift(list_id=shared_list.id, name="Unclaimed", price=Decimal("99.00")),
+    ])
+    db.flush()
+
+    response = client.get("/me/claims", headers=admin_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    group = data[0]
+    assert group["owner_id"] == member_user.id
+    assert group["owner_name"] == "Member"
+    assert group["gift_count"] == 3
+    assert Decimal(group["total_price"]) == Decimal("35.50")
+    assert [g["name"] for g in group["gifts"]] == ["Book", "Kite", "Surprise"]
+    assert group["gifts"][1]["list_name"] == "Birthday"
+
+
+def test_list_claims_grouped_by_owner(client, admin_user, admin_headers, shared_list, db):
+    from app.models.user import User
+
+    other = User(email="other@test.com", name="Other", password_hash="h")
+    db.add(other)
+    db.flush()
+    other_list = GiftList(name="Other's List", owner_id=other.id)
+    db.add(other_list)
+    db.flush()
+    db.add_all([
+        Gift(list_id=shared_list.id, name="Book", claimed_by_id=admin_user.id),
+        Gift(list_id=other_list.id, name="Hat", claimed_by_id=admin_user.id),
+    ])
+    db.flush()
+
+    response = client.get("/me/claims", headers=admin_headers)
+    assert response.status_code == 200
+    owners = [g["owner_name"] for g in response.json()]
+    assert owners == ["Member", "Other"]
+
+
+def test_list_claims_empty(client, member_headers):
+    response = client.get("/me/claims", headers=member_headers)
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_list_claims_unauthenticated(client):
+    response = client.get("/me/claims")
+    assert response.status_code == 401
+
+
+def test_counters(client, admin_user, admin_headers, member_user, shared_list, db):
+    from app.models.connection import Connection
+    from app.models.user import User
+
+    requester = User(email="requester@test.com", name="Requester", password_hash="x")
+    db.add(requester)
+    db.flush()
+    db.add(Connection(requester_id=requester.id, addressee_id=admin_user.id))
+    db.add_all([
+        Gift(list_id=shared_list.id, name="Book"),
+        Gift(list_id=shared_list.id, name="Mug", claimed_by_id=admin_user.id),
+    ])
+    db.flush()
+
+    response = client.get("/me/counters", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json() == {
+        "pending_requests": 1,
+        "shared_lists": 1,
+        "unclaimed_gifts": 1,
+    }
+
+
+def test_counters_query_count(client, member_headers, count_queries):
+    with count_queries() as statements:
+        response = client.get("/me/counters", headers=member_headers)
+    assert response.json() == {
+        "pending_requests": 0,
+        "shared_lists": 0,
+        "unclaimed_gifts": 0,
+    }
+    assert sum("count(" in s.lower() for s in statements) == 1
@@ -0,0 +1,121 @@
+from sqlalchemy import select
+
+from app.models.change import Change
+from app.models.gift import Gift
+from app.models.gift_list import GiftList
+from app.models.list_share import ListShare
+
+
+def test_batch_share(client, member_headers, sample_list, admin_user, connection, db):
+    other_list = GiftList(name="Birthday", owner_id=sample_list.owner_id)
+    db.add(other_list)
+    db.flush()
+
+    response = client.post(
+        "/shares/batch",
+        headers=member_headers,
+        json={"list_ids": [sample_list.id, other_list.id], "user_ids": [admin_user.id]},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == [
+        {"list_id": sample_list.id, "user_id": admin_user.id},
+        {"list_id": other_list.id, "user_id": admin_user.id},
+    ]
+    assert data["skipped"] == []
+    assert data["forbidden"] == []
+    shares = db.execute(
+        select(ListShare).where(ListShare.user_id == admin_user.id)
+    ).scalars().all()
+    assert len(shares) == 2
+
+
+def test_batch_share_skips_existing(client, member_headers, shared_list, admin_user):
+    response = client.post(
+        "/shares/batch",
+        headers=member_headers,
+        json={"list_ids": [shared_list.id], "user_ids": [admin_user.id]},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == []
+    assert data["skipped"] == [{"list_id": shared_list.id, "user_id": admin_user.id}]
+
+
+def test_batch_share_forbidden_pairs(
+    client, member_headers, member_user, sample_list, admin_user, connection, db
+):
+    from app.models.user import User
+
+    stranger = User(email="stranger@test.com", name="Stranger", password_hash="x")
+    db.add(stranger)
+    admin_list = GiftList(name="Admin's List", owner_id=admin_user.id)
+    db.add(admin_list)
+    db.flush()
+
+    response = client.post(
+        "/shares/batch",
+        headers=member_headers,
+        json={
+            "list_ids": [sample_list.id, admin_list.id],
+            "user_ids": [admin_user.id, stranger.id, member_user.id],
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == [{"list_id": sample_list.id, "user_id": admin_user.id}]
+    assert len(data["forbidden"]) == 5
+
+
+def test_batch_share_grants_access(
+    client, member_headers, admin_headers, sample_list, admin_user, connection
+):
+    client.post(
+        "/shares/batch",
+        headers=member_headers,
+        json={"list_ids": [sample_list.id], "user_ids": [admin_user.id]},
+    )
+    response = client.get(f"/lists/{sample_list.id}", headers=admin_headers)
+    assert response.status_code == 200
+
+
+def test_batch_share_records_changes_and_events(
+    client, member_headers, member_user, sample_list, admin_user, connection, db, monkeypatch
+):
+    from app.services import events
+
+    published = []
+    monkeypatch.setattr(
+        events,
+        "publish_list_event",
+        lambda list_id, event_type, **data: published.append(
+            (list_id, event_type, data)
+        ),
+    )
+    gifts = [Gift(list_id=sample_list.id, name=name) for name in ("Kite", "Yo-yo")]
+    db.add_all(gifts)
+    db.flush()
+
+    response = client.post(
+        "/shares/batch",
+        headers=member_headers,
+        json={"list_ids": [sample_list.id], "user_ids": [admin_user.id]},
+    )
+    assert response.status_code == 200
+    share_id = db.execute(
+        select(ListShare.id).where(ListShare.list_id == sample_list.id)
+    ).scalar_one()
+    changes = db.execute(
+        select(Change.user_id, Change.entity, Change.entity_id)
+    ).tuples().all()
+    assert sorted(changes) == sorted(
+        [
+            (member_user.id, "share", share_id),
+            (admin_user.id, "share", share_id),
+            (admin_user.id, "list", sample_list.id),
+            *((admin_user.id, "gift", gift.id) for gift in gifts),
+        ]
+    )
+    assert published == [
+        (sample_list.id, "share.created", {"user_id": admin_user.id})
+    ]
@@ -0,0 +1,185 @@
+from datetime import datetime
+
+from sqlalchemy import update
+
+from app.config import settings
+from app.models.change import Change
+from app.models.gift import Gift
+
+
+def _sync(client, headers, token=None):
+    url = "/sync" if token is None else f"/sync?since={token}"
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_full_snapshot(client, member_headers, admin_user, shared_list, collection_item, db):
+    db.add(Gift(list_id=shared_list.id, name="Book"))
+    db.flush()
+
+    data = _sync(client, member_headers)
+    assert [l["id"] for l in data["lists"]] == [shared_list.id]
+    assert data["lists"][0]["owner_name"] == "Member"
+    assert [g["name"] for g in data["gifts"]] == ["Book"]
+    assert [s["user_id"] for s in data["shares"]] == [admin_user.id]
+    assert data["collections"][0]["list_ids"] == [shared_list.id]
+    assert data["connections"][0]["user"]["id"] == admin_user.id
+    assert data["deleted"] == []
+    assert data["token"]
+
+
+def test_delta_is_empty_without_changes(client, member_headers, sample_list):
+    token = _sync(client, member_headers)["token"]
+
+    data = _sync(client, member_headers, token)
+    assert data["lists"] == []
+    assert data["gifts"] == []
+    assert data["deleted"] == []
+
+
+def test_delta_returns_only_changes(client, member_headers, sample_list):
+    client.post("/lists", headers=member_headers, json={"name": "Old"})
+    token = _sync(client, member_headers)["token"]
+
+    response = client.post(
+        f"/lists/{sample_list.id}/gifts",
+        headers=member_headers,
+        json={"name": "Kite"},
+    )
+    gift_id = response.json()["id"]
+
+    data = _sync(client, member_headers, token)
+    assert data["lists"] == []
+    assert [g["id"] for g in data["gifts"]] == [gift_id]
+
+    client.delete(
+        f"/lists/{sample_list.id}/gifts/{gift_id}", headers=member_headers
+    )
+    data = _sync(client, member_headers, data["token"])
+    assert data["gifts"] == []
+    assert data["deleted"] == [{"entity": "gift", "id": gift_id}]
+
+
+def test_share_sends_list_and_gifts_to_viewer(
+    client, member_headers, admin_headers, admin_user, sample_list, connection, db
+):
+    db.add(Gift(list_id=sample_list.id, name="Book"))
+    db.flush()
+    token = _sync(client, admin_headers)["token"]
+
+    client.post(
+        f"/lists/{sample_list.id}/shares",
+        headers=member_headers,
+        json={"user_id": admin_user.id},
+    )
+
+    data = _sync(client, admin_headers, token)
+    assert [l["id"] for l in data["lists"]] == [sample_list.id]
+    assert [g["name"] for g in data["gifts"]] == ["Book"]
+    assert len(data["shares"]) == 1
+
+
+def test_unshare_sends_tombstones(
+    client, member_headers, admin_headers, admin_user, shared_list
+):
+    token = _sync(client, admin_headers)["token"]
+
+    client.delete(
+        f"/lists/{shared_list.id}/shares/{admin_user.id}", headers=member_headers
+    )
+
+    data = _sync(client, admin_headers, token)
+    assert {"entity": "list", "id": shared_list.id} in data["deleted"]
+    assert data["lists"] == []
+
+
+def test_claim_not_sent_to_owner(
+    client, member_headers, admin_headers, admin_user, shared_list, db
+):
+    gift = Gift(list_id=shared_list.id, name="Book")
+    db.add(gift)
+    db.flush()
+    owner_token = _sync(client, member_headers)["token"]
+    viewer_token = _sync(client, admin_headers)["token"]
+
+    client.post(
+        f"/lists/{shared_list.id}/gifts/{gift.id}/claim", headers=admin_headers
+    )
+
+    assert _sync(client, member_headers, owner_token)["gifts"] == []
+    gifts = _sync(client, admin_headers, viewer_token)["gifts"]
+    assert gifts[0]["claimed_by_id"] == admin_user.id
+
+
+def test_delete_connection_sends_tombstones(
+    client, member_headers, admin_headers, shared_list, connection
+):
+    token = _sync(client, admin_headers)["token"]
+
+    client.delete(f"/connections/{connection.id}", headers=member_headers)
+
+    deleted = _sync(client, admin_headers, token)["deleted"]
+    assert {"entity": "connection", "id": connection.id} in deleted
+    assert {"entity": "list", "id": shared_list.id} in deleted
+
+
+def test_collection_change(client, member_headers, collection, sample_list):
+    token = _sync(client, member_headers)["token"]
+
+    client.post(
+        f"/collections/{collection.id}/items",
+        headers=member_headers,
+        json={"list_id": sample_list.id},
+    )
+
+    data = _sync(client, member_headers, token)
+    assert data["collections"][0]["list_ids"] == [sample_list.id]
+
+
+def test_token_trails_unsettled_changes(
+    client, member_headers, sample_list, db, monkeypatch
+):
+    monkeypatch.setattr(settings, "change_settle_seconds", 60)
+    token = _sync(client, member_headers)["token"]
+    client.put(
+        f"/lists/{sample_list.id}", headers=member_headers, json={"name": "Renamed"}
+    )
+
+    data = _sync(client, member_headers, token)
+    assert [l["name"] for l in data["lists"]] == ["Renamed"]
+    # An earlier change could still commit, so the same one is read again
+    data = _sync(client, member_headers, data["token"])
+    assert [l["name"] for l in data["lists"]] == ["Renamed"]
+
+    db.execute(update(Change).values(created_at=datetime(2000, 1, 1)))
+    data = _sync(client, member_headers, data["token"])
+    assert [l["name"] for l in data["lists"]] == ["Renamed"]
+    data = _sync(client, member_headers, data["token"])
+    assert data["lists"] == []
+
+
+def test_invalid_token(client, member_headers):
+    response = client.get("/sync?since=garbage", headers=member_headers)
+    assert response.status_code == 400
+
+
+def test_token_older_than_pruned_changes(client, member_headers, sample_list, db):
+    from app.services.retention import prune
+
+    client.put(
+        f"/lists/{sample_list.id}", headers=member_headers, json={"name": "Renamed"}
+    )
+    token = _sync(client, member_headers)["token"]
+    client.put(
+        f"/lists/{sample_list.id}", headers=member_headers, json={"name": "Again"}
+    )
+    db.execute(update(Change).values(created_at=datetime(2000, 1, 1)))
+    while prune(db, {}, 1000):
+        pass
+
+    response = client.get(f"/sync?since={token}", headers=member_headers)
+    assert response.status_code == 410
+    data = _sync(client, member_headers)
+    assert [l["name"] for l in data["lists"]] == ["Again"]
+    assert _sync(client, member_headers, data["token"])["lists"] == []
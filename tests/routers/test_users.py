@@ -2,8 +2,59 @@ def test_list_users_as_admin(client, admin_user, admin_headers):
     response = client.get("/users", headers=admin_headers)
     assert response.status_code == 200
     data = response.json()
-    assert len(data) >= 1
-    assert data[0]["email"] == "admin@test.com"
+    assert len(data["items"]) >= 1
+    assert data["items"][0]["email"] == "admin@test.com"
+    assert data["items"][0]["lists"] is None
+
+
+def test_list_users_paginates(client, admin_user, admin_headers, member_user):
+    first = client.get("/users?limit=1", headers=admin_headers).json()
+    assert [u["id"] for u in first["items"]] == [admin_user.id]
+    assert first["next_cursor"] is not None
+
+    second = client.get(
+        f"/users?limit=1&cursor={first['next_cursor']}", headers=admin_headers
+    ).json()
+    assert [u["id"] for u in second["items"]] == [member_user.id]
+    assert second["next_cursor"] is None
+
+
+def test_list_users_counts_and_includes_lists(
+    client, admin_headers, member_user, sample_list
+):
+    data = client.get("/users", headers=admin_headers).json()
+    member = next(u for u in data["items"] if u["id"] == member_user.id)
+    assert member["list_count"] == 1
+    assert member["lists"] is None
+
+    data = client.get("/users?include=lists", headers=admin_headers).json()
+    member = next(u for u in data["items"] if u["id"] == member_user.id)
+    assert [entry["id"] for entry in member["lists"]] == [sample_list.id]
+    assert member["lists"][0]["owner_name"] == "Member"
+
+
+def test_list_users_query_count(client, admin_headers, db, count_queries):
+    from app.models.gift_list import GiftList
+    from app.models.user import User
+
+    def add_users(start, count):
+        for i in range(start, start + count):
+            user = User(email=f"user{i}@test.com", name=f"User {i}", password_hash="x")
+            db.add(user)
+            db.flush()
+            db.add(GiftList(name=f"List {i}", owner_id=user.id))
+        db.flush()
+        db.expire_all()
+
+    add_users(0, 1)
+    with count_queries() as few:
+        client.get("/users?include=lists", headers=admin_headers)
+
+    add_users(1, 10)
+    with count_queries() as many:
+        response = client.get("/users?include=lists", headers=admin_headers)
+    assert len(response.json()["items"]) == 12
+    assert len(many) == len(few)
 
 
 def test_list_users_as_member(client, member_user, member_headers):
@@ -67,3 +118,109 @@ def test_delete_user_as_member(client, admin_user, member_headers):
         f"/users/{admin_user.id}", headers=member_headers
     )
     assert response.status_code == 403
+
+
+def test_delete_user_cleans_up_in_background(
+    client, admin_headers, member_user, shared_list, collection_item, db
+):
+    from app.models.gift import Gift
+    from app.models.gift_list import GiftList
+    from app.models.user import User
+    from app.services.jobs import drain_jobs
+
+    db.add(Gift(list_id=shared_list.id, name="Socks"))
+    db.flush()
+
+    response = client.delete(f"/users/{member_user.id}", headers=admin_headers)
+    assert response.status_code == 204
+    db.refresh(member_user)
+    assert member_user.is_active is False
+
+    drain_jobs(db, batch_size=1)
+    db.expunge_all()
+    assert db.get(User, member_user.id) is None
+    assert db.get(GiftList, shared_list.id) is None
+
+
+def test_reactivating_user_stops_cleanup(
+    client, admin_headers, member_user, sample_list, collection_item, db
+):
+    from app.models.collection import Collection
+    from app.models.gift_list import GiftList
+    from app.services.jobs import DONE, claim_job, drain_jobs, run_job
+
+    list_id, collection_id = sample_list.id, collection_item.collection_id
+    client.delete(f"/users/{member_user.id}", headers=admin_headers)
+    job = claim_job(db, lease_seconds=60)
+    assert run_job(db, job, batch_size=1, max_attempts=5)
+
+    response = client.put(
+        f"/users/{member_user.id}", json={"is_active": True}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    drain_jobs(db, batch_size=1)
+    db.refresh(job)
+    assert job.status == DONE
+    db.expunge_all()
+    assert db.get(GiftList, list_id) is not None
+    assert db.get(Collection, collection_id) is not None
+
+
+def test_search_users_ranks_connections_first(
+    client, member_user, member_headers, admin_user, connection, db
+):
+    from app.models.connection import Connection
+    from app.models.user import User
+
+    stranger = User(email="astranger@test.com", name="Al Stranger", password_hash="x")
+    friend_of_friend = User(email="afof@test.com", name="Al Fof", password_hash="x")
+    db.add_all([stranger, friend_of_friend])
+    db.flush()
+    db.add(
+        Connection(
+            requester_id=admin_user.id,
+            addressee_id=friend_of_friend.id,
+            status="accepted",
+        )
+    )
+    admin_user.name = "Al Admin"
+    db.flush()
+
+    response = client.get("/users/search?q=al", headers=member_headers)
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": admin_user.id, "name": "Al Admin", "relationship": "connected"},
+        {"id": friend_of_friend.id, "name": "Al Fof", "relationship": "friend_of_friend"},
+        {"id": stranger.id, "name": "Al Stranger", "relationship": "none"},
+    ]
+
+
+def test_search_users_email_needs_at_sign(client, member_headers, db):
+    from app.models.user import User
+
+    zed = User(email="hidden@test.com", name="Zed", password_hash="x")
+    db.add(zed)
+    db.flush()
+    response = client.get("/users/search?q=hidden", headers=member_headers)
+    assert response.json() == []
+    response = client.get("/users/search?q=hidden@", headers=member_headers)
+    assert [u["id"] for u in response.json()] == [zed.id]
+
+
+def test_search_users_excludes_self_and_inactive(
+    client, member_user, member_headers, db
+):
+    from app.models.user import User
+
+    db.add(User(email="m2@test.com", name="Member Two", password_hash="x", is_active=False))
+    # Active and not the searcher, so the prefix itself does match
+    memo = User(email="x9@test.com", name="Memo", password_hash="x")
+    db.add(memo)
+    db.flush()
+    response = client.get("/users/search?q=mem", headers=member_headers)
+    assert [u["id"] for u in response.json()] == [memo.id]
+
+
+def test_search_users_unauthenticated(client):
+    response = client.get("/users/search?q=a")
+    assert response.status_code == 401
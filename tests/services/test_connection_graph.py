@@ -0,0 +1,25 @@
+from app.models.connection import Connection
+from app.services.connection_graph import ConnectionIndex
+
+
+def test_loads_accepted_connections_both_ways(db, connection, admin_user, member_user):
+    index = ConnectionIndex()
+    assert dict(index.connections(db, admin_user.id)) == {member_user.id: connection.id}
+    assert dict(index.connections(db, member_user.id)) == {admin_user.id: connection.id}
+
+
+def test_ignores_pending(db, admin_user, member_user):
+    db.add(Connection(requester_id=admin_user.id, addressee_id=member_user.id))
+    db.flush()
+    index = ConnectionIndex()
+    assert not index.are_connected(db, admin_user.id, member_user.id)
+
+
+def test_hits_and_invalidation(db, connection, admin_user, member_user):
+    index = ConnectionIndex()
+    assert index.are_connected(db, admin_user.id, member_user.id)
+    assert index.are_connected(db, admin_user.id, member_user.id)
+    index.invalidate([admin_user.id])
+    assert index.are_connected(db, admin_user.id, member_user.id)
+    stats = index.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 2, 1)
@@ -0,0 +1,22 @@
+from app.config import settings
+from app.models.user import hash_email
+from app.services.contacts import rehash_emails
+
+
+def test_rehash_emails_after_salt_change(db, member_user, admin_user, monkeypatch):
+    monkeypatch.setattr(settings, "contact_hash_salt", "rotated")
+    assert member_user.email_hash != hash_email(member_user.email)
+
+    after_id = 0
+    batches = 0
+    while after_id is not None:
+        after_id = rehash_emails(db, after_id, batch_size=1)
+        batches += 1
+    db.expire_all()
+    assert batches > 2
+    for user in (member_user, admin_user):
+        assert user.email_hash == hash_email(user.email)
+
+
+def test_hash_email_normalizes_like_lookup(member_user):
+    assert hash_email(f"  {member_user.email.upper()}\t") == member_user.email_hash
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+
+from sqlalchemy import select
+
+from app.services import events
+from app.services.events import InProcessBroker, LocalBus, RelayBroker
+
+
+def test_publish_reaches_every_subscriber():
+    broker = InProcessBroker()
+
+    async def scenario():
+        first = broker.subscribe("list:1")
+        second = broker.subscribe("list:1")
+        other = broker.subscribe("list:2")
+        broker.publish("list:1", {"type": "gift.created"})
+        assert (await first.get())["type"] == "gift.created"
+        assert (await second.get())["type"] == "gift.created"
+        assert other.queue.empty()
+
+    asyncio.run(scenario())
+
+
+def test_publish_from_another_thread():
+    broker = InProcessBroker()
+
+    async def scenario():
+        subscription = broker.subscribe("list:1")
+        thread = threading.Thread(
+            target=broker.publish, args=("list:1", {"type": "gift.updated"})
+        )
+        thread.start()
+        event = await asyncio.wait_for(subscription.get(), timeout=1)
+        thread.join()
+        assert event["type"] == "gift.updated"
+
+    asyncio.run(scenario())
+
+
+def test_unsubscribe():
+    broker = InProcessBroker()
+
+    async def scenario():
+        subscription = broker.subscribe("list:1")
+        assert broker.subscriber_count("list:1") == 1
+        subscription.close()
+        assert broker.subscriber_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_drops_oldest():
+    broker = InProcessBroker(queue_size=2)
+
+    async def scenario():
+        subscription = broker.subscribe("list:1")
+        for i in range(3):
+            broker.publish("list:1", {"type": "gift.updated", "n": i})
+        await asyncio.sleep(0)
+        assert subscription.dropped == 1
+        assert (await subscription.get())["n"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_relay_broker_reaches_other_workers():
+    bus = LocalBus()
+    worker_a = RelayBroker(bus)
+    worker_b = RelayBroker(bus)
+
+    async def scenario():
+        on_a = worker_a.subscribe("list:1")
+        on_b = worker_b.subscribe("list:1")
+        worker_a.publish("list:1", {"type": "gift.deleted", "gift_id": 7})
+        assert (await on_a.get())["gift_id"] == 7
+        assert (await on_b.get())["gift_id"] == 7
+
+    asyncio.run(scenario())
+
+
+def _collect(list_id, user_id, owner_id, published):
+    """Run a stream, publish events once it is subscribed, collect output."""
+    broker = InProcessBroker()
+    previous = events.get_broker()
+    events.set_broker(broker)
+
+    async def scenario():
+        stream = events.stream_list_events(list_id, user_id, owner_id, 5)
+        chunks = [await anext(stream)]
+        for event in published:
+            broker.publish(events.list_channel(list_id), event)
+        async for chunk in stream:
+            chunks.append(chunk)
+        return chunks
+
+    try:
+        return asyncio.run(asyncio.wait_for(scenario(), timeout=2))
+    finally:
+        events.set_broker(previous)
+
+
+def test_stream_hides_claims_from_owner():
+    gift = {"id": 1, "name": "Kite", "claimed_by_id": 9, "claimed_at": "x"}
+    chunks = _collect(1, 5, 5, [
+        {"type": "gift.claimed", "gift": gift},
+        {"type": "gift.updated", "gift": gift},
+        {"type": "list.deleted", "list_id": 1},
+    ])
+    assert chunks[0] == ": connected\n\n"
+    assert len(chunks) == 3
+    assert chunks[1].startswith("event: gift.updated\n")
+    assert "claimed_by_id" not in chunks[1]
+    assert chunks[2].startswith("event: list.deleted\n")
+
+
+def test_stream_shows_claims_to_viewer():
+    gift = {"id": 1, "name": "Kite", "claimed_by_id": 9, "claimed_at": "x"}
+    chunks = _collect(1, 9, 5, [
+        {"type": "gift.claimed", "gift": gift},
+        {"type": "list.deleted", "list_id": 1},
+    ])
+    assert chunks[1].startswith("event: gift.claimed\n")
+    assert '"claimed_by_id": 9' in chunks[1]
+
+
+def test_stream_ends_when_share_revoked():
+    chunks = _collect(1, 9, 5, [
+        {"type": "share.revoked", "user_id": 8},
+        {"type": "share.revoked", "user_id": 9},
+    ])
+    assert len(chunks) == 2
+    assert '"user_id": 9' in chunks[1]
+
+
+def test_publish_on_commit_waits_for_the_commit(db, monkeypatch):
+    published = []
+    monkeypatch.setattr(
+        events,
+        "publish_list_event",
+        lambda list_id, event_type, **data: published.append((list_id, event_type)),
+    )
+
+    events.publish_list_event_on_commit(db, 1, "gift.created", gift_id=1)
+    assert published == []
+    db.commit()
+    assert published == [(1, "gift.created")]
+
+    db.execute(select(1))
+    events.publish_list_event_on_commit(db, 1, "gift.deleted", gift_id=1)
+    db.rollback()
+    db.commit()
+    assert published == [(1, "gift.created")]
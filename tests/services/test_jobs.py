@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import select
+
+from app.models.job import Job
+from app.services.jobs import (
+    DONE,
+    FAILED,
+    HANDLERS,
+    PENDING,
+    claim_job,
+    drain_jobs,
+    enqueue_job,
+    queue_stats,
+    run_job,
+)
+
+
+def test_enqueue_unknown_kind(db):
+    with pytest.raises(ValueError):
+        enqueue_job(db, "no.such.job")
+
+
+def test_drain_runs_batches_until_done(db, monkeypatch):
+    calls = []
+
+    def handler(db, payload, batch_size):
+        calls.append((payload["n"], batch_size))
+        return len(calls) < 3
+
+    monkeypatch.setitem(HANDLERS, "test.batches", handler)
+    job = enqueue_job(db, "test.batches", n=7)
+    assert queue_stats(db)["depth"] == 1
+
+    assert drain_jobs(db, batch_size=10) == 3
+    assert calls == [(7, 10)] * 3
+    db.refresh(job)
+    assert job.status == DONE
+    assert job.finished_at is not None
+    assert queue_stats(db)["depth"] == 0
+
+
+def test_failed_batch_is_rolled_back_and_retried(db, monkeypatch, member_user):
+    def handler(db, payload, batch_size):
+        member_user.name = "Changed"
+        db.flush()
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(HANDLERS, "test.fail", handler)
+    job = enqueue_job(db, "test.fail")
+
+    claimed = claim_job(db, lease_seconds=60)
+    assert claimed is job
+    assert not run_job(db, job, batch_size=10, max_attempts=2)
+    db.refresh(job)
+    db.refresh(member_user)
+    assert member_user.name == "Member"
+    assert job.status == PENDING
+    assert job.last_error == "boom"
+    # The retry is scheduled in the future, so nothing is due yet
+    assert claim_job(db, lease_seconds=60) is None
+
+    job.run_after = job.created_at
+    db.flush()
+    claim_job(db, lease_seconds=60)
+    assert not run_job(db, job, batch_size=10, max_attempts=2)
+    db.refresh(job)
+    assert job.status == FAILED
+    assert queue_stats(db)["failed"] == 1
+
+
+def test_claim_leases_the_job(db, monkeypatch):
+    monkeypatch.setitem(HANDLERS, "test.noop", lambda db, payload, size: False)
+    enqueue_job(db, "test.noop")
+    assert claim_job(db, lease_seconds=60) is not None
+    assert claim_job(db, lease_seconds=60) is None
+    job = db.execute(select(Job)).scalar_one()
+    assert job.attempts == 1
@@ -0,0 +1,267 @@
+import asyncio
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import URLError
+
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.gift import Gift
+from app.services.link_metadata import (
+    BlockedAddressError,
+    LinkEnricher,
+    LinkMetadata,
+    fetch_html,
+    is_public_address,
+    normalize_url,
+    parse_metadata,
+    store_metadata,
+)
+
+PRODUCT_PAGE = """<html><head>
+<title>Fallback Title</title>
+<meta property="og:title" content="Cast Iron Skillet">
+<meta property="og:image" content="https://cdn.example.com/skillet.jpg">
+<meta property="product:price:amount" content="1,049.5">
+</head><body></body></html>"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    hits: list[str] = []
+
+    def do_GET(self):
+        self.hits.append(self.path)
+        if self.path.startswith("/redirect"):
+            self.send_response(302)
+            self.send_header("Location", self.path.split("to=", 1)[1])
+            self.end_headers()
+            return
+        body = PRODUCT_PAGE.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def product_server(monkeypatch):
+    """Local HTTP stand-in for a product site."""
+    monkeypatch.setattr(settings, "link_fetch_allow_private", True)
+    _Handler.hits = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_normalize_url():
+    assert normalize_url(
+        "HTTPS://Shop.Example.com:443/item?b=2&utm_source=x&a=1#reviews"
+    ) == "https://shop.example.com/item?a=1&b=2"
+    assert normalize_url("http://example.com") == "http://example.com/"
+    assert normalize_url("http://example.com:8080/x") == "http://example.com:8080/x"
+    assert normalize_url("ftp://example.com/file") is None
+    assert normalize_url("not a url") is None
+
+
+def test_parse_metadata():
+    metadata = parse_metadata(PRODUCT_PAGE)
+    assert metadata.title == "Cast Iron Skillet"
+    assert metadata.image_url == "https://cdn.example.com/skillet.jpg"
+    assert metadata.price == Decimal("1049.50")
+
+
+def test_parse_metadata_falls_back_to_title():
+    metadata = parse_metadata("<title> Plain Page </title>")
+    assert metadata == LinkMetadata(title="Plain Page")
+
+
+def test_enricher_fetches_and_stores(product_server):
+    stored = []
+    enricher = LinkEnricher(
+        store=lambda gift_id, url, metadata: stored.append((gift_id, metadata)),
+        host_interval=0,
+    )
+
+    async def scenario():
+        enricher.start()
+        enricher.enqueue(1, f"{product_server}/skillet")
+        enricher.enqueue(2, f"{product_server}/skillet?utm_campaign=sale")
+        await enricher.join()
+        await enricher.stop()
+
+    asyncio.run(scenario())
+    assert sorted(gift_id for gift_id, _ in stored) == [1, 2]
+    assert stored[0][1].title == "Cast Iron Skillet"
+    # Both URLs normalize to the same page, so it is fetched once
+    assert _Handler.hits == ["/skillet"]
+    assert enricher.fetches == 1
+    assert enricher.cache_hits == 1
+
+
+def test_enricher_rate_limits_per_host():
+    fetched_at: dict[str, float] = {}
+
+    async def fetcher(url):
+        fetched_at[url] = time.monotonic()
+        return "<title>x</title>"
+
+    enricher = LinkEnricher(
+        fetcher=fetcher,
+        store=lambda *args: None,
+        concurrency=4,
+        host_interval=0.05,
+    )
+
+    async def scenario():
+        enricher.start()
+        for n in range(3):
+            enricher.enqueue(n, f"https://shop.example.com/item/{n}")
+        enricher.enqueue(9, "https://other.example.com/item")
+        await enricher.join()
+        await enricher.stop()
+
+    asyncio.run(scenario())
+    assert len(fetched_at) == 4
+    same_host = [t for url, t in fetched_at.items() if "shop." in url]
+    assert max(same_host) - min(same_host) >= 0.09
+
+
+def test_enricher_survives_fetch_errors():
+    async def fetcher(url):
+        raise OSError("connection refused")
+
+    enricher = LinkEnricher(fetcher=fetcher, store=lambda *args: None)
+
+    async def scenario():
+        enricher.start()
+        enricher.enqueue(1, "https://down.example.com/")
+        await enricher.join()
+        await enricher.stop()
+
+    asyncio.run(scenario())
+    assert enricher.failures == 1
+
+
+def test_enqueue_ignored_when_not_running():
+    enricher = LinkEnricher(store=lambda *args: None)
+    enricher.enqueue(1, "https://example.com/")
+
+
+def test_enqueue_on_commit_waits_for_the_commit(db, monkeypatch):
+    enricher = LinkEnricher(store=lambda *args: None)
+    queued = []
+    monkeypatch.setattr(
+        enricher, "enqueue", lambda gift_id, url: queued.append(gift_id)
+    )
+
+    enricher.enqueue_on_commit(db, 1, "https://a.example/1")
+    with db.begin_nested():
+        enricher.enqueue_on_commit(db, 2, "https://a.example/2")
+    assert queued == []
+    db.commit()
+    assert queued == [1, 2]
+
+    db.execute(select(1))
+    enricher.enqueue_on_commit(db, 3, "https://a.example/3")
+    db.rollback()
+    db.commit()
+    assert queued == [1, 2]
+
+
+def test_fetch_html(product_server):
+    html = asyncio.run(fetch_html(f"{product_server}/page"))
+    assert "Cast Iron Skillet" in html
+
+
+def test_fetch_html_follows_redirects(product_server):
+    html = asyncio.run(
+        fetch_html(f"{product_server}/redirect?to={product_server}/page")
+    )
+    assert "Cast Iron Skillet" in html
+
+
+def test_fetch_html_refuses_private_addresses(product_server, monkeypatch):
+    monkeypatch.setattr(settings, "link_fetch_allow_private", False)
+    with pytest.raises(URLError) as error:
+        asyncio.run(fetch_html(f"{product_server}/page"))
+    assert isinstance(error.value.reason, BlockedAddressError)
+    assert _Handler.hits == []
+
+
+def test_fetch_html_refuses_redirects_to_file_urls(product_server):
+    with pytest.raises(URLError):
+        asyncio.run(fetch_html(f"{product_server}/redirect?to=file:///etc/passwd"))
+
+
+def test_is_public_address():
+    assert is_public_address("93.184.216.34")
+    assert is_public_address("2606:2800:220:1::1")
+    for address in (
+        "127.0.0.1",
+        "10.1.2.3",
+        "172.16.0.1",
+        "192.168.1.1",
+        "169.254.169.254",
+        "100.64.0.1",
+        "0.0.0.0",
+        "224.0.0.1",
+        "240.0.0.1",
+        "::1",
+        "fe80::1",
+        "fd00::1",
+        "::ffff:127.0.0.1",
+    ):
+        assert not is_public_address(address), address
+
+
+def test_enricher_prunes_idle_hosts():
+    async def fetcher(url):
+        return "<title>x</title>"
+
+    enricher = LinkEnricher(
+        fetcher=fetcher, store=lambda *args: None, host_interval=0
+    )
+
+    async def scenario():
+        enricher.start()
+        for n in range(20):
+            enricher.enqueue(n, f"https://shop{n}.example.com/")
+            await enricher.join()
+        await enricher.stop()
+
+    asyncio.run(scenario())
+    assert enricher.fetches == 20
+    assert len(enricher._host_locks) <= 1
+    assert len(enricher._host_last_fetch) <= 1
+
+
+def test_store_metadata(db, sample_list):
+    gift = Gift(list_id=sample_list.id, name="Skillet", url="https://a.example/1")
+    db.add(gift)
+    db.flush()
+
+    store_metadata(db, gift.id, "https://a.example/1", parse_metadata(PRODUCT_PAGE))
+    db.refresh(gift)
+    assert gift.link_title == "Cast Iron Skillet"
+    assert gift.link_price == Decimal("1049.50")
+    assert gift.link_fetched_at is not None
+
+
+def test_store_metadata_skips_changed_url(db, sample_list):
+    gift = Gift(list_id=sample_list.id, name="Skillet", url="https://a.example/2")
+    db.add(gift)
+    db.flush()
+
+    store_metadata(db, gift.id, "https://a.example/1", parse_metadata(PRODUCT_PAGE))
+    db.refresh(gift)
+    assert gift.link_title is None
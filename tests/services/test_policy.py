@@ -0,0 +1,52 @@
+import pytest
+from fastapi import HTTPException
+
+from app.models.gift import Gift
+
+from app.services.policy import (
+    NONE,
+    OWNER,
+    VIEWER,
+    authorize,
+    load_collection,
+    load_list,
+)
+
+
+def test_load_list_roles(db, shared_list, admin_user, member_user):
+    assert load_list(db, shared_list.id, member_user.id) == (shared_list, OWNER)
+    assert load_list(db, shared_list.id, admin_user.id) == (shared_list, VIEWER)
+
+
+def test_load_list_is_one_query(db, shared_list, admin_user, count_queries):
+    db.add(Gift(list_id=shared_list.id, name="Skillet"))
+    db.flush()
+    db.expunge_all()
+    with count_queries() as statements:
+        gift_list, role = load_list(db, shared_list.id, admin_user.id)
+    assert role == VIEWER
+    assert len(statements) == 1
+    assert [gift.name for gift in gift_list.gifts] == ["Skillet"]
+
+
+def test_load_list_unshared(db, sample_list, admin_user):
+    assert load_list(db, sample_list.id, admin_user.id) == (sample_list, NONE)
+
+
+def test_load_list_missing(db, member_user):
+    assert load_list(db, 99999, member_user.id) == (None, NONE)
+
+
+def test_load_collection_roles(db, collection, admin_user, member_user):
+    assert load_collection(db, collection.id, member_user.id) == (collection, OWNER)
+    assert load_collection(db, collection.id, admin_user.id) == (collection, NONE)
+
+
+def test_authorize(sample_list):
+    assert authorize(sample_list, OWNER, VIEWER) is sample_list
+    with pytest.raises(HTTPException) as exc:
+        authorize(sample_list, VIEWER, OWNER)
+    assert exc.value.status_code == 403
+    with pytest.raises(HTTPException) as exc:
+        authorize(None, NONE, VIEWER)
+    assert exc.value.status_code == 404
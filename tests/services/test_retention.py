@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from app.models.change import Change
+from app.models.job import Job
+from app.services.changes import UPSERT, pruned_change_id, record_changes
+from app.services.jobs import DONE, FAILED, PENDING, enqueue_job
+from app.services.retention import RETENTION_PRUNE, prune, schedule_retention
+
+
+def test_prune_removes_old_changes_and_finished_jobs(db, member_user):
+    record_changes(db, "gift", [1, 2, 3], UPSERT, [member_user.id])
+    db.execute(update(Change).values(created_at=datetime(2000, 1, 1)))
+    record_changes(db, "gift", [4], UPSERT, [member_user.id])
+    old_ids = [change.id for change in db.execute(select(Change)).scalars()][:3]
+
+    jobs = [enqueue_job(db, RETENTION_PRUNE) for _ in range(3)]
+    jobs[0].status = DONE
+    jobs[1].status = FAILED
+    db.flush()
+    db.execute(
+        update(Job)
+        .where(Job.id.in_([jobs[0].id, jobs[1].id]))
+        .values(finished_at=datetime(2000, 1, 1))
+    )
+
+    while prune(db, {}, 2):
+        pass
+    remaining = db.execute(select(Change.entity_id)).scalars().all()
+    assert remaining == [4]
+    assert pruned_change_id(db) == max(old_ids)
+    kept_jobs = db.execute(select(Job.id).order_by(Job.id)).scalars().all()
+    assert kept_jobs == [jobs[2].id]
+
+
+def test_schedule_retention_queues_one_run(db):
+    schedule_retention(db)
+    schedule_retention(db, 3600)
+    waiting = db.execute(
+        select(Job).where(Job.kind == RETENTION_PRUNE, Job.status == PENDING)
+    ).scalars().all()
+    assert len(waiting) == 1
+
+
+def test_prune_queues_the_next_run(db):
+    assert prune(db, {}, 1000) is False
+    waiting = db.execute(
+        select(Job.run_after).where(Job.kind == RETENTION_PRUNE)
+    ).scalars().all()
+    assert len(waiting) == 1
+    assert waiting[0] > datetime.now()
@@ -0,0 +1,69 @@
+from sqlalchemy import select
+
+from app.models.connection import Connection
+from app.models.connection_suggestion import ConnectionSuggestion
+from app.models.user import User
+from app.services.suggestions import (
+    connection_added,
+    connection_removed,
+    rebuild_suggestions,
+)
+
+
+def _counts(db):
+    rows = db.execute(
+        select(
+            ConnectionSuggestion.user_id,
+            ConnectionSuggestion.candidate_id,
+            ConnectionSuggestion.mutual_count,
+        )
+    ).all()
+    return {(user_id, candidate_id): count for user_id, candidate_id, count in rows}
+
+
+def _connect(db, user_a, user_b):
+    conn = Connection(requester_id=user_a.id, addressee_id=user_b.id, status="accepted")
+    db.add(conn)
+    db.flush()
+    connection_added(db, user_a.id, user_b.id)
+    return conn
+
+
+def test_incremental_counts_match_rebuild(db, admin_user, member_user):
+    carol = User(email="carol@test.com", name="Carol", password_hash="x")
+    dave = User(email="dave@test.com", name="Dave", password_hash="x")
+    db.add_all([carol, dave])
+    db.flush()
+
+    _connect(db, admin_user, member_user)
+    _connect(db, admin_user, carol)
+    _connect(db, member_user, carol)
+    last = _connect(db, dave, carol)
+    assert _counts(db)[(admin_user.id, dave.id)] == 1
+    assert _counts(db)[(admin_user.id, member_user.id)] == 1
+
+    connection_removed(db, dave.id, carol.id)
+    db.delete(last)
+    db.flush()
+    incremental = _counts(db)
+    assert (admin_user.id, dave.id) not in incremental
+
+    rebuild_suggestions(db)
+    assert _counts(db) == incremental
+
+
+def test_user_cleanup_keeps_counts_consistent(db, admin_user, member_user):
+    from app.services.cleanup import cleanup_user
+
+    carol = User(email="carol@test.com", name="Carol", password_hash="x", is_active=False)
+    db.add(carol)
+    db.flush()
+    _connect(db, carol, admin_user)
+    _connect(db, carol, member_user)
+    _connect(db, admin_user, member_user)
+
+    while cleanup_user(db, {"user_id": carol.id}, 1000):
+        pass
+    incremental = _counts(db)
+    rebuild_suggestions(db)
+    assert _counts(db) == incremental